@@ -0,0 +1,511 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a hierarchical path finder,
+used to route units around the solid objects on the map.
+"""
+
+__version__ = "0.1"
+
+import heapq
+import weakref
+from collections import deque, OrderedDict
+
+import pygame
+
+from Main.constants import *
+
+# Distance between two neighbouring positions of a unit in pixels
+TILE_SIZE = 16
+
+# Amount of positions along a side of a single cluster
+CLUSTER_SIZE = 8
+
+# Maximum amount of paths remembered by a single navigation grid
+PATH_CACHE_SIZE = 64
+
+# Maximum amount of flow fields remembered by a single navigation grid
+FIELD_CACHE_SIZE = 8
+
+# Maximum amount of positions, which a flow field spreads to
+# while a single step of a unit is looked up
+FIELD_STEP = 256
+
+# Maximum amount of navigation grids remembered by a single zone
+GRID_CACHE_SIZE = 4
+
+# Sides of the neighbouring positions, with their column and row offsets
+NEIGHBOURS = ((UP, 0, -1), (DOWN, 0, 1), (LEFT, -1, 0), (RIGHT, 1, 0))
+
+# Sides opposite to the given ones
+OPPOSITES = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+
+class FlowField(object):
+    """Directions leading from the positions of a grid towards a goal.
+    The field spreads from the goal over several calls, so the positions
+    closest to the goal get their directions first.
+
+    Parameters:
+
+    'goal' - column and row of the position to be reached
+    'size' - amount of the positions of the grid
+    """
+
+    __slots__ = ("goal", "directions", "reached", "frontier")
+
+    def __init__(self, goal, size):
+
+        self.goal = goal
+        self.directions = [IDLE] * size     # Direction from every position
+        self.reached = [False] * size       # Whether a position is reached
+        self.frontier = deque()             # Positions to be spread from
+
+    @property
+    def done(self):
+        """Returns whether every reachable position has its direction."""
+
+        return len(self.frontier) == 0
+
+
+class NavigationGrid(object):
+    """Grid of positions, which a unit of a given size can stand on,
+    grouped into clusters for a coarse search.
+
+    Positions are spaced by TILE_SIZE pixels, starting at 'origin'.
+    Every cluster is split into regions of positions connected within
+    the cluster. Paths are first searched for between the regions,
+    then between the positions of the regions found.
+
+    Parameters:
+
+    'map_' - the Map object on which the units are
+    'size' - width and height of the units
+    'origin' - coordinates of the first position, within a single tile
+    'speed' - speed of the units
+    """
+
+    def __init__(self, map_, size, origin, speed):
+
+        width, height = size
+        offset = int(height // 1.5)
+
+        self.origin = origin
+        self.columns = max(0, (WINDOW_WIDTH - width - origin[0]) // \
+                           TILE_SIZE + 1)
+        self.rows = max(0, (WINDOW_HEIGHT - height - origin[1]) // \
+                        TILE_SIZE + 1)
+
+        # Checks every position for the solid objects on the map,
+        # with the feet offsets used when walking up and in other directions.
+        self.walkable = []
+        for row in range(self.rows):
+            for column in range(self.columns):
+                x, y = self.position((column, row))
+                rect = pygame.Rect(x, y, width, height)
+                self.walkable.append(not map_.collides(rect, offset) and \
+                                     not map_.collides(rect, offset - speed))
+
+        self.__paths = OrderedDict()    # Recently found paths
+        self.__fields = OrderedDict()   # Recently computed flow fields
+
+        # Last finished flow fields keyed by the units they lead to
+        self.followed = weakref.WeakKeyDictionary()
+        self.__label_regions()
+
+    def __index(self, node):
+        return node[1] * self.columns + node[0]
+
+    def __label_regions(self):
+        """Splits the clusters into regions of connected positions
+        and finds the regions, which neighbour each other.
+        """
+
+        self.regions = [None] * len(self.walkable)  # Region of every position
+        self.centers = []                           # Center of every region
+        self.links = []                             # Neighbours of every region
+
+        for start in range(len(self.walkable)):
+            if not self.walkable[start] or not self.regions[start] is None:
+                continue
+
+            column, row = start % self.columns, start // self.columns
+            cluster = (column // CLUSTER_SIZE, row // CLUSTER_SIZE)
+            region = len(self.centers)
+
+            # Flood fills the positions connected within the cluster.
+            self.regions[start] = region
+            stack = [(column, row)]
+            total = [0, 0, 0]
+
+            while len(stack) > 0:
+                node = stack.pop()
+                total[0] += node[0]
+                total[1] += node[1]
+                total[2] += 1
+
+                for side, dx, dy in NEIGHBOURS:
+                    next_ = (node[0] + dx, node[1] + dy)
+
+                    if (next_[0] // CLUSTER_SIZE,
+                        next_[1] // CLUSTER_SIZE) == cluster \
+                    and self.__open(next_) \
+                    and self.regions[self.__index(next_)] is None:
+                        self.regions[self.__index(next_)] = region
+                        stack.append(next_)
+
+            self.centers.append((total[0] / float(total[2]),
+                                 total[1] / float(total[2])))
+            self.links.append(set())
+
+        # Links the regions, which have neighbouring positions.
+        for index, region in enumerate(self.regions):
+            if region is None:
+                continue
+
+            column, row = index % self.columns, index // self.columns
+
+            for next_ in ((column + 1, row), (column, row + 1)):
+                if self.__open(next_):
+                    other = self.regions[self.__index(next_)]
+
+                    if not other == region:
+                        self.links[region].add(other)
+                        self.links[other].add(region)
+
+    def __open(self, node):
+        """Checks whether a position lies on the grid and is walkable."""
+
+        return 0 <= node[0] < self.columns and 0 <= node[1] < self.rows \
+            and self.walkable[self.__index(node)]
+
+    def __search(self, start, goal, neighbours, cost, estimate):
+        """Returns a list of nodes leading from the start to the goal,
+        found with the A* algorithm, or None if there is no such path.
+        """
+
+        opened = [(estimate(start), 0, start)]
+        came_from = {start: None}
+        costs = {start: 0}
+
+        while len(opened) > 0:
+            node = heapq.heappop(opened)[2]
+
+            if node == goal:
+                path = []
+                while not node is None:
+                    path.append(node)
+                    node = came_from[node]
+                path.reverse()
+
+                return path
+
+            for next_ in neighbours(node):
+                new_cost = costs[node] + cost(node, next_)
+
+                if not next_ in costs or new_cost < costs[next_]:
+                    costs[next_] = new_cost
+                    came_from[next_] = node
+                    heapq.heappush(opened, (new_cost + estimate(next_),
+                                            new_cost, next_))
+
+        return None
+
+    def find_path(self, start, goal):
+        """Returns a tuple of positions leading from the start
+        to the goal, or None if the goal can't be reached.
+
+        Parameters:
+
+        'start' - column and row of the first position
+        'goal' - column and row of the last position
+        """
+
+        if not self.__open(start) or not self.__open(goal):
+            return None
+
+        if (start, goal) in self.__paths:
+            # Marks the path as recently used.
+            path = self.__paths.pop((start, goal))
+            self.__paths[(start, goal)] = path
+
+            return path
+
+        # Searches for a corridor of regions leading to the goal.
+        centers = self.centers
+        last = self.regions[self.__index(goal)]
+
+        def distance(region, other):
+            return abs(centers[region][0] - centers[other][0]) + \
+                   abs(centers[region][1] - centers[other][1])
+
+        corridor = self.__search(self.regions[self.__index(start)], last,
+                                 lambda region: self.links[region],
+                                 distance,
+                                 lambda region: distance(region, last))
+
+        if corridor is None:
+            path = None
+        else:
+            # Searches for the positions only within the corridor.
+            corridor = set(corridor)
+
+            def neighbours(node):
+                for side, dx, dy in NEIGHBOURS:
+                    next_ = (node[0] + dx, node[1] + dy)
+
+                    if self.__open(next_) \
+                    and self.regions[self.__index(next_)] in corridor:
+                        yield next_
+
+            path = self.__search(start, goal, neighbours,
+                                 lambda node, next_: 1,
+                                 lambda node: abs(node[0] - goal[0]) + \
+                                              abs(node[1] - goal[1]))
+
+            if not path is None:
+                path = tuple(path)
+
+        # Remembers the path, forgetting the least recently used one.
+        self.__paths[(start, goal)] = path
+        if len(self.__paths) > PATH_CACHE_SIZE:
+            self.__paths.popitem(last=False)
+
+        return path
+
+    def flow_field(self, goal, limit=None):
+        """Returns a flow field (FlowField) leading towards the goal,
+        which reaches only a part of the positions, until it's done.
+
+        The field is computed once for every position of the goal,
+        so any amount of units may follow it at no extra cost.
+
+        Parameters:
+
+        'goal' - column and row of the position to be reached
+        'limit' - maximum amount of positions to spread the field to,
+                  None to compute the whole field at once
+        """
+
+        field = self.__fields.pop(goal, None)
+
+        if field is None:
+            field = FlowField(goal, len(self.walkable))
+
+            if self.__open(goal):
+                field.reached[self.__index(goal)] = True
+                field.frontier.append(goal)
+
+        # Marks the field as recently used, forgetting the oldest one.
+        self.__fields[goal] = field
+        if len(self.__fields) > FIELD_CACHE_SIZE:
+            self.__fields.popitem(last=False)
+
+        directions = field.directions
+        reached = field.reached
+        frontier = field.frontier
+        spread = 0
+
+        # Spreads from the goal, pointing every position
+        # back towards the one it has been reached from.
+        while len(frontier) > 0 and (limit is None or spread < limit):
+            node = frontier.popleft()
+
+            for side, dx, dy in NEIGHBOURS:
+                next_ = (node[0] + dx, node[1] + dy)
+
+                if self.__open(next_) and not reached[self.__index(next_)]:
+                    reached[self.__index(next_)] = True
+                    directions[self.__index(next_)] = OPPOSITES[side]
+                    frontier.append(next_)
+                    spread += 1
+
+        return field
+
+    def nearest(self, x, y, radius=2):
+        """Returns the walkable position nearest to the given coordinates,
+        or None if there is none within the radius.
+
+        Parameters:
+
+        'x' - x-coordinate on the map
+        'y' - y-coordinate on the map
+        'radius' - maximum distance in positions to be searched
+        """
+
+        column = int(round((x - self.origin[0]) / float(TILE_SIZE)))
+        row = int(round((y - self.origin[1]) / float(TILE_SIZE)))
+
+        for distance in range(radius + 1):
+            for dx in range(-distance, distance + 1):
+                dy = distance - abs(dx)
+
+                for node in ((column + dx, row + dy), (column + dx, row - dy)):
+                    if self.__open(node):
+                        return node
+
+        return None
+
+    def position(self, node):
+        """Returns the coordinates of a position on the map."""
+
+        return (self.origin[0] + node[0] * TILE_SIZE,
+                self.origin[1] + node[1] * TILE_SIZE)
+
+
+def navigation_grid(map_, unit):
+    """Returns a navigation grid of the map for a given unit.
+
+    Positions of all the grids are aligned to the tiles, so units
+    of the same size and speed share a grid, wherever they stand.
+    Grids are kept along with the map's current zone or interior,
+    the least recently used ones are forgotten.
+
+    Parameters:
+
+    'map_' - the Map object on which the unit is
+    'unit' - one of the game's units
+    """
+
+    key = (unit.rect.width, unit.rect.height, unit.speed)
+    grid = map_.navigation.pop(key, None)
+
+    if grid is None:
+        grid = NavigationGrid(map_, key[:2], (0, 0), key[2])
+
+    # Marks the grid as recently used, forgetting the oldest one.
+    map_.navigation[key] = grid
+    if len(map_.navigation) > GRID_CACHE_SIZE:
+        map_.navigation.popitem(last=False)
+
+    return grid
+
+
+def _snap(unit, position):
+    """Returns a list of legs (distance and direction),
+    which move a unit exactly onto a position of a grid.
+    """
+
+    legs = []
+
+    if position[0] > unit.rect.x:
+        legs.append((position[0] - unit.rect.x, RIGHT))
+    elif position[0] < unit.rect.x:
+        legs.append((unit.rect.x - position[0], LEFT))
+
+    if position[1] > unit.rect.y:
+        legs.append((position[1] - unit.rect.y, DOWN))
+    elif position[1] < unit.rect.y:
+        legs.append((unit.rect.y - position[1], UP))
+
+    return legs
+
+
+def find_step(map_, unit, target):
+    """Returns the distance and direction of the next step of a unit
+    approaching a target unit, (0, IDLE) if it can't approach it.
+
+    Units of the same size share a flow field of the target.
+    When the target moves to another position, its new field spreads
+    by FIELD_STEP positions per call, and the units it hasn't reached
+    yet keep following the target's last finished field.
+    Units standing between the grid's positions (i.e. after
+    a blocked step) are moved onto the nearest position first.
+
+    Parameters:
+
+    'map_' - the Map object on which the units are
+    'unit' - one of the game's units to be moved
+    'target' - one of the game's units to be approached
+    """
+
+    grid = navigation_grid(map_, unit)
+
+    node = grid.nearest(unit.rect.x, unit.rect.y, 1)
+    goal = grid.nearest(target.rect.x, target.rect.y)
+
+    if node is None or goal is None:
+        return (0, IDLE)
+
+    legs = _snap(unit, grid.position(node))
+
+    if len(legs) > 0:
+        return legs[0]
+
+    index = node[1] * grid.columns + node[0]
+    field = grid.flow_field(goal, FIELD_STEP)
+
+    if field.done:
+        grid.followed[target] = field
+    elif not field.reached[index]:
+        field = grid.followed.get(target, field)
+
+    direction = field.directions[index]
+
+    if direction == IDLE:
+        return (0, IDLE)
+
+    return (TILE_SIZE, direction)
+
+
+def find_legs(map_, unit, x, y):
+    """Returns a list of legs (distance and direction),
+    which lead a unit to the given coordinates,
+    or None if the coordinates can't be reached.
+
+    Parameters:
+
+    'map_' - the Map object on which the unit is
+    'unit' - one of the game's units
+    'x' - x-coordinate of the destination
+    'y' - y-coordinate of the destination
+    """
+
+    grid = navigation_grid(map_, unit)
+
+    start = grid.nearest(unit.rect.x, unit.rect.y, 1)
+    goal = grid.nearest(x, y)
+
+    if start is None or goal is None:
+        return None
+
+    path = grid.find_path(start, goal)
+
+    if path is None:
+        return None
+
+    # Moves the unit onto the grid's position it starts from.
+    legs = [list(leg) for leg in _snap(unit, grid.position(start))]
+
+    # Joins the steps leading towards the same side.
+    for node, next_ in zip(path, path[1:]):
+        for side, dx, dy in NEIGHBOURS:
+            if (node[0] + dx, node[1] + dy) == next_:
+                break
+
+        if len(legs) > 0 and legs[-1][1] == side:
+            legs[-1][0] += TILE_SIZE
+        else:
+            legs.append([TILE_SIZE, side])
+
+    # Adjusts the last position to the exact destination.
+    last_x, last_y = grid.position(goal)
+
+    if x > last_x:
+        legs.append([x - last_x, RIGHT])
+    elif x < last_x:
+        legs.append([last_x - x, LEFT])
+
+    if y > last_y:
+        legs.append([y - last_y, DOWN])
+    elif y < last_y:
+        legs.append([last_y - y, UP])
+
+    return [tuple(leg) for leg in legs]
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -6,4 +6,4 @@ used to create different types of interface objects,
 to be used within the game.
 """
 
-__all__ = ("actions", "menus", "panels", "windows")
+__all__ = ("actions", "menus", "panels", "texts", "windows")
@@ -81,8 +81,6 @@ def resume_game():
     globals_.current_mode = NORMAL_MODE
     globals_.current_menu = [0, None]
 
-    pygame.key.set_repeat(1, 5)
-
 
 def ranged_attack(unit1, unit2):
 
@@ -119,7 +117,7 @@ def flee(unit1, unit2):
 def fighting_mode_inventory():
     globals_.previous_player_action = USE_ITEM
     globals_.current_window[0] = FIGHT_INVENTORY
-    globals_.current_window[1] = windows.Inventory()
+    globals_.current_window[1] = windows.open_inventory()
     globals_.current_mode = WINDOW_MODE
 
 
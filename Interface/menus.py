@@ -10,6 +10,7 @@ from abc import ABCMeta, abstractmethod
 import pygame
 from pygame.locals import *
 
+import Routines.assets as assets
 from Main.constants import *
 
 
@@ -30,7 +31,7 @@ class Button(pygame.sprite.Sprite):
         # Initiates the super class.
         pygame.sprite.Sprite.__init__(self)
 
-        self.__spritesheet = pygame.image.load(PATH_MENUS + spritesheet)
+        self.__spritesheet = assets.load(PATH_MENUS + spritesheet)
         self.__dimensions = (self.__spritesheet.get_width() // 3,
                              self.__spritesheet.get_height())
 
@@ -87,7 +88,7 @@ class Menu(object):
     def __init__(self, background, buttons, font_size=48, selected=1):
 
         if not background == None:
-            self.__background = pygame.image.load(PATH_MENUS + background)
+            self.__background = assets.load(PATH_MENUS + background)
         self.__buttons = buttons
         self.fontSize = font_size
 
@@ -150,7 +151,7 @@ class MainMenu(Menu):
     def __init__(self, background, buttons, picture, font_size=48):
         super(MainMenu, self).__init__(background, buttons, font_size)
 
-        self.picture = pygame.image.load(PATH_MENUS + picture)
+        self.picture = assets.load(PATH_MENUS + picture)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,9 @@ from abc import ABCMeta, abstractmethod, abstractproperty
 
 import pygame
 
+import Interface.texts as texts
 import Main.globals as globals_
+import Routines.assets as assets
 from Main.constants import *
 
 
@@ -13,24 +15,43 @@ class Panel(object):
 
     @abstractmethod
     def __init__(self, background, colorkey=GREEN):
-        self.background = pygame.image.load(PATH_PANELS + background)
-        self.background.set_colorkey(colorkey)
+        self.background = assets.load(PATH_PANELS + background, colorkey)
 
 
 class DialogPanel(Panel):
-    """A panel used to display dialogs between characters."""
+    """A panel used to display dialogs between characters.
+
+    A dialog is wrapped to the panel's width and revealed letter by letter,
+    blitting only the newly revealed glyphs onto the panel's text surface.
+    """
+
+    FONT_SIZE = 14
+    MARGIN = 8
 
     def __init__(self, character):
         super(DialogPanel, self).__init__("dialog_panel.bmp")
 
-        self.__dialog = globals_.dialogs.get(character.behavior.dialogs[0])
-        self.__index = 0
-        self.content = character.name + ": "
+        name = character.name + ": "
+        dialog = globals_.dialogs.get(character.behavior.dialogs[0])
+
+        self.text = texts.TextReveal(name + dialog, self.FONT_SIZE, BLUE,
+                                     self.background.get_width() - \
+                                     2 * self.MARGIN, len(name))
+
+    @property
+    def content(self):
+        """Returns the revealed part of the dialog."""
+
+        return self.text.content
+
+    @property
+    def surface(self):
+        """Returns a surface of the revealed part of the dialog."""
+
+        return self.text.surface
 
     def nextLetter(self):
-        if not self.__index + 1 > len(self.__dialog):
-            self.content += self.__dialog[self.__index]
-            self.__index += 1
+        self.text.reveal()
 
 
 class Healthbar(Panel):
@@ -39,8 +60,7 @@ class Healthbar(Panel):
         super(Healthbar, self).__init__(background_image)
 
         self.health = health
-        self.foreground = pygame.image.load(PATH_PANELS + foreground_image)
-        self.foreground.set_colorkey(GREEN)
+        self.foreground = assets.load(PATH_PANELS + foreground_image, GREEN)
 
 
 class Level(Panel):
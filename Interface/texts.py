@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains the game's text rendering: shared fonts,
+glyph atlases, cached layouts of word-wrapped texts and texts
+revealed letter by letter (i.e. of the dialog panels).
+"""
+
+__version__ = "0.1"
+
+from collections import OrderedDict
+
+import pygame
+
+import Routines.packs as packs
+from Main.constants import *
+
+# Font used by the game's menus, windows and panels
+FONT_NAME = "LithosPro-Black.otf"
+
+# Maximum amount of cached rendered texts and layouts
+TEXT_CACHE_SIZE = 256
+LAYOUT_CACHE_SIZE = 64
+
+
+def _lru_get(cache, key):
+    """Returns a value of an ordered cache, marking it as recently used."""
+
+    value = cache.pop(key, None)
+
+    if not value is None:
+        cache[key] = value
+
+    return value
+
+
+def _lru_put(cache, key, value, limit):
+    """Puts a value into an ordered cache, forgetting
+    the least recently used values above the limit.
+    """
+
+    cache[key] = value
+
+    while len(cache) > limit:
+        cache.popitem(last=False)
+
+
+# Fonts keyed by their names, sizes and italics, together with their files
+_fonts = {}
+
+
+def get_font(size, italic=True, name=FONT_NAME):
+    """Returns a shared font, opened only once.
+
+    Shared fonts mustn't be changed (i.e. by 'set_italic'),
+    a font of another style should be requested instead.
+
+    Parameters:
+
+    'size' - size of the font
+    'italic' - whether the font is italic
+    'name' - name of the font's file in the fonts' directory,
+             None for pygame's default font
+    """
+
+    key = (name, size, italic)
+
+    if not key in _fonts:
+        if name is None:
+            source = None
+        else:
+            # The file is kept along with the font, which reads it lazily.
+            source = packs.open_file(PATH_FONTS + name)
+
+        font = pygame.font.Font(source, size)
+        font.set_italic(italic)
+
+        _fonts[key] = (font, source)
+
+    return _fonts[key][0]
+
+
+class GlyphAtlas(object):
+    """Glyphs of a single font, size and colour, each of them
+    rendered only once, along with their advances.
+
+    Parameters:
+
+    'font' - a font of the glyphs
+    'color' - colour of the glyphs
+    """
+
+    def __init__(self, font, color):
+
+        self.font = font
+        self.color = color
+        self.height = font.get_linesize()
+
+        self.__glyphs = {}          # Rendered glyphs keyed by their letters
+        self.__advances = {}        # Widths of the glyphs
+
+    def glyph(self, letter):
+        """Returns a rendered glyph of a letter."""
+
+        glyph = self.__glyphs.get(letter)
+
+        if glyph is None:
+            glyph = self.font.render(letter, True, self.color)
+            self.__glyphs[letter] = glyph
+
+        return glyph
+
+    def advance(self, letter):
+        """Returns the width of a letter."""
+
+        advance = self.__advances.get(letter)
+
+        if advance is None:
+            advance = self.font.size(letter)[0]
+            self.__advances[letter] = advance
+
+        return advance
+
+    def width(self, text):
+        """Returns the width of a text set of the glyphs."""
+
+        return sum([self.advance(letter) for letter in text])
+
+
+# Glyph atlases keyed by their fonts' keys and colours
+_atlases = {}
+
+
+def get_atlas(size, color, italic=True, name=FONT_NAME):
+    """Returns a shared glyph atlas.
+
+    Parameters:
+
+    'size' - size of the font
+    'color' - colour of the glyphs
+    'italic' - whether the font is italic
+    'name' - name of the font's file
+    """
+
+    key = (name, size, italic, tuple(color))
+
+    if not key in _atlases:
+        _atlases[key] = GlyphAtlas(get_font(size, italic, name), color)
+
+    return _atlases[key]
+
+
+class TextLayout(object):
+    """Positions of the letters of a text, wrapped between words
+    to fit within a given width.
+
+    Parameters:
+
+    'atlas' - a glyph atlas of the text
+    'text' - the text to be set
+    'width' - maximum width of a line, None for a single line
+    """
+
+    def __init__(self, atlas, text, width=None):
+
+        self.atlas = atlas
+        self.text = text
+        self.positions = []         # Positions of the text's letters
+        self.width = 0
+        self.height = atlas.height
+
+        x = y = 0
+        for i, word in enumerate(text.split(" ")):
+            # Words are separated by spaces, which start a word
+            # only if it isn't the first one.
+            if i > 0:
+                word = " " + word
+
+            # Moves a word to the next line, if it doesn't fit,
+            # unless it's the first word of the line.
+            if not width is None and x > 0 \
+            and x + atlas.width(word.rstrip()) > width:
+                x = 0
+                y += atlas.height
+                self.positions.append((x, y))
+                word = word[1:]
+
+            for letter in word:
+                self.positions.append((x, y))
+                x += atlas.advance(letter)
+
+            self.width = max(self.width, x)
+
+        self.height = y + atlas.height
+
+    def __len__(self):
+        return len(self.text)
+
+
+# Recently used layouts keyed by their atlases, texts and widths
+_layouts = OrderedDict()
+
+
+def layout(atlas, text, width=None):
+    """Returns a cached layout of a text, so that texts displayed
+    again (i.e. the same dialogs) aren't wrapped again.
+
+    Parameters:
+
+    'atlas' - a glyph atlas of the text
+    'text' - the text to be set
+    'width' - maximum width of a line, None for a single line
+    """
+
+    key = (id(atlas), text, width)
+    result = _lru_get(_layouts, key)
+
+    if result is None:
+        result = TextLayout(atlas, text, width)
+        _lru_put(_layouts, key, result, LAYOUT_CACHE_SIZE)
+
+    return result
+
+
+class TextReveal(object):
+    """A text revealed letter by letter onto its own surface.
+    Only the newly revealed glyphs are blitted, so revealing
+    a letter takes the same time regardless of the text's length.
+
+    Parameters:
+
+    'text' - the text to be revealed
+    'size' - size of the font
+    'color' - colour of the text
+    'width' - maximum width of a line, None for a single line
+    'revealed' - amount of the letters revealed at the beginning
+    """
+
+    def __init__(self, text, size, color, width=None, revealed=0):
+
+        self.layout = layout(get_atlas(size, color), text, width)
+        self.surface = pygame.Surface((max(self.layout.width, 1),
+                                       self.layout.height), pygame.SRCALPHA)
+        self.revealed = 0
+
+        self.reveal(revealed)
+
+    def reveal(self, amount=1):
+        """Reveals the next letters of the text.
+
+        Parameters:
+
+        'amount' - amount of the letters to be revealed
+        """
+
+        atlas = self.layout.atlas
+        text = self.layout.text
+        end = min(self.revealed + amount, len(text))
+
+        for i in range(self.revealed, end):
+            if not text[i] == " ":
+                self.surface.blit(atlas.glyph(text[i]),
+                                  self.layout.positions[i])
+
+        self.revealed = end
+
+    @property
+    def done(self):
+        """Returns whether the whole text is revealed."""
+
+        return self.revealed == len(self.layout)
+
+    @property
+    def content(self):
+        """Returns the revealed part of the text."""
+
+        return self.layout.text[:self.revealed]
+
+
+# Recently rendered texts keyed by their fonts, texts and colours
+_rendered = OrderedDict()
+
+
+def render(text, size, color, italic=True, name=FONT_NAME):
+    """Returns a cached rendered text, so that texts displayed
+    in every frame (i.e. of the buttons) are rendered only once.
+
+    The rendered texts are shared, so they mustn't be drawn on.
+
+    Parameters:
+
+    'text' - the text to be rendered
+    'size' - size of the font
+    'color' - colour of the text
+    'italic' - whether the font is italic
+    'name' - name of the font's file
+    """
+
+    key = (name, size, italic, tuple(color), text)
+    rendered = _lru_get(_rendered, key)
+
+    if rendered is None:
+        rendered = get_font(size, italic, name).render(text, True, color)
+        _lru_put(_rendered, key, rendered, TEXT_CACHE_SIZE)
+
+    return rendered
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -7,16 +7,19 @@ to be used for various purposes within the game.
 
 __version__ = "0.1"
 
+import bisect
 import os
+import threading
+import weakref
 from abc import ABCMeta, abstractmethod
 
 import pygame
 from pygame.locals import *
-from PyQt4.QtCore import *
-from PyQt4.QtGui import *
 
 import Interface.menus as menus
 import Main.globals as globals_
+import NonStatic.abstract as abstract
+import Routines.assets as assets
 from Main.constants import *
 
 # Local constants
@@ -36,6 +39,15 @@ def show_error(err, trace):
     trace - traceback object
     """
 
+    # Errors of the worker threads (i.e. of a loader's tasks) are raised
+    # instead, so that they're displayed by the main thread.
+    if not isinstance(threading.current_thread(), threading._MainThread):
+        raise err
+
+    # Imports PyQt only when an error is to be shown,
+    # as importing it slows down the game's startup.
+    from PyQt4.QtGui import QApplication, QMessageBox
+
     # Creates an instance of a new QApplication.
     app = QApplication(sys.argv)
 
@@ -58,27 +70,32 @@ class Windows(object):
 
     @abstractmethod
     def __init__(self, background, dimensions):
-        self.background = pygame.image.load(PATH_WINDOWS + background)
+        self.background = assets.load(PATH_WINDOWS + background)
         self.dimensions = dimensions
 
 
 class ActionDialog(menus.Menu):
 
-    def __init__(self, selected=1, buttons=[menus.Button("action_dialog_button.bmp", text="Melee Attack",
-                                                        action="actions.melee_attack(globals_.player_unit, globals_.current_opponent)"),
-                                            menus.Button("action_dialog_button.bmp", text="Ranged Attack",
-                                                        action="actions.ranged_attack(globals_.player_unit, globals_.current_opponent)"),
-                                            menus.Button("action_dialog_button.bmp", text="Use Item",
-                                                        action="actions.fighting_mode_inventory()"),
-                                            menus.Button("action_dialog_button.bmp", text="Flee",
-                                                        action="actions.flee(globals_.player_unit, globals_.current_opponent)")]):
+    def __init__(self, selected=1, buttons=None):
+
+        # Creates the buttons only when the dialog is created,
+        # rather than when the module is imported.
+        if buttons is None:
+            buttons = [menus.Button("action_dialog_button.bmp", text="Melee Attack",
+                                    action="actions.melee_attack(globals_.player_unit, globals_.current_opponent)"),
+                       menus.Button("action_dialog_button.bmp", text="Ranged Attack",
+                                    action="actions.ranged_attack(globals_.player_unit, globals_.current_opponent)"),
+                       menus.Button("action_dialog_button.bmp", text="Use Item",
+                                    action="actions.fighting_mode_inventory()"),
+                       menus.Button("action_dialog_button.bmp", text="Flee",
+                                    action="actions.flee(globals_.player_unit, globals_.current_opponent)")]
+
         super(ActionDialog, self).__init__(None, buttons=buttons, font_size=26, selected=selected)
 
-        self.action_dialog_window = pygame.image.load(PATH_WINDOWS + "action_dialog.bmp")
+        self.action_dialog_window = assets.load(PATH_WINDOWS + "action_dialog.bmp", GREEN)
         self.__buttons = buttons
 
         self.selected = selected
-        self.action_dialog_window.set_colorkey(GREEN)
         self.__buttons[3].reset()
         if globals_.player_unit.weapon == None or globals_.player_unit.weapon == "":
             self.__buttons[1] = menus.Button("action_dialog_button_locked.bmp", text="Ranged Attack")
@@ -100,20 +117,81 @@ class CharacterWindow(Windows):
 
 
 class Inventory(Windows):
+    """Window of an inventory, displaying its stacks.
 
-    def __init__(self):
+    The window listens to its inventory, so it's updated
+    on every change, instead of being made again.
+
+    Parameters:
+
+    'inventory' - an inventory to be displayed,
+                  player's unit's inventory if not specified
+    """
+
+    def __init__(self, inventory=None):
         super(Inventory, self) .__init__("inventory_window.bmp",
                                          (WINDOW_WIDTH, WINDOW_HEIGHT))
-        self.items = []
 
-        for i in globals_.player_unit.inventory.items:
-            self.items.append(i)
+        if inventory is None:
+            inventory = globals_.player_unit.inventory
+
+        self.items = []             # Displayed stacks in the slots' order
+        self.__slots = []           # Slots' numbers of the stacks
+
+        for slot, stack in inventory.slots:
+            self.__slots.append(slot)
+            self.items.append(stack)
 
         self.__selected = 1
 
         if len(self.items) > 0:
             self.items[self.__selected - 1].select()
 
+        inventory.listen(self)
+
+    def inventory_changed(self, change, slot, stack):
+        """Updates the window after a change of its inventory.
+
+        Parameters:
+
+        'change' - the change (i.e. ADDED, REMOVED)
+        'slot' - number of the changed slot
+        'stack' - the changed stack
+        """
+
+        index = bisect.bisect_left(self.__slots, slot)
+
+        if change == abstract.ADDED:
+            self.__slots.insert(index, slot)
+            self.items.insert(index, stack)
+
+            # Keeps the same stack selected.
+            if len(self.items) == 1:
+                stack.select()
+            elif index < self.__selected:
+                self.__selected += 1
+
+        elif change == abstract.REMOVED:
+            del self.__slots[index]
+            del self.items[index]
+            stack.reset()
+
+            # Keeps the same stack selected, or the nearest one.
+            if index < self.__selected - 1 \
+            or self.__selected > len(self.items):
+                self.__selected = max(1, self.__selected - 1)
+
+            if len(self.items) > 0:
+                self.items[self.__selected - 1].select()
+
+    def open(self):
+        """Selects the first stack, when the window is opened again."""
+
+        if len(self.items) > 0:
+            self.selected = 1
+        else:
+            self.__selected = 1
+
     @property
     def selected(self):
         return self.__selected
@@ -126,6 +204,34 @@ class Inventory(Windows):
         self.items[self.__selected - 1].select()
 
 
+# Inventory windows keyed by their inventories
+_inventory_windows = weakref.WeakKeyDictionary()
+
+
+def open_inventory(inventory=None):
+    """Returns the window of an inventory, made only once
+    and kept for as long as the inventory exists.
+
+    Parameters:
+
+    'inventory' - an inventory to be displayed,
+                  player's unit's inventory if not specified
+    """
+
+    if inventory is None:
+        inventory = globals_.player_unit.inventory
+
+    window = _inventory_windows.get(inventory)
+
+    if window is None:
+        window = Inventory(inventory)
+        _inventory_windows[inventory] = window
+    else:
+        window.open()
+
+    return window
+
+
 if __name__ == "__main__":
     class DirectRunError(Exception): pass
     
@@ -52,6 +52,9 @@ else:
 NORMAL_FPS = 25
 SLOW_FPS = 5
 
+# Multiplier of the speed of player's unit, which moves once per frame
+PLAYER_SPEED_FACTOR = 3
+
 # Window size parameters
 WINDOW_WIDTH = 1024
 WINDOW_HEIGHT = 768
@@ -83,6 +86,7 @@ FIGHTING_MODE = 2
 MENU_MODE = 3
 PANEL_MODE = 4
 WINDOW_MODE = 5
+LOADING_MODE = 6
 
 # Window constants
 INVENTORY = 1
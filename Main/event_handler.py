@@ -17,6 +17,7 @@ import Interface.panels as panels
 import Interface.windows as windows
 import Main.initialization as initialization
 import Main.globals as globals_
+import Quests.runtime as runtime
 import Quests.scripting as scripting
 import Static.items as items
 from Main.constants import *
@@ -30,76 +31,12 @@ def normal_mode_events(event):
 
     # Manages events for when a key is pressed.
     if event.type == KEYDOWN:
-        unit = globals_.player_unit
-
-        # Events for the arrow up key
-        if event.key == K_UP:
-            # Moves player's unit if possible.
-            if scripting._possible_to_move(unit, unit.speed, UP):
-                # Enters a building if possible.
-                if scripting._can_enter(unit):
-                    map_ = globals_.current_map
-
-                    number = scripting._can_enter(unit)
-                    map_.interior = number
-
-                    unit.rect.x = map_.areas[number - 1][0].x + \
-                    int(map_.areas[number - 1][0].width // 2) - \
-                    int(unit.rect.width // 2)
-
-                    unit.rect.y = map_.areas[number - 1][0].y - \
-                    unit.rect.height
-
-                    globals_.current_bg_sound = ["", True]
-                    initialization.update_quest(map_.zone, map_.interior)
-                else:
-                    unit.move(UP)
-            else:
-                unit.turn(UP)
-
-        # Events for the arrow down key
-        elif event.key == K_DOWN:
-            # Moves player's unit if possible.
-            if scripting._possible_to_move(unit, unit.speed, DOWN):
-                # Enters a building if possible.
-                if scripting._can_enter(unit):
-                    map_ = globals_.current_map
-                    current_interior = map_.interior
-                    map_.interior = 0
-
-                    unit.rect.x = map_.areas[current_interior - 1][0].x + \
-                    int(map_.areas[current_interior - 1][0].width // 2) - \
-                    int(unit.rect.width // 2)
-
-                    unit.rect.y = map_.areas[current_interior - 1][0].y + \
-                    unit.rect.height
-
-                    globals_.current_bg_sound = ["", True]
-                    initialization.update_quest(map_.zone)
-                else:
-                    unit.move(DOWN)
-            else:
-                unit.turn(DOWN)
-
-        # Events for the arrow left key
-        elif event.key == K_LEFT:
-            # Moves player's unit if possible.
-            if scripting._possible_to_move(unit, unit.speed, LEFT):
-                unit.move(LEFT)
-            else:
-                unit.turn(LEFT)
-
-        # Events for the arrow right key
-        elif event.key == K_RIGHT:
-            # Moves player's unit if possible.
-            if scripting._possible_to_move(unit, unit.speed, RIGHT):
-                unit.move(RIGHT)
-            else:
-                unit.turn(RIGHT)
+        # Events for the arrow keys, the unit is moved by move_player().
+        if event.key in globals_.held_keys.keys:
+            globals_.held_keys.press(event.key)
 
         # Events for the Escape key
         elif event.key == K_ESCAPE:
-            pygame.key.set_repeat(0, 0)
 
             buttons = [menus.Button("ingame_button.bmp", text="Resume",
                                     action="actions.resume_game()"),
@@ -124,13 +61,16 @@ def normal_mode_events(event):
         #TEST
         elif event.key == K_e:
 
+            # Creates the opponent only when the first fight starts.
+            if globals_.current_opponent is None:
+                globals_.current_opponent = globals_.create_opponent()
+
             globals_.current_window[0] = FIGHT_WINDOW
             globals_.current_window[1] = windows.ActionDialog()
 
             globals_.current_opponent.health = MAX_HEALTH
 
             globals_.current_mode = FIGHTING_MODE
-            pygame.key.set_repeat(0, 0)
 
         #TEST
         elif event.key == K_d:
@@ -144,50 +84,117 @@ def normal_mode_events(event):
         # Events for the 'i' key
         elif event.key == K_i:
             globals_.current_window[0] = INVENTORY
-            globals_.current_window[1] = windows.Inventory()
+            globals_.current_window[1] = windows.open_inventory()
             # END OF TEST
 
-            pygame.key.set_repeat(0, 0)
             globals_.fps = SLOW_FPS
             globals_.current_mode = WINDOW_MODE
 
-        map_ = globals_.current_map     # Game's current map
-        unit = globals_.player_unit     # Player's current unit
-
-        # Switches to a next zone if possible.
-        if unit.rect.x + unit.rect.width + 16 > 1024:
-            if map_.zones == 4:
-                if map_.zone in (1, 3):
-                    map_.zone += 1
-                    unit.rect.x = unit.speed + 16
-                    globals_.current_bg_sound = ["", True]
-                    initialization.update_quest(map_.zone)
-        elif unit.rect.x - 16 < 0:
-            if map_.zones == 4:
-                if map_.zone in (2, 4):
-                    map_.zone -= 1
-                    unit.rect.x = 1024 - (unit.speed + unit.rect.width + 16)
-                    globals_.current_bg_sound = ["", True]
-                    initialization.update_quest(map_.zone)
-        elif unit.rect.y + unit.rect.height + 16 > 768:
-            if map_.zones == 4:
-                if map_.zone in (1, 2):
-                    map_.zone += 2
-                    unit.rect.y = unit.speed + 16
-                    globals_.current_bg_sound = ["", True]
-                    initialization.update_quest(map_.zone)
-        elif unit.rect.y - 16 < 0:
-            if map_.zones == 4:
-                if map_.zone in (3, 4):
-                    map_.zone -= 2
-                    unit.rect.y = 768 - (unit.speed + unit.rect.height + 16)
-                    globals_.current_bg_sound = ["", True]
-                    initialization.update_quest(map_.zone)
-
     # Manages events for when a key is released.
     elif event.type == KEYUP:
-        unit = globals_.player_unit
-        unit.stop()
+        globals_.held_keys.release(event.key)
+
+        # Stops the unit, when no direction key is held anymore.
+        if event.key in globals_.held_keys.keys \
+        and globals_.held_keys.direction == IDLE:
+            globals_.player_unit.stop()
+
+
+def move_player():
+    """Moves player's unit by a single step in the direction
+    of the last held arrow key. Called once per frame of the normal mode,
+    so the unit's speed doesn't depend on the keyboard's events.
+    """
+
+    unit = globals_.player_unit
+
+    if unit is None:
+        return
+
+    # Forgets the keys released outside of the normal mode.
+    held = len(globals_.held_keys)
+    globals_.held_keys.sync(pygame.key.get_pressed())
+
+    direction = globals_.held_keys.direction
+    if direction == IDLE:
+        # Stops the unit, if its keys have been released meanwhile.
+        if held > 0:
+            unit.stop()
+
+        return
+
+    # Moves player's unit as far as possible.
+    distance = scripting._resolve_movement(unit,
+                                           unit.speed * PLAYER_SPEED_FACTOR,
+                                           direction)
+    if distance == 0:
+        unit.turn(direction)
+        return
+
+    map_ = globals_.current_map     # Game's current map
+    number = 0
+
+    # Enters or leaves a building if possible.
+    if direction in (UP, DOWN):
+        number = scripting._can_enter(unit)
+
+    if direction == UP and number:
+        map_.interior = number
+
+        unit.rect.x = map_.areas[number - 1][0].x + \
+        int(map_.areas[number - 1][0].width // 2) - \
+        int(unit.rect.width // 2)
+
+        unit.rect.y = map_.areas[number - 1][0].y - \
+        unit.rect.height
+
+        globals_.current_bg_sound = ["", True]
+        initialization.update_quest(map_.zone, map_.interior)
+    elif direction == DOWN and number:
+        current_interior = map_.interior
+        map_.interior = 0
+
+        unit.rect.x = map_.areas[current_interior - 1][0].x + \
+        int(map_.areas[current_interior - 1][0].width // 2) - \
+        int(unit.rect.width // 2)
+
+        unit.rect.y = map_.areas[current_interior - 1][0].y + \
+        unit.rect.height
+
+        globals_.current_bg_sound = ["", True]
+        initialization.update_quest(map_.zone)
+    else:
+        unit.move(direction, distance)
+
+    # Switches to a next zone if possible.
+    if unit.rect.x + unit.rect.width + 16 > WINDOW_WIDTH:
+        zone = map_.neighbour(RIGHT)
+        if not zone is None:
+            map_.zone = zone
+            unit.rect.x = unit.speed + 16
+            globals_.current_bg_sound = ["", True]
+            initialization.update_quest(map_.zone)
+    elif unit.rect.x - 16 < 0:
+        zone = map_.neighbour(LEFT)
+        if not zone is None:
+            map_.zone = zone
+            unit.rect.x = WINDOW_WIDTH - (unit.speed + unit.rect.width + 16)
+            globals_.current_bg_sound = ["", True]
+            initialization.update_quest(map_.zone)
+    elif unit.rect.y + unit.rect.height + 16 > WINDOW_HEIGHT:
+        zone = map_.neighbour(DOWN)
+        if not zone is None:
+            map_.zone = zone
+            unit.rect.y = unit.speed + 16
+            globals_.current_bg_sound = ["", True]
+            initialization.update_quest(map_.zone)
+    elif unit.rect.y - 16 < 0:
+        zone = map_.neighbour(UP)
+        if not zone is None:
+            map_.zone = zone
+            unit.rect.y = WINDOW_HEIGHT - (unit.speed + unit.rect.height + 16)
+            globals_.current_bg_sound = ["", True]
+            initialization.update_quest(map_.zone)
 
 
 def fight_mode_events(event):
@@ -256,7 +263,6 @@ def menu_mode_events(event):
         # Events for the Escape key
         elif event.key == K_ESCAPE:
             if globals_.current_menu[0] == INGAME_MENU:
-                pygame.key.set_repeat(1, 5)
                 globals_.fps = NORMAL_FPS
                 globals_.current_mode = NORMAL_MODE
         # Events for the Return key
@@ -276,6 +282,9 @@ def panel_mode_events(event):
             globals_.fps = NORMAL_FPS
             globals_.current_mode = NORMAL_MODE
 
+            # Resumes the scripts waiting for the dialog to be closed.
+            globals_.quests.signal(runtime.DIALOG_CLOSED)
+
 
 def window_mode_events(event):
     """Manages events for the inventory mode.
@@ -294,14 +303,13 @@ def window_mode_events(event):
                 if not globals_.current_window[1].selected == len(globals_.current_window[1].items):
                     globals_.current_window[1].selected += 1
             if event.key == K_i and globals_.current_window[0] == INVENTORY:
-                pygame.key.set_repeat(1, 5)
                 globals_.fps = NORMAL_FPS
                 globals_.current_mode = NORMAL_MODE
             if event.key == K_ESCAPE and globals_.current_window[0] == FIGHT_INVENTORY:
                 globals_.current_window[0] = FIGHT_WINDOW
                 globals_.current_window[1] = windows.ActionDialog(globals_.previous_player_action)
                 globals_.current_mode = FIGHTING_MODE
-            if event.key == K_RETURN  and not len(globals_.player_unit.inventory.items) == 0:
+            if event.key == K_RETURN  and not len(globals_.player_unit.inventory) == 0:
                 selected = globals_.current_window[1].selected
                 item = globals_.current_window[1].items[selected - 1]
                 globals_.current_menu[0] = CONTEXT_MENU
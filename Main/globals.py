@@ -9,13 +9,22 @@ import pygame
 
 import NonStatic.characters as characters
 import Interface.menus as menus
+import Quests.runtime as runtime
+import Routines.assets as assets
+import Routines.controls as controls
+import Routines.events as events_
+import Routines.movement as movement
+import Routines.rendering as rendering
+import Routines.spatial as spatial
 from Main.constants import *
 
 display_surface = None
 tmp = None
 
 game_files = {}                 # Dictionary containing game's files
-events = []                     # UNDER CONSTRUCTION!
+registry = None                 # Registry of the game's files
+events = events_.EventScheduler()  # Events of the quests
+quest_namespace = {}            # Namespace of the current quest
 
 bg_sounds = []
 current_bg_sound = ["", False]  # Game's current background sound
@@ -31,6 +40,7 @@ frame_counter_two = 0           # Counts the frames of the game
 frame_counter_three = 0
 dialogs = {}
 fps = NORMAL_FPS
+loader = None                   # Loader of a new game, None if not loading
 
 # Fighting mode globals
 flee = False                    # If character has fled or not
@@ -47,14 +57,30 @@ for i in range(0, 100):
 
 player_unit = None              # Player's unit that can be controlled
 quit_game = False               # Determines whether to quit the game
-units_to_move = []              # A list of units to move
+held_keys = controls.HeldKeys()  # Direction keys held by the player
+movements = movement.MovementScheduler()  # Movements of CPU units
+quests = runtime.QuestRuntime(events, movements)  # Quests' scripts
+
+# Resumes the scripts waiting for the units to enter regions.
+characters.Character.observer = quests.moved
+
+chasers = {}                    # Targets of the chasing units, None for player
+
+objects_in_game = spatial.SpatialGroup()  # A group containing objects in game
+units_in_game = spatial.SpatialGroup()    # A group containing units in game
+renderer = rendering.DirtyRenderer()      # Renderer of the map's sprites
+
+current_opponent = None         # Opponent of the player's unit in a fight
 
-objects_in_game = pygame.sprite.Group()  # A group containing objects in game
-units_in_game = pygame.sprite.Group()    # A group containing units in game
 
 #TEST
-current_opponent = characters.Human("Yoshi", (PATH_CHARACTERS + "homer.bmp"))
-current_opponent.art_image = pygame.image.load(PATH_CHARACTERS + "art_image_opponent.png")
+def create_opponent():
+    """Creates the opponent of the player's unit, when a fight starts."""
+
+    opponent = characters.Human("Yoshi", (PATH_CHARACTERS + "homer.bmp"))
+    opponent.art_image = assets.load(PATH_CHARACTERS + "art_image_opponent.png")
+
+    return opponent
 
 
 def clear_all():
@@ -62,22 +88,32 @@ def clear_all():
 
     global bg_sounds, current_bg_sound, current_mode, current_map, \
     current_music, current_quest, current_menu, current_window, \
-    current_quest, events, fps, items_placement, game_files, player_unit, units_to_move, \
-    objects_in_game, units_in_game
+    current_quest, events, fps, items_placement, game_files, player_unit, movements, \
+    chasers, objects_in_game, units_in_game, loader, registry, quest_namespace
 
     bg_sounds = []
     current_bg_sound = ["", False]
     current_mode = NORMAL_MODE
+
+    if not current_map is None:
+        current_map.close()
+
     current_map = None
     current_menu = [0, None]
     current_music = ["", False]
     current_quest = ["", 0]
     current_window = [0, None]
-    events = []
+    events.clear()
+    quests.clear()
     fps = NORMAL_FPS
     game_files = {}
+    registry = None
+    loader = None
     player_unit = None
-    units_to_move = []
+    quest_namespace = {}
+    movements.clear()
+    held_keys.clear()
+    chasers = {}
 
     """
     items_placement = []
@@ -88,6 +124,7 @@ def clear_all():
 
     objects_in_game.empty()
     units_in_game.empty()
+    renderer.invalidate()
 
 
 def clear_in_game_globals():
@@ -95,13 +132,16 @@ def clear_in_game_globals():
     that contain units or objects in game.
     """
 
-    global events, objects_in_game, units_in_game, units_to_move
+    global chasers, events, objects_in_game, units_in_game, movements
 
     objects_in_game.empty()
     units_in_game.empty()
+    renderer.invalidate()
 
-    events = []
-    units_to_move = []
+    chasers = {}
+    events.clear()
+    quests.clear()
+    movements.clear()
 
 if __name__ == "__main__":
     class DirectRunError(Exception):
@@ -10,10 +10,21 @@ __version__ = "0.1"
 # Imports modules from local packages.
 import Interface.menus as menus
 import Main.globals as globals_
+import Quests.compiler as compiler
+import Quests.scripting as scripting
+import Routines.assets as assets
 import Routines.game_utils as game_utils
+import Routines.loading as loading
+import Routines.packs as packs
 from Main.globals import items_placement
 from Quests.scripting import *
 
+# Map and number of the quest, which starts a new game
+START_QUEST = ("ISLAND", 0)
+
+# Map of the starting quest, composed while a new game is loaded
+START_MAP = "Island"
+
 
 def init_main_menu():
 
@@ -46,59 +57,102 @@ def init_mixer():
 
 
 def init_new_game():
-    """Initializes a new game."""
+    """Initializes a new game.
 
-    globals_.current_mode = NORMAL_MODE
+    The game's files are loaded by a loader, which the game loop
+    keeps updating in the loading mode, while a progress bar is displayed.
+    """
+
+    globals_.current_mode = LOADING_MODE
     globals_.fps = NORMAL_FPS
 
-    loading_screen = pygame.image.load(PATH_WINDOWS + "loading_screen.bmp")
+    loader = loading.Loader()
+
+    # Files, which don't depend on each other, are loaded in parallel.
+    loader.add("files", load_game_files)
+    loader.add("dialogs", load_dialogs, ("Test.txt",))
+    loader.add("sounds", init_sounds)
+
+    # The map and units' images need the game's files to be found.
+    loader.add("map", scripting._preload_map, (START_MAP,),
+               depends=("files",))
+    loader.add("units", preload_units, depends=("files",))
+
+    # Quests change the game's state, so they run on the main thread.
+    loader.add("quest", init_quest, START_QUEST,
+               depends=("dialogs", "sounds", "map", "units"), main=True)
+    loader.add("zone", lambda: update_quest(globals_.current_map.zone),
+               depends=("quest",), main=True)
+    loader.add("start", start_new_game, depends=("zone",), main=True)
+
+    globals_.loader = loader
+    loader.start()
+
+
+def update_loader():
+    """Updates the game's loader. Used by the game loop
+    in the loading mode. Errors of the loader's workers
+    are displayed here, on the main thread.
+    """
+
+    try:
+        globals_.loader.update()
+    except Exception as err:
+        # Displays an error on the screen.
+        windows.show_error(err, traceback.extract_stack()[-1])
+
+
+def start_new_game():
+    """Starts a new game, after all of its files are loaded."""
+
+    globals_.loader = None
+    globals_.current_mode = NORMAL_MODE
+
 
-    globals_.display_surface.blit(loading_screen, (0, 0))
-    pygame.display.update()
+def load_game_files():
+    """Loads game' files from 'data1.epic' into their registry."""
 
-    # Sets key repetition to 1 click every 5 milliseconds.
-    pygame.key.set_repeat(1, 5)
+    globals_.registry = game_utils.load_registry()
+    globals_.game_files = globals_.registry.files
 
-    # Loads game' files from 'data1.epic'.
-    globals_.game_files = game_utils.load_game_files()
-    globals_.dialogs = game_utils.load_dialogs("Test.txt")
 
-    # Loads game's sounds into the memory.
-    init_sounds()
+def load_dialogs(text_file):
+    """Loads the dialogs of the game's characters."""
 
-    # Initializes the basic quest.
-    init_quest("ISLAND", 0)
+    globals_.dialogs = game_utils.load_dialogs(text_file)
 
-    # Updates the basic quest to the map's current zone.
-    update_quest(globals_.current_map.zone)
+
+def preload_units():
+    """Loads the images of the game's units in advance."""
+
+    for kind in globals_.game_files.values():
+        for unit in kind:
+            if "image" in unit:
+                assets.load(PATH_CHARACTERS + unit.get("image"))
+
+    assets.load(PATH_CHARACTERS + "art_image_hero.png")
 
 
 def init_sounds():
-    globals_.bg_sounds = []
-    globals_.bg_sounds.append([pygame.mixer.Sound(PATH_MUSIC + \
-                                                  "waterfall.ogg"),
-                               PATH_MUSIC + "waterfall.ogg"])
-    globals_.bg_sounds.append([pygame.mixer.Sound(PATH_MUSIC + \
-                                                  "seagulls.ogg"),
-                               PATH_MUSIC + "seagulls.ogg"])
+    """Loads game's sounds into the memory."""
+
+    globals_.bg_sounds = [[packs.load_sound(PATH_MUSIC + "waterfall.ogg"),
+                           PATH_MUSIC + "waterfall.ogg"],
+                          [packs.load_sound(PATH_MUSIC + "seagulls.ogg"),
+                           PATH_MUSIC + "seagulls.ogg"]]
 
 
 def init_quest(map_, quest_no):
     """Initializes a new quest."""
 
     # Loads a specified quest.
-    quest = game_utils.load_game_quest(map_, quest_no)
+    quest = compiler.get_quest(map_, quest_no)
 
     # Assigns the current quest to a global variable.
     globals_.current_quest[0] = quest
     globals_.current_quest[1] = quest_no
 
-    # Executes Python code from the quest.
-    try:
-        exec(globals_.current_quest[0])
-    except Exception as err:
-        # Displays an error on the screen.
-        windows.show_error(err, traceback.extract_stack()[-1])
+    run_quest(quest)
 
 
 def init_saved_game():
@@ -118,19 +172,44 @@ def update_quest(zone, interior=0):
 
     # Loads a quest for the current zone.
     if not zone == 0:
-        quest = game_utils.load_game_quest(globals_.current_map.name.capitalize(),
-                                           globals_.current_quest[1],
-                                           zone=zone, interior=interior)
+        quest = compiler.get_quest(globals_.current_map.name,
+                                   globals_.current_quest[1],
+                                   zone=zone, interior=interior)
 
         # Assigns the current quest to a global variable.
         globals_.current_quest[0] = quest
 
-        # Executes Python code from the quest.
-        try:
-            exec(globals_.current_quest[0])
-        except Exception as err:
-            # Displays an error on the screen.
-            windows.show_error(err, traceback.extract_stack()[-1])
+        run_quest(quest)
+
+
+# Names available to the quests, None until the first quest is run
+_quest_names = None
+
+
+def run_quest(quest):
+    """Executes a compiled quest, if it exists,
+    within a fresh copy of the quests' namespace.
+    """
+
+    global _quest_names
+
+    if quest is None:
+        return
+
+    if _quest_names is None:
+        _quest_names = dict([(name, value)
+                             for name, value in vars(scripting).items()
+                             if not name.startswith("_")])
+        _quest_names["items_placement"] = items_placement
+
+    # Keeps the quest's namespace for the events it schedules.
+    globals_.quest_namespace = dict(_quest_names)
+
+    try:
+        exec(quest, globals_.quest_namespace)
+    except Exception as err:
+        # Displays an error on the screen.
+        windows.show_error(err, traceback.extract_stack()[-1])
 
 if __name__ == "__main__":
     class DirectRunError(Exception):
@@ -18,13 +18,20 @@ from pygame.locals import *
 if __name__ == "__main__":
     sys.path[0] = os.getcwd()[:-len("Main")]
 
+# Starts measuring the time to the main menu, before the other imports.
+import Routines.startup as startup
+startup.begin()
+
 # Imports modules from local packages.
 import Interface.actions as actions
 import Interface.panels as panels
+import Interface.texts as texts
 import Main.event_handler as event_handler
 import Main.globals as globals_
 import Main.initialization as initialization
+import Routines.assets as assets
 import Routines.cpu_requests as cpu_requests
+import Routines.packs as packs
 from Main.constants import *
 
 
@@ -43,9 +50,6 @@ def main():
     # Initializes game's audio.
     initialization.init_mixer()
 
-    # Initializes main menu.
-    initialization.init_main_menu()
-
     # Additional game constants
     global FPS_CLOCK, DISPLAY_SURFACE
     FPS_CLOCK = pygame.time.Clock()             # Game's internal clock
@@ -56,6 +60,10 @@ def main():
 
     globals_.display_surface = DISPLAY_SURFACE
 
+    # Initializes main menu, after the display is set,
+    # so that its images are converted to the display's format.
+    initialization.init_main_menu()
+
     # Sets the window's title to 'The Epic Odyssey'.
     pygame.display.set_caption("The Epic Odyssey")
 
@@ -63,13 +71,17 @@ def main():
     pygame.mouse.set_visible(False)
 
     # TEST
-    font2 = pygame.font.Font(None, 18)
+    font2 = texts.get_font(18, False, None)
 
     # --- GAME LOOP --- #
     run_game = True
     while run_game:
         if globals_.quit_game:
             break
+
+        # Rects of the display to be updated, None for the whole display
+        dirty_rects = None
+
         # Manages game's events.
         for event in pygame.event.get():
             if event.type == QUIT:
@@ -89,33 +101,49 @@ def main():
 
         # Runs the game loop for the normal mode.
         if globals_.current_mode == NORMAL_MODE:
+            # Moves player's unit in the direction of the held arrow key.
+            event_handler.move_player()
+
             # Manages CPU units (i.e. movement, speaking etc).
             cpu_requests.manage_units()
 
             # Manages quest events.
             cpu_requests.manage_events()
 
-            # Displays the current map on the screen.
-            DISPLAY_SURFACE.blit(globals_.current_map.textures, (0, 0))
-
-            # Displays objects and CPU units on the current map.
-            if len(globals_.objects_in_game) > 0:
-                for obj in globals_.objects_in_game.sprites():
-                    DISPLAY_SURFACE.blit(obj.image, obj.rect)
-            if len(globals_.units_in_game) > 0:
-                for un in globals_.units_in_game.sprites():
-                    DISPLAY_SURFACE.blit(un.image, un.rect)
+            # Composes the zones, which the player is approaching.
+            if not globals_.player_unit is None:
+                globals_.current_map.prefetch(globals_.player_unit.rect)
 
-            # Displays player's unit on the current map.
+            # Displays objects, CPU units and player's unit on the current
+            # map, redrawing only the parts of the screen, which have changed.
+            layers = [globals_.objects_in_game, globals_.units_in_game]
             if not globals_.player_unit is None:
-                DISPLAY_SURFACE.blit(globals_.player_unit.image,
-                                     globals_.player_unit.rect)
+                layers.append((globals_.player_unit,))
+
+            dirty_rects = globals_.renderer.draw(DISPLAY_SURFACE,
+                                                 globals_.current_map.textures,
+                                                 layers)
+
+        elif globals_.current_mode == LOADING_MODE:
+            # Displays the loading screen with the loader's progress.
+            DISPLAY_SURFACE.blit(assets.load(PATH_WINDOWS + \
+                                             "loading_screen.bmp"), (0, 0))
+
+            progress_rect = pygame.Rect(WINDOW_WIDTH // 4,
+                                        WINDOW_HEIGHT - 64,
+                                        WINDOW_WIDTH // 2, 16)
+            pygame.draw.rect(DISPLAY_SURFACE, BLACK, progress_rect, 0)
+
+            progress_rect.width = int(progress_rect.width * \
+                                      globals_.loader.progress)
+            pygame.draw.rect(DISPLAY_SURFACE, RED, progress_rect, 0)
+
+            # Loads the game's files, while the events are still managed.
+            initialization.update_loader()
 
         elif globals_.current_mode == FIGHTING_MODE:
-            # Font for action dialog
-            font = pygame.font.Font(PATH_FONTS + "LithosPro-Black.otf",
-                                    globals_.current_window[1].fontSize)
-            font.set_italic(True)
+            # Font size for action dialog
+            font_size = globals_.current_window[1].fontSize
             # background for FIGHTING_MODE
             map_landscape = globals_.current_map.landscape
 
@@ -167,7 +195,7 @@ def main():
                 # Displays the button on the screen.
                 DISPLAY_SURFACE.blit(button.image, (x, y))
 
-                rendered = font.render(button.text, True, BLACK)
+                rendered = texts.render(button.text, font_size, BLACK)
 
                 # Displays text on the button.
                 DISPLAY_SURFACE.blit(rendered,
@@ -203,8 +231,7 @@ def main():
                 DISPLAY_SURFACE.blit(unit[2].background,\
                                      (coords[0], coords[1]))
                 # create the text to blit the current level of unit
-                rendered = font.render(str(unit[0].level), True, BLACK)
-                font.set_italic(False)
+                rendered = texts.render(str(unit[0].level), font_size, BLACK)
                 # blit the level text on the background
                 DISPLAY_SURFACE.blit(rendered, ((coords[0] + \
                                     (unit[2].background.get_width()\
@@ -216,9 +243,6 @@ def main():
             # increase coordinates for player and opponent to blit the healthbar
             player_coords[0] += 12 + 32
             opponent_coords[0] += 12 + 32
-            # font for blitting health percentage
-            font = pygame.font.Font(PATH_FONTS + "LithosPro-Black.otf", 20)
-            font.set_italic(True)
             # loop for blitting health panel
             for unit in units_in_battle:
                 # if unit is player set player coords and health
@@ -294,8 +318,8 @@ def main():
                                      / float(unit[1].background.get_width() - 8))\
                                      * 100
                 # render font for blitting health percentage
-                rendered = font.render(str(health_percentage) + "%", True,\
-                                      BLACK)
+                rendered = texts.render(str(health_percentage) + "%", 20,\
+                                        BLACK)
                 # blit health percentage on health bar
                 DISPLAY_SURFACE.blit(rendered, ((coords[0] +\
                                     (unit[1].background.get_width()\
@@ -305,15 +329,13 @@ def main():
                                     - rendered.get_height()) // 2)))
             # check if fight text is not ""
             if not globals_.combat_message == "":
-                font = pygame.font.Font(PATH_FONTS + "LithosPro-Black.otf", 40)
-                font.set_italic(True)
                 globals_.frame_counter_two += 1     # start frame counter No 2
                 if globals_.frame_counter in (0, 24):
                     color = BLUE
                 elif globals_.frame_counter in (25, 50):
                     color = RED
-                rendered = font.render(combat_message, True, color)
-                combat_message_background = pygame.image.load(PATH_WINDOWS + "combat_message_background.png")
+                rendered = texts.render(combat_message, 40, color)
+                combat_message_background = assets.load(PATH_WINDOWS + "combat_message_background.png")
                 DISPLAY_SURFACE.blit(combat_message_background, ((WINDOW_WIDTH -\
                                                  combat_message_background.get_width()) // 2,\
                                                 (WINDOW_HEIGHT -\
@@ -338,14 +360,14 @@ def main():
                     if globals_.frame_counter_three == 50:
                         actions.exit_to_menu()      # exit to menu
                         actions.reset_fighting()    # set next turn to be player's
-                    outcome = pygame.image.load(PATH_WINDOWS + "you_lost.png")  # set outcome picture to lost
+                    outcome = assets.load(PATH_WINDOWS + "you_lost.png")  # set outcome picture to lost
                 # if opponent health is below 1
                 elif globals_.current_opponent.health < 1:
                     # if frame counter is 60
                     if globals_.frame_counter_three == 50:
                         actions.resume_game()       # resume game
                         actions.reset_fighting()    # set next turn to be player's
-                    outcome = pygame.image.load(PATH_WINDOWS + "you_won.png")   # set outcome picture to won
+                    outcome = assets.load(PATH_WINDOWS + "you_won.png")   # set outcome picture to won
                 # display outcome picture
                 DISPLAY_SURFACE.blit(outcome,\
                                      ((WINDOW_WIDTH - outcome.get_width()) // 2,\
@@ -354,10 +376,8 @@ def main():
         # Runs the game loop for the menu mode.
         elif globals_.current_mode == MENU_MODE:
 
-            # In-game font
-            font = pygame.font.Font(PATH_FONTS + "LithosPro-Black.otf",
-                                    globals_.current_menu[1].fontSize)
-            font.set_italic(True)
+            # In-game font size
+            font_size = globals_.current_menu[1].fontSize
 
             if globals_.current_menu[0] == MAIN_MENU:
                 DISPLAY_SURFACE.blit(globals_.current_menu[1].picture, (0, 0))
@@ -392,7 +412,7 @@ def main():
                     DISPLAY_SURFACE.blit(button.image,
                                          (x, y + offset))
 
-                    rendered = font.render(button.text, True, (0, 0, 0))
+                    rendered = texts.render(button.text, font_size, BLACK)
 
                     # Displays text on the button.
                     DISPLAY_SURFACE.blit(rendered,
@@ -415,17 +435,13 @@ def main():
                                       panel.background.get_width(),
                                       panel.background.get_height()))
 
-                font = pygame.font.Font(PATH_FONTS + "LithosPro-Black.otf",
-                                        14)
-                font.set_italic(True)
-                text = font.render(panel.content, True, (0, 0, 255))
-
-                DISPLAY_SURFACE.blit(text,
-                                     ((WINDOW_WIDTH - panel.background.get_width()) // 2,
-                                      WINDOW_HEIGHT - panel.background.get_height() - 10),
+                # Only the newly revealed letters are rendered in every frame.
+                DISPLAY_SURFACE.blit(panel.surface,
+                                     ((WINDOW_WIDTH - panel.background.get_width()) // 2 + panel.MARGIN,
+                                      WINDOW_HEIGHT - panel.background.get_height() - 10 + panel.MARGIN),
                                      (0, 0,
-                                      panel.background.get_width(),
-                                      panel.background.get_height()))
+                                      panel.background.get_width() - 2 * panel.MARGIN,
+                                      panel.background.get_height() - 2 * panel.MARGIN))
 
                 panel.nextLetter()
 
@@ -453,9 +469,7 @@ def main():
 
                 if globals_.current_menu[0] == CONTEXT_MENU:
 
-                    font = pygame.font.Font(PATH_FONTS + "LithosPro-Black.otf",
-                                            globals_.current_menu[1].fontSize)
-                    font.set_italic(True)
+                    font_size = globals_.current_menu[1].fontSize
 
                     offset = 0
                     background = globals_.current_menu[1].background
@@ -481,7 +495,7 @@ def main():
                         # Displays the button on the screen.
                         DISPLAY_SURFACE.blit(button.image, (x, y + offset))
 
-                        rendered = font.render(button.text, True, (0, 0, 0))
+                        rendered = texts.render(button.text, font_size, BLACK)
 
                                         # Displays text on the button.
                         DISPLAY_SURFACE.blit(rendered,
@@ -504,7 +518,7 @@ def main():
 
                 # Loads the new music to memory and plays it.
                 if not globals_.current_music[0] == "":
-                    pygame.mixer.music.load(globals_.current_music[0])
+                    packs.load_music(globals_.current_music[0])
                     pygame.mixer.music.play(0)
 
         # Sets the music to be played during the game.
@@ -527,11 +541,21 @@ def main():
 
         # TEST
         amount_of_fps = font2.render("FPS: " + str(int(FPS_CLOCK.get_fps())), True, (255, 0, 0))
-        DISPLAY_SURFACE.blit(amount_of_fps, (20, 20))
+        fps_rect = DISPLAY_SURFACE.blit(amount_of_fps, (20, 20))
         # END OF TEST
 
         # Updates the game's main display.
-        pygame.display.update()
+        if dirty_rects is None:
+            # Other modes draw over the map, so it's redrawn fully next time.
+            globals_.renderer.invalidate()
+            pygame.display.update()
+        else:
+            globals_.renderer.overlay(fps_rect)
+            dirty_rects.append(fps_rect)
+            pygame.display.update(dirty_rects)
+
+        # Reports the time to the main menu, after it's displayed first.
+        startup.end()
 
         # Sets amount of frames per second to 30.
         FPS_CLOCK.tick(globals_.fps)
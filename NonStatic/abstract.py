@@ -1,16 +1,225 @@
+import copy
+import heapq
+import weakref
+
+import pygame
+
+import Static.items as items
+
+# Changes of an inventory, sent to its listeners
+ADDED = 0
+REMOVED = 1
+CHANGED = 2
+
+
+def _definition(kind):
+    """Returns the shared definition of an item, of a class of the items,
+    or the definition itself.
+    """
+
+    if isinstance(kind, type):
+        return items.get_definition(kind)
+
+    return getattr(kind, "definition", kind)
+
+
+def _new_stack(item, quantity):
+    """Returns a new stack of the items, a copy of one of them,
+    so that the added items themselves are never changed.
+    """
+
+    stack = copy.copy(item)
+
+    # Leaves the groups of the item to the item itself.
+    if isinstance(stack, pygame.sprite.Sprite):
+        pygame.sprite.Sprite.__init__(stack)
+
+    if not getattr(item, "rect", None) is None:
+        stack.rect = item.rect.copy()
+
+    stack.selected = False
+    stack.quantity = quantity
+
+    return stack
+
+
 class Inventory(object):
+    """Items of a unit, stacked by their shared definitions,
+    so items of the same class, but of different definitions
+    (i.e. weapons), are kept in separate stacks.
+
+    Every stack is a new copy of the first item of its definition,
+    whose quantity counts all the items of the stack. The added items
+    themselves aren't changed, so they may be added to many inventories.
+    Stacks keep their slots until they're
+    emptied and new stacks take the first empty slots, so the order
+    of the stacks is stable. Adding, removing and counting items
+    doesn't depend on the amount of the stacks.
+
+    Listeners (i.e. inventory windows) are told about every change
+    by calling their 'inventory_changed' method with the change,
+    the slot and the stack. The inventory doesn't keep them alive.
+
+    Parameters:
+
+    'items' - items to be put into the inventory
+    """
 
     def __init__(self, items=[]):
-        self.items = []
 
-        if len(items) > 0:
-            for i in items:
-                self.items.append(i)
+        self.__stacks = []          # Stacks kept in slots, None if empty
+        self.__free = []            # Heap of the numbers of empty slots
+        self.__slots = {}           # Numbers of the slots keyed by definitions
+        self.__listeners = weakref.WeakKeyDictionary()
+
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, kind):
+        return _definition(kind) in self.__slots
+
+    def __iter__(self):
+        for stack in self.__stacks:
+            if not stack is None:
+                yield stack
+
+    def __len__(self):
+        return len(self.__slots)
+
+    def __notify(self, change, slot, stack):
+        for listener in list(self.__listeners.keys()):
+            listener.inventory_changed(change, slot, stack)
 
     def add(self, item):
-        self.items.append(item)
+        """Adds an item to the stack of its definition.
+        Returns the stack.
+
+        Parameters:
+
+        'item' - an item to be added
+        """
+
+        definition = _definition(item)
+        quantity = getattr(item, "quantity", 1)
+        slot = self.__slots.get(definition)
+
+        if not slot is None:
+            stack = self.__stacks[slot]
+            stack.quantity += quantity
+            self.__notify(CHANGED, slot, stack)
+
+            return stack
+
+        stack = _new_stack(item, quantity)
+
+        if len(self.__free) > 0:
+            slot = heapq.heappop(self.__free)
+            self.__stacks[slot] = stack
+        else:
+            slot = len(self.__stacks)
+            self.__stacks.append(stack)
+
+        self.__slots[definition] = slot
+        self.__notify(ADDED, slot, stack)
+
+        return stack
+
+    def copy(self):
+        """Returns a copy of the inventory, with copies of its stacks."""
+
+        # Stacks are copied, when they're added.
+        return Inventory(self.items)
+
+    def count(self, kind):
+        """Returns the amount of the items of a definition.
+
+        Parameters:
+
+        'kind' - an item, its definition or a class of the items
+        """
+
+        slot = self.__slots.get(_definition(kind))
+
+        if slot is None:
+            return 0
+
+        return self.__stacks[slot].quantity
+
+    def get(self, kind):
+        """Returns the stack of a definition, or None if there is none.
+
+        Parameters:
+
+        'kind' - an item, its definition or a class of the items
+        """
+
+        slot = self.__slots.get(_definition(kind))
+
+        if slot is None:
+            return None
+
+        return self.__stacks[slot]
+
+    def listen(self, listener):
+        """Starts telling a listener about the inventory's changes.
+
+        Parameters:
+
+        'listener' - an object with the 'inventory_changed' method
+        """
+
+        self.__listeners[listener] = True
+
+    def remove(self, item, amount=1):
+        """Removes items from the stack of their definition,
+        emptying its slot, if no items are left.
+
+        Parameters:
+
+        'item' - an item, its definition or a class of the items
+        'amount' - amount of the items to be removed
+        """
+
+        definition = _definition(item)
+        slot = self.__slots.get(definition)
+
+        if slot is None:
+            return
+
+        stack = self.__stacks[slot]
+        stack.quantity -= amount
+
+        if stack.quantity > 0:
+            self.__notify(CHANGED, slot, stack)
+            return
+
+        self.__stacks[slot] = None
+        heapq.heappush(self.__free, slot)
+        del self.__slots[definition]
+
+        self.__notify(REMOVED, slot, stack)
+
+    def unlisten(self, listener):
+        """Stops telling a listener about the inventory's changes.
+
+        Parameters:
+
+        'listener' - a listener of the inventory
+        """
+
+        self.__listeners.pop(listener, None)
+
+    @property
+    def items(self):
+        """Returns a list of the stacks in the order of their slots."""
+
+        return list(self)
+
+    @property
+    def slots(self):
+        """Returns a list of the slots' numbers of the stacks
+        and the stacks themselves, in the order of the slots.
+        """
 
-    def remove(self, item):
-        for i in self.items:
-            if i.name == item.name:
-                self.items.remove(item)
+        return [(slot, stack) for slot, stack in enumerate(self.__stacks)
+                if not stack is None]
@@ -7,15 +7,21 @@ to use in the game.
 
 __version__ = "0.1"
 
+import copy
 from abc import ABCMeta, abstractmethod
 
 import pygame
 
 import AI.interactions as interactions
 import NonStatic.abstract as abstract
+import Routines.assets as assets
+import Routines.spatial as spatial
 import Static.armors as armors
 from Main.constants import *
 
+# Rows of the characters' spritesheets keyed by the directions
+FRAME_ROWS = {UP: 0, DOWN: 1, LEFT: 2, RIGHT: 3}
+
 
 class Character(pygame.sprite.Sprite):
     """Abstract class used to create characters.
@@ -38,6 +44,9 @@ class Character(pygame.sprite.Sprite):
 
     __metaclass__ = ABCMeta
 
+    # A function called with every character, which has moved
+    observer = None
+
     @abstractmethod
     def __init__(self, name, defense, speed, spritesheet,
                  agility=1, skills=[1, 1],
@@ -46,13 +55,14 @@ class Character(pygame.sprite.Sprite):
         # Initiates the super class.
         pygame.sprite.Sprite.__init__(self)
 
-        self.__spritesheet = pygame.image.load(spritesheet)
+        # Frames shared by all the characters of the same spritesheet
+        self.__frames = assets.load_frames(spritesheet, 3, 4, GREEN)
         self.direction = direction
 
         # Initiates the super class's properties.
-        self.image = self.__init_frame()
-        self.image.set_colorkey(GREEN)
+        self.image = self.__frame(0)
         self.rect = self.image.get_rect()
+        self.dirty = True       # Whether the character has to be redrawn
 
         # Initiates the rest of the class's attributes
         self.agility = agility
@@ -75,40 +85,24 @@ class Character(pygame.sprite.Sprite):
         """Animates movement of the character during the walk."""
 
         if self.__frames_counter in (0, 10, 20, 30):
-            if self.__current_foot_movement in (IDLE, LEFT, RIGHT):
-                x, y = self.__return_frame_position()
-                if self.__current_foot_movement in (IDLE, RIGHT):
-                    offset = self.rect.width
-                    self.__current_foot_movement = LEFT
-                elif self.__current_foot_movement == LEFT:
-                    offset = self.rect.width * 2
-                    self.__current_foot_movement = RIGHT
-            self.image.blit(self.__spritesheet, (0, 0),
-                            (x + offset, y, self.rect.width,
-                             self.rect.height))
+            if self.__current_foot_movement in (IDLE, RIGHT):
+                column = 1
+                self.__current_foot_movement = LEFT
+            elif self.__current_foot_movement == LEFT:
+                column = 2
+                self.__current_foot_movement = RIGHT
+            self.image = self.__frame(column)
         elif self.__frames_counter in (5, 15, 25):
-            x, y = self.__return_frame_position()
-            offset = 0
-            self.image.blit(self.__spritesheet, (0, 0),
-                            (x + offset, y, self.rect.width,
-                             self.rect.height))
+            self.image = self.__frame(0)
         elif self.__frames_counter > 30:
             self.__frames_counter = 0
 
         self.__frames_counter += 1
 
-    def __init_frame(self):
-        """Returns the initial image (frame) of the character."""
-
-        size = (self.__spritesheet.get_width() // 3,
-                self.__spritesheet.get_height() // 4)
-        x, y = self.__return_frame_position()
+    def __frame(self, column):
+        """Returns a frame of the character's current direction."""
 
-        image = pygame.Surface((size[0], size[1]))
-        image.blit(self.__spritesheet, (0, 0),
-                   (x, y, size[0], size[1]))
-
-        return image
+        return self.__frames.frame(FRAME_ROWS[self.direction], column)
 
     def __restart_movement(self):
         """Restores character's animation to the idle state."""
@@ -116,37 +110,55 @@ class Character(pygame.sprite.Sprite):
         self.__current_foot_movement = IDLE
         self.__frames_counter = 0
 
-    def __return_frame_position(self):
-        """Returns the position of a frame on character's spritesheet."""
+    def clone(self):
+        """Returns a copy of the character, sharing its frames,
+        but having its own position, behavior and state.
+        Used to spawn characters of a prototype, without constructing
+        them again.
+        """
 
-        size = (self.__spritesheet.get_width() // 3,
-                self.__spritesheet.get_height() // 4)
+        clone = copy.copy(self)
 
-        if self.direction == UP:
-            x, y = 0, 0
-        elif self.direction == DOWN:
-            x, y = 0, 0 + size[1]
-        elif self.direction == LEFT:
-            x, y = 0, 0 + size[1] * 2
-        elif self.direction == RIGHT:
-            x, y = 0, 0 + size[1] * 3
+        # Leaves the groups of the character to the character itself.
+        pygame.sprite.Sprite.__init__(clone)
+
+        clone.rect = self.rect.copy()
+        clone.behavior = copy.copy(self.behavior)
 
-        return x, y
+        if type(getattr(self, "skills", None)) is list:
+            clone.skills = list(self.skills)
 
-    def move(self, direction=DOWN):
-        """Moves character in a specified direction."""
+        return clone
+
+    def move(self, direction=DOWN, distance=None):
+        """Moves character in a specified direction.
+
+        Moves by character's speed, unless a shorter distance is given.
+        """
+
+        if distance is None:
+            distance = self.speed
 
         self.direction = direction
         self.__animate_movement()
+        self.dirty = True
 
         if self.direction == UP:
-            self.rect.y -= self.speed
+            self.rect.y -= distance
         elif self.direction == DOWN:
-            self.rect.y += self.speed
+            self.rect.y += distance
         elif self.direction == LEFT:
-            self.rect.x -= self.speed
+            self.rect.x -= distance
         elif self.direction == RIGHT:
-            self.rect.x += self.speed
+            self.rect.x += distance
+
+        # Updates the character's cells in spatially indexed groups.
+        for group in self.groups():
+            if isinstance(group, spatial.SpatialGroup):
+                group.relocate(self)
+
+        if not Character.observer is None:
+            Character.observer(self)
 
     def stop(self):
         """Stops the current character's animation."""
@@ -154,6 +166,7 @@ class Character(pygame.sprite.Sprite):
         self.__frames_counter = 5
         self.__animate_movement()
         self.__restart_movement()
+        self.dirty = True
 
     def turn(self, direction):
         """Turns the character to a specified direction."""
@@ -162,6 +175,7 @@ class Character(pygame.sprite.Sprite):
         self.__frames_counter = 5
         self.__animate_movement()
         self.__restart_movement()
+        self.dirty = True
 
     def use(self, item):
         """Applies the effects of the item on the character."""
@@ -188,7 +202,7 @@ class Human(Character):
         # Initiates the super class.
         super(Human, self).__init__(name, 5, 2, spritesheet, weapon=weapon)
 
-        self.art_image = pygame.image.load(PATH_CHARACTERS + "art_image_hero.png")
+        self.art_image = assets.load(PATH_CHARACTERS + "art_image_hero.png")
 
         # Initiates the class's attributes.
         if not armor is None:
@@ -201,6 +215,17 @@ class Human(Character):
         else:
             self.inventory = abstract.Inventory()
 
+    def clone(self):
+        """Returns a copy of the character, having its own armor
+        and inventory.
+        """
+
+        clone = super(Human, self).clone()
+        clone.armor = copy.copy(self.armor)
+        clone.inventory = self.inventory.copy()
+
+        return clone
+
 
 class Olympian(Character):
     """Creates an Olympian-type character.
@@ -6,4 +6,4 @@ used to design and script the quests,
 to be used within the game.
 """
 
-__all__ = ["scripting"]
+__all__ = ["compiler", "runtime", "scripting"]
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a compiler of the quests, which compiles
+every quest only once. Compiled quests are kept in the memory
+and on the disk, next to their sources, until the sources change.
+"""
+
+from __future__ import with_statement
+
+__version__ = "0.1"
+
+import hashlib
+import marshal
+import os
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:
+    import imp
+    MAGIC_NUMBER = imp.get_magic()
+
+import Routines.packs as packs
+from Main.constants import *
+
+# Extensions of the quests' sources and of the compiled quests
+SOURCE_EXTENSION = ".src"
+COMPILED_EXTENSION = ".qc"
+
+# Length of the hash of a source, kept by its compiled quest
+HASH_LENGTH = 40
+
+
+def quest_name(map_, quest_no, zone=0, interior=0):
+    """Returns the name of a quest.
+
+    Parameters:
+
+    'map_' - name of the quest's map
+    'quest_no' - number of the quest
+    'zone' - number of the zone, 0 for the quest of the whole map
+    'interior' - number of the interior of a building, 0 for the zone
+    """
+
+    name = map_ + "_" + str(quest_no)
+
+    if not zone == 0:
+        # The quest for the specified zone.
+        name += "_" + str(zone)
+        if not interior == 0:
+            # The quest for the specified interior of a building.
+            name += "_" + str(interior)
+
+    return name
+
+
+class QuestCompiler(object):
+    """Compiles the quests of a directory into code objects.
+
+    The names of the existing quests are listed once, so asking
+    for a quest, which doesn't exist, doesn't touch the disk.
+    Names of the quests are case-insensitive.
+
+    Parameters:
+
+    'directory' - a path to the directory of the quests' sources
+    """
+
+    def __init__(self, directory=PATH_QUESTS):
+
+        self.directory = directory
+        self.compilations = 0           # Amount of the quests compiled
+
+        self.__manifest = None          # Quests' names keyed by upper names
+        self.__compiled = {}            # Code objects keyed by upper names
+
+    def __contains__(self, name):
+        return name.upper() in self.manifest
+
+    def __compile(self, name):
+        """Returns a compiled quest, reading it from the disk,
+        if it's been compiled from the same source already.
+        """
+
+        source_path = os.path.join(self.directory, name + SOURCE_EXTENSION)
+        compiled_path = os.path.join(self.directory, name + COMPILED_EXTENSION)
+
+        with packs.open_file(source_path, "rb") as source:
+            source = source.read().replace(b"\r\n", b"\n")
+
+        hash_ = hashlib.sha1(source).hexdigest().encode("ascii")
+        header = MAGIC_NUMBER + hash_
+
+        try:
+            with open(compiled_path, "rb") as compiled:
+                data = compiled.read()
+
+            if data[:len(header)] == header:
+                return marshal.loads(data[len(header):])
+        except (IOError, EOFError, ValueError, TypeError):
+            pass
+
+        code = compile(source, source_path, "exec")
+        self.compilations += 1
+
+        # The compiled quest is only an optimization,
+        # so it may fail to be written (i.e. if the quests are packed).
+        try:
+            with open(compiled_path, "wb") as compiled:
+                compiled.write(header + marshal.dumps(code))
+        except IOError:
+            pass
+
+        return code
+
+    @property
+    def manifest(self):
+        """Returns the names of the existing quests,
+        keyed by their upper-case names.
+        """
+
+        if self.__manifest is None:
+            self.__manifest = {}
+
+            for name in packs.list_files(self.directory):
+                base, extension = os.path.splitext(name)
+
+                if extension.lower() == SOURCE_EXTENSION:
+                    self.__manifest[base.upper()] = base
+
+        return self.__manifest
+
+    def clear(self):
+        """Forgets the names of the quests and the compiled quests."""
+
+        self.__manifest = None
+        self.__compiled.clear()
+
+    def get(self, name):
+        """Returns a compiled quest, or None if it doesn't exist.
+
+        Parameters:
+
+        'name' - name of the quest
+        """
+
+        key = name.upper()
+
+        if not key in self.__compiled:
+            if key in self.manifest:
+                self.__compiled[key] = self.__compile(self.manifest[key])
+            else:
+                self.__compiled[key] = None
+
+        return self.__compiled[key]
+
+
+# Game's quest compiler
+compiler = QuestCompiler()
+
+
+def get_quest(map_, quest_no, zone=0, interior=0):
+    """Returns a compiled quest of the game's quests,
+    or None if it doesn't exist.
+
+    Parameters:
+
+    'map_' - name of the quest's map
+    'quest_no' - number of the quest
+    'zone' - number of the zone, 0 for the quest of the whole map
+    'interior' - number of the interior of a building, 0 for the zone
+    """
+
+    return compiler.get(quest_name(map_, quest_no, zone, interior))
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
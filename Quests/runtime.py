@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a runtime of the quests' scripts,
+written as generators, which yield the conditions they wait for:
+
+    def cutscene():
+        move_unit(hero, 64, RIGHT)
+        yield wait_movement(hero)
+        yield wait_frames(30)
+        turn_unit(hero, DOWN)
+
+    run_script(cutscene())
+
+A script is resumed only when the condition it waits for is met,
+so waiting scripts cost nothing in the frames between.
+"""
+
+__version__ = "0.1"
+
+from abc import ABCMeta, abstractmethod
+from collections import deque
+
+import pygame
+
+# Signal sent when a dialog panel is closed
+DIALOG_CLOSED = "dialog_closed"
+
+
+class Wait(object):
+    """Abstract condition, which a script can wait for."""
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def start(self, runtime, resume):
+        """Arranges for a function to be called once,
+        when the condition is met.
+
+        Parameters:
+
+        'runtime' - the runtime of the waiting script
+        'resume' - a function to be called with the condition's value
+        """
+
+
+class WaitFrames(Wait):
+    """Waits for a number of frames.
+
+    Parameters:
+
+    'frames' - amount of frames to wait for
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def start(self, runtime, resume):
+        runtime.events.schedule(lambda: resume(None), self.frames)
+
+
+class WaitMovement(Wait):
+    """Waits until a unit finishes all of its movements.
+
+    Parameters:
+
+    'unit' - one of the game's units
+    """
+
+    def __init__(self, unit):
+        self.unit = unit
+
+    def start(self, runtime, resume):
+        runtime.movements.notify(self.unit, resume)
+
+
+class WaitRegion(Wait):
+    """Waits until a unit enters a region of the map.
+
+    Parameters:
+
+    'unit' - one of the game's units
+    'rect' - the region of the map
+    """
+
+    def __init__(self, unit, rect):
+        self.unit = unit
+        self.rect = pygame.Rect(rect)
+
+    def start(self, runtime, resume):
+        runtime.watch_region(self.unit, self.rect, resume)
+
+
+class WaitSignal(Wait):
+    """Waits for a signal (i.e. of a closed dialog).
+
+    Parameters:
+
+    'name' - name of the signal
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def start(self, runtime, resume):
+        runtime.watch_signal(self.name, resume)
+
+
+class QuestScript(object):
+    """A single running script of a quest.
+
+    Parameters:
+
+    'generator' - the script's generator
+    """
+
+    def __init__(self, generator):
+
+        self.generator = generator
+        self.finished = False
+        self.cancelled = False
+
+    def cancel(self):
+        """Stops the script, it won't be resumed anymore."""
+
+        self.cancelled = True
+
+
+class QuestRuntime(object):
+    """Runs the quests' scripts, resuming each of them
+    only after the condition it waits for is met.
+
+    Parameters:
+
+    'events' - scheduler of the game's events, used by timers
+    'movements' - scheduler of the units' movements
+    """
+
+    def __init__(self, events, movements):
+
+        self.events = events
+        self.movements = movements
+
+        self.__scripts = []             # Running scripts
+        self.__ready = deque()          # Scripts to be resumed and values
+        self.__regions = {}             # Awaited regions keyed by units
+        self.__signals = {}             # Awaited signals keyed by names
+
+    def __len__(self):
+        return len(self.__scripts)
+
+    def __resume(self, script, value=None):
+        """Runs a script until it waits for another condition."""
+
+        if script.cancelled or script.finished:
+            return
+
+        try:
+            condition = script.generator.send(value)
+        except StopIteration:
+            script.finished = True
+            self.__scripts.remove(script)
+            return
+
+        if not isinstance(condition, Wait):
+            script.finished = True
+            self.__scripts.remove(script)
+            raise TypeError("error! scripts have to yield wait conditions")
+
+        # Scripts are resumed within the next update,
+        # not within the code, which has met the condition.
+        condition.start(self,
+                        lambda value=None: self.__ready.append((script,
+                                                                 value)))
+
+    def clear(self):
+        """Stops all the scripts."""
+
+        for script in self.__scripts:
+            script.cancel()
+
+        self.__scripts = []
+        self.__ready.clear()
+        self.__regions = {}
+        self.__signals = {}
+
+    def moved(self, unit):
+        """Resumes the scripts waiting for a unit, which has just moved,
+        to enter their regions.
+
+        Parameters:
+
+        'unit' - one of the game's units
+        """
+
+        waiting = self.__regions.get(unit)
+
+        if waiting is None:
+            return
+
+        for rect, resume in list(waiting):
+            if rect.colliderect(unit.rect):
+                waiting.remove((rect, resume))
+                resume(unit)
+
+        if len(waiting) == 0:
+            del self.__regions[unit]
+
+    def signal(self, name, value=None):
+        """Resumes the scripts waiting for a signal.
+
+        Parameters:
+
+        'name' - name of the signal
+        'value' - a value sent to the scripts
+        """
+
+        for resume in self.__signals.pop(name, []):
+            resume(value)
+
+    def start(self, generator):
+        """Starts a script, running it until it waits for a condition.
+        Returns the script, which can be used to stop it.
+
+        Parameters:
+
+        'generator' - the script's generator
+        """
+
+        script = QuestScript(generator)
+        self.__scripts.append(script)
+        self.__resume(script)
+
+        return script
+
+    def update(self):
+        """Resumes the scripts, whose conditions have been met."""
+
+        for i in range(len(self.__ready)):
+            script, value = self.__ready.popleft()
+            self.__resume(script, value)
+
+    def watch_region(self, unit, rect, resume):
+        """Calls a function, when a unit enters a region.
+
+        Parameters:
+
+        'unit' - one of the game's units
+        'rect' - the region of the map
+        'resume' - a function to be called with the unit
+        """
+
+        if rect.colliderect(unit.rect):
+            resume(unit)
+        else:
+            self.__regions.setdefault(unit, []).append((rect, resume))
+
+    def watch_signal(self, name, resume):
+        """Calls a function, when a signal is sent.
+
+        Parameters:
+
+        'name' - name of the signal
+        'resume' - a function to be called with the signal's value
+        """
+
+        self.__signals.setdefault(name, []).append(resume)
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -7,63 +7,114 @@ to be used when scripting quests.
 
 __version__ = "0.1"
 
-import copy
 import traceback
+import types
 
 import pygame
 from pygame.locals import *
 
 # Imports modules from local packages.
+import AI.pathfinding as pathfinding
 import Interface.windows as windows
 import Main.globals as globals_
 import NonStatic.characters as characters
 import NonStatic.creatures as creatures
+import Quests.runtime as runtime
+import Routines.registry as registry
 import Static.armors as armors
 import Static.maps as maps
 import Static.items as items
 import Static.weapons as weapons
 from Main.constants import *
 
+# Maps composed in advance by the loader, keyed by their names
+_preloaded_maps = {}
 
-def __check_if_collide(object_, distance, direction):
-    """Checks whether the specified object will collide
-    with any of the objects in the global variables
-    if traveled a given distance.
+# Prototypes of the loaded objects and their records,
+# keyed by the objects' types and names
+_prototypes = {}
+
+
+def _build_human(unit):
+    """Returns a Human made of its record."""
+
+    human = characters.Human(unit.get("name"),
+                             PATH_CHARACTERS + unit.get("image"),
+                             None,
+                             None,
+                             unit.get("weapon"))
+    human.defense = unit.get("defense")
+    human.speed = unit.get("speed")
+    human.agility = unit.get("agility")
+    human.skills = unit.get("skills")
+
+    return human
+
+
+def _build_map(tmp_map):
+    """Returns a map made of its record, using the map
+    composed in advance, if possible.
+    """
+
+    map_ = _preloaded_maps.pop(tmp_map.get("name"), None)
+
+    if map_ is None:
+        map_ = maps.Map(PATH_MAPS + tmp_map.get("config"),
+                        PATH_MAPS + tmp_map.get("textures"),
+                        tmp_map.get("zone"))
+
+    return map_
+
+
+def _build_olympian(unit):
+    """Returns an Olympian made of its record.
+    Titans are built the same way.
+    """
+
+    olympian = characters.Olympian(unit.get("name"),
+                                   PATH_CHARACTERS + unit.get("image"),
+                                   unit.get("weapon"))
+    olympian.defense = unit.get("defense")
+    olympian.speed = unit.get("speed")
+    olympian.agility = unit.get("agility")
+    olympian.skills = unit.get("skills")
+
+    return olympian
+
+
+# Functions building the objects of the records, keyed by their types
+_builders = {"Human": _build_human,
+             "Map": _build_map,
+             "Olympian": _build_olympian,
+             "Titan": _build_olympian}
+
+
+def _instantiate(kind, record):
+    """Returns an object made of its record. Objects which can be cloned
+    (i.e. characters) are built only once, as prototypes, and cloned
+    afterwards, so that the same objects spawned again by quests
+    share their images instead of being constructed again.
 
     Parameters:
 
-    'object_' - one of the game's object type (i.e. Character, Creature etc.)
-    'distance' - amount of pixels by which the object will be moved
-    'direction' - side towards which the object will be moved
+    'kind' - type of the object (i.e. Human, Map)
+    'record' - record of the object, found in the registry
     """
 
-    # Creates a new instance of the object.
-    tmp = copy.deepcopy(object_)
+    key = (kind, record.get("name"))
+    prototype = _prototypes.get(key)
 
-    # Simulates the movement of the object.
-    if direction == UP:
-        tmp.rect.y -= distance
-    elif direction == DOWN:
-        tmp.rect.y += distance
-    elif direction == LEFT:
-        tmp.rect.x -= distance
-    elif direction == RIGHT:
-        tmp.rect.x += distance
+    # Builds a prototype again, if the record has changed.
+    if prototype is None or not prototype[0] is record:
+        obj = _builders[kind](record)
 
-    # Checks whether the object will collide with any of the in-game objects.
-    if len(globals_.objects_in_game) > 0:
-        for obj in globals_.objects_in_game.sprites():
-            if pygame.sprite.collide_rect(tmp, obj):
-                return True
+        if not hasattr(obj, "clone"):
+            return obj
 
-    # Checks whether the object will collide with any of the in-game units.
-    if len(globals_.units_in_game) > 0:
-        for un in globals_.units_in_game.sprites():
-            if pygame.sprite.collide_rect(tmp, un):
-                return True
+        prototype = (record, obj)
+        _prototypes[key] = prototype
 
-    # Returns False if the object won't collide with anything.
-    return False
+    return prototype[1].clone()
 
 
 def _can_enter(unit):
@@ -75,48 +126,72 @@ def _can_enter(unit):
     'unit' - one of the game's units type (i.e. Character, Creature)
     """
 
-    for area in globals_.current_map.areas:
-        if pygame.Rect.colliderect(unit.rect, area[0]):
-            # Returns the number of the area if possible to enter.
-            return area[1]
+    # Looks the area up on the map's grid of entrance tiles.
+    number = globals_.current_map.layers.area_at(unit.rect)
+
+    if number > 0:
+        # Returns the number of the area if possible to enter.
+        return number
 
     # Returns False if impossible to enter.
     return False
 
 
 def _can_pick_up():
-    player = copy.deepcopy(globals_.player_unit)
-
-    for obj in globals_.objects_in_game.sprites():
-        player.rect.x += 1
-        if pygame.sprite.collide_rect(player, obj):
-            if player.direction == RIGHT:
-                if obj.pickable:
-                    return obj
-                else:
-                    break
-        player.rect.x -= 2
-        if pygame.sprite.collide_rect(player, obj):
-            if player.direction == LEFT:
-                if obj.pickable:
-                    return obj
-                else:
-                    break
-        player.rect.x += 1
-        player.rect.y -= 1
-        if pygame.sprite.collide_rect(player, obj):
-            if player.direction == UP:
-                if obj.pickable:
-                    return obj
-                else:
-                    break
-        player.rect.y += 2
-        if pygame.sprite.collide_rect(player, obj):
-            if player.direction == DOWN:
-                if obj.pickable:
-                    return obj
-                else:
-                    break
+    """Returns an object, which the player's unit is facing
+    and can pick up, or None if there is no such object.
+    Only the nearest object on the facing side can be picked up,
+    so the objects behind solid ones can't be reached.
+    """
+
+    player = globals_.player_unit
+    rect = player.rect
+
+    # Probes a pixel towards the side the player's unit is facing,
+    # measuring the distance to the near edges of the objects.
+    if player.direction == UP:
+        probe = rect.move(0, -1)
+        distance = lambda obj: rect.top - obj.rect.bottom
+    elif player.direction == DOWN:
+        probe = rect.move(0, 1)
+        distance = lambda obj: obj.rect.top - rect.bottom
+    elif player.direction == LEFT:
+        probe = rect.move(-1, 0)
+        distance = lambda obj: rect.left - obj.rect.right
+    elif player.direction == RIGHT:
+        probe = rect.move(1, 0)
+        distance = lambda obj: obj.rect.left - rect.right
+    else:
+        return None
+
+    objects = globals_.objects_in_game.query(probe)
+
+    if len(objects) == 0:
+        return None
+
+    # Solid objects come first among the equally distant ones.
+    nearest = min(objects, key=lambda obj: (distance(obj), obj.pickable))
+
+    if nearest.pickable:
+        return nearest
+
+    return None
+
+
+def _preload_map(name):
+    """Composes a map of the game's files in advance,
+    so that loading it from a quest doesn't take any time.
+
+    Parameters:
+
+    'name' - name of the map, specified in the data
+    """
+
+    if ("Map", name) in globals_.registry:
+        tmp_map = globals_.registry.get("Map", name)
+        _preloaded_maps[name] = maps.Map(PATH_MAPS + tmp_map.get("config"),
+                                         PATH_MAPS + tmp_map.get("textures"),
+                                         tmp_map.get("zone"))
 
 
 def _possible_to_move(unit, distance, direction, map_=None):
@@ -131,79 +206,77 @@ def _possible_to_move(unit, distance, direction, map_=None):
     'map_' - the Map object on which the unit is
     """
 
+    return _resolve_movement(unit, distance, direction, map_) == distance
+
+
+def _resolve_movement(unit, distance, direction, map_=None):
+    """Returns the furthest distance, up to a specified one,
+    which a unit can travel in a given direction without colliding
+    with the solid objects on the map, in-game objects or other units.
+
+    Parameters:
+
+    'unit' - one of the game's units type (i.e. Character, Creature)
+    'distance' - maximum amount of pixels by which the unit will be moved
+    'direction' - side towards the which the unit will be moved
+    'map_' - the Map object on which the unit is
+    """
+
     if map_ is None:
         map_ = globals_.current_map
 
-    # Unit's top side
-    top = (unit.rect.x,
-           unit.rect.x + unit.rect.width,
-           unit.rect.y - distance,
-           unit.rect.y)
-
-    # Unit's bottom side
-    bottom = (unit.rect.x,
-              unit.rect.x + unit.rect.width,
-              unit.rect.y + unit.rect.height,
-              unit.rect.y + unit.rect.height + distance)
-
-    # Unit's left side
-    left = (unit.rect.y,
-            unit.rect.y + unit.rect.height,
-            unit.rect.x - distance,
-            unit.rect.x)
-
-    # Unit's right side
-    right = (unit.rect.y,
-             unit.rect.y + unit.rect.height,
-             unit.rect.x + unit.rect.width,
-             unit.rect.x + unit.rect.width + distance)
-
-    # Checks if the unit collides with any of the in-game objects and units.
-    if __check_if_collide(unit, distance, direction):
-        return False
-    else:
-        # Checks if the unit will overlap any of the solid objects on the map.
-        try:
-
-            if direction == UP:
-                for x in range(top[0], top[1]):
-                    for y in range(top[2], top[3]):
-                        if map_.config.get_at((x, y)) == BLUE:
-                            if map_.config.get_at((x, y + \
-                                        int(unit.rect.height // 1.5) - \
-                                        distance)) == BLUE:
-                                return False
-                return True
-
-            elif direction == DOWN:
-                for x in range(bottom[0], bottom[1]):
-                    for y in range(bottom[2], bottom[3]):
-                        if map_.config.get_at((x, y)) == BLUE:
-                            if map_.config.get_at((x, y + \
-                                        int(unit.rect.height // 1.5))) == BLUE:
-                                return False
-                return True
-
-            elif direction == LEFT:
-                for y in range(left[0], left[1]):
-                    for x in range(left[2], left[3]):
-                        if map_.config.get_at((x, y)) == BLUE:
-                            if map_.config.get_at((x, y + \
-                                        int(unit.rect.height // 1.5))) == BLUE:
-                                return False
-                return True
-
-            elif direction == RIGHT:
-                for y in range(right[0], right[1]):
-                    for x in range(right[2], right[3]):
-                        if map_.config.get_at((x, y)) == BLUE:
-                            if map_.config.get_at((x, y + \
-                                        int(unit.rect.height // 1.5))) == BLUE:
-                                return False
-                return True
-
-        except IndexError:
-            return False
+    rect = unit.rect
+
+    # Distance to the pixels of the unit's feet,
+    # which have to be on a solid object as well to block the unit.
+    offset = int(rect.height // 1.5)
+    if direction == UP:
+        offset -= distance
+
+    # Limits the distance to the solid objects on the map.
+    distance = map_.free_distance(rect, direction, distance, offset)
+
+    if distance == 0:
+        return 0
+
+    # Area swept by the unit during the movement
+    if direction == UP:
+        swept = pygame.Rect(rect.x, rect.y - distance,
+                            rect.width, rect.height + distance)
+    elif direction == DOWN:
+        swept = pygame.Rect(rect.x, rect.y,
+                            rect.width, rect.height + distance)
+    elif direction == LEFT:
+        swept = pygame.Rect(rect.x - distance, rect.y,
+                            rect.width + distance, rect.height)
+    elif direction == RIGHT:
+        swept = pygame.Rect(rect.x, rect.y,
+                            rect.width + distance, rect.height)
+
+    # In-game objects and units in the way
+    sprites = globals_.objects_in_game.query(swept, unit) + \
+              globals_.units_in_game.query(swept, unit)
+
+    # Player's unit isn't kept in any of the groups.
+    player = globals_.player_unit
+    if not player is None and not player is unit \
+    and swept.colliderect(player.rect):
+        sprites.append(player)
+
+    # Limits the distance to the sprites in the way.
+    for sprite in sprites:
+        if direction == UP:
+            gap = rect.top - sprite.rect.bottom
+        elif direction == DOWN:
+            gap = sprite.rect.top - rect.bottom
+        elif direction == LEFT:
+            gap = rect.left - sprite.rect.right
+        elif direction == RIGHT:
+            gap = sprite.rect.left - rect.right
+
+        distance = max(0, min(distance, gap))
+
+    return distance
 
 
 def attack_character(character1, character2):
@@ -245,6 +318,33 @@ def can_move(unit, distance, direction):
             return False
 
 
+def chase_unit(unit, target=None):
+    """Makes a unit chase another unit across the map,
+    until the unit is stopped.
+
+    Parameters:
+
+    'unit' - one of the game's unit types (i.e. Character, Creature etc.)
+    'target' - one of the game's units to be chased,
+               player's unit if not specified
+    """
+
+    try:
+        if not isinstance(unit, characters.Character) \
+        and not isinstance(unit, creatures.Creature):
+            raise Exception("error! invalid 'unit' parameter")
+        elif not target is None \
+        and not isinstance(target, characters.Character) \
+        and not isinstance(target, creatures.Creature):
+            raise Exception("error! invalid 'target' parameter")
+        elif not unit in globals_.units_in_game:
+            raise Exception("error! the unit is not on the map")
+    except Exception as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        globals_.chasers[unit] = target
+
+
 def create_human(name, spritesheet,
                  armor=None, inventory=None, weapon=None):
     """Creates a new 'Human' object and returns a reference to its class.
@@ -321,205 +421,145 @@ def create_titan(name, spritesheet):
         windows.show_error(err, traceback.extract_stack()[-1])
 
 
-def event(code):
-    """Adds an event to the game's stack.
+def cancel_event(event_):
+    """Cancels an event scheduled by a quest.
 
-    Parameters
+    Parameters:
 
-    'code' - Python code to be executed
+    'event_' - an event returned by the 'event' function
     """
 
     try:
-        if not type(code) is str:
-            raise TypeError("error! 'code' parameter must be a string")
+        if not hasattr(event_, "cancel"):
+            raise TypeError("error! invalid 'event_' parameter")
     except TypeError as err:
         windows.show_error(err, traceback.extract_stack()[-1])
     else:
-        globals_.events.append(code)
+        globals_.events.cancel(event_)
 
 
-def load_human(name):
-    """Loads a Human from data and returns a reference to is class.
+def event(code, delay=1, interval=1, watch=None):
+    """Schedules an event and returns it, so it can be cancelled.
+    The event's code is compiled only once and runs within
+    the namespace of the current quest.
+
+    As the events of the game's stack used to, the event is executed
+    every frame by default, until it's cancelled.
 
     Parameters
 
-    'name' - name of the unit, specified in the data
+    'code' - Python code to be executed
+    'delay' - amount of frames, after which the event is executed first
+    'interval' - amount of frames between the executions
+                 of a repeating event, None for an event executed once
+    'watch' - Python expression, the event is executed every time
+              its value changes, instead of after a delay
     """
 
-    class FileError(Exception):
-        pass
-
-    class UnitNameError(Exception):
-        pass
-
     try:
-        if not type(name) is str or len(name) == 0:
-            raise TypeError("error! incorrect 'name' parameter")
-
-        unit = None
-        for first in globals_.game_files:
-            if first == "Human":
-                for second in globals_.game_files[first]:
-                    if second.get("name") == name:
-                        unit = second
-                        break
-                else:
-                    raise UnitNameError("error! '" + name + "' does not exist")
-                break
-        else:
-            raise FileError("error! 'data1.epic' file is corrupted")
-    except (FileError, TypeError, UnitNameError) as err:
+        if not type(code) is str:
+            raise TypeError("error! 'code' parameter must be a string")
+        elif not type(delay) is int or delay < 1:
+            raise TypeError("error! 'delay' parameter must be \
+                             a positive integer")
+        elif not interval is None and (not type(interval) is int \
+                                       or interval < 1):
+            raise TypeError("error! 'interval' parameter must be \
+                             a positive integer")
+        elif not watch is None and not type(watch) is str:
+            raise TypeError("error! 'watch' parameter must be a string")
+
+        return globals_.events.schedule(code, delay, interval, watch,
+                                        globals_.quest_namespace)
+    except (SyntaxError, TypeError) as err:
         windows.show_error(err, traceback.extract_stack()[-1])
-    else:
-        human = characters.Human(unit.get("name"),
-                                 PATH_CHARACTERS + unit.get("image"),
-                                 None,
-                                 None,
-                                 unit.get("weapon"))
-        human.defense = unit.get("defense")
-        human.speed = unit.get("speed")
-        human.agility = unit.get("agility")
-        human.skills = unit.get("skills")
 
-        return human
 
-
-def load_map(name):
-    """Loads a map from data and returns a reference to its class.
+def load_entity(kind, name):
+    """Loads an object of a given type from data
+    and returns a reference to its class.
 
     Parameters:
 
-    'name' - name of the map, specified in the data
+    'kind' - type of the object (i.e. Human, Map), specified in the data
+    'name' - name of the object, specified in the data
     """
 
-    class FileError(Exception):
-        pass
-
-    class UnitNameError(Exception):
-        pass
-
     try:
         if not type(name) is str or len(name) == 0:
             raise TypeError("error! incorrect 'name' parameter")
-
-        tmp_map = None
-        for first in globals_.game_files:
-            if first == "Map":
-                for second in globals_.game_files[first]:
-                    if second.get("name") == name:
-                        tmp_map = second
-                        break
-                else:
-                    raise UnitNameError("error! '" + name + "' does not exist")
-                break
-        else:
-            raise FileError("error! 'data1.epic' file is corrupted")
-    except (FileError, TypeError, UnitNameError) as err:
+        elif not kind in _builders:
+            raise TypeError("error! '" + str(kind) + "' can't be loaded")
+        elif globals_.registry is None:
+            raise registry.RegistryError("error! 'data1.epic' file \
+                                          has not been loaded")
+
+        # Finds the object's record in constant time.
+        record = globals_.registry.get(kind, name)
+    except (registry.RegistryError, TypeError) as err:
         windows.show_error(err, traceback.extract_stack()[-1])
     else:
-        map_ = maps.Map(PATH_MAPS + tmp_map.get("config"),
-                        PATH_MAPS + tmp_map.get("textures"),
-                        tmp_map.get("zone"))
-
-        return map_
+        return _instantiate(kind, record)
 
 
-def load_olympian(name):
-    """Loads an Olympian from data and returns a reference to is class.
+def load_human(name):
+    """Loads a Human from data and returns a reference to is class.
 
     Parameters
 
     'name' - name of the unit, specified in the data
     """
 
-    class FileError(Exception):
-        pass
+    return load_entity("Human", name)
 
-    class UnitNameError(Exception):
-        pass
 
-    try:
-        if not type(name) is str or len(name) == 0:
-            raise TypeError("error! incorrect 'name' parameter")
+def load_map(name):
+    """Loads a map from data and returns a reference to its class.
 
-        unit = None
-        for first in globals_.game_files:
-            if first == "Olympian":
-                for second in globals_.game_files[first]:
-                    if second.get("name") == name:
-                        unit = second
-                        break
-                else:
-                    raise UnitNameError("error! '" + name + "' does not exist")
-                break
-        else:
-            raise FileError("error! 'data1.epic' file is corrupted")
-    except (FileError, TypeError, UnitNameError) as err:
-        windows.show_error(err, traceback.extract_stack()[-1])
-    else:
-        olympian = characters.Olympian(unit.get("name"),
-                                       PATH_CHARACTERS + unit.get("image"),
-                                       unit.get("weapon"))
-        olympian.defense = unit.get("defense")
-        olympian.speed = unit.get("speed")
-        olympian.agility = unit.get("agility")
-        olympian.skills = unit.get("skills")
+    Parameters:
 
-        return olympian
+    'name' - name of the map, specified in the data
+    """
 
+    return load_entity("Map", name)
 
-def load_titan(name):
-    """Loads a Titan from data and returns a reference to is class.
+
+def load_olympian(name):
+    """Loads an Olympian from data and returns a reference to is class.
 
     Parameters
 
     'name' - name of the unit, specified in the data
     """
 
-    class FileError(Exception):
-        pass
+    return load_entity("Olympian", name)
 
-    class UnitNameError(Exception):
-        pass
 
-    try:
-        if not type(name) is str or len(name) == 0:
-            raise TypeError("error! incorrect 'name' parameter")
+def load_titan(name):
+    """Loads a Titan from data and returns a reference to is class.
 
-        unit = None
-        for first in globals_.game_files:
-            if first == "Titan":
-                for second in globals_.game_files[first]:
-                    if second.get("name") == name:
-                        unit = second
-                        break
-                else:
-                    raise UnitNameError("error! '" + name + "' does not exist")
-                break
-        else:
-            raise FileError("error! 'data1.epic' file is corrupted")
-    except (FileError, TypeError, UnitNameError) as err:
-        windows.show_error(err, traceback.extract_stack()[-1])
-    else:
-        titan = characters.Olympian(unit.get("name"),
-                                    PATH_CHARACTERS + unit.get("image"),
-                                    unit.get("weapon"))
-        titan.defense = unit.get("defense")
-        titan.speed = unit.get("speed")
-        titan.agility = unit.get("agility")
-        titan.skills = unit.get("skills")
+    Parameters
 
-        return titan
+    'name' - name of the unit, specified in the data
+    """
+
+    return load_entity("Titan", name)
 
 
-def move_unit(unit, distance, direction):
+def move_unit(unit, distance, direction, callback=None):
     """Moves a unit a specified distance in a given direction.
 
+    If the unit is already moving, the movement is queued after
+    the unit's current one. The unit stops earlier, if it is blocked.
+
     Parameters:
 
     'unit' - one of the game's unit types (i.e. Character, Creature etc.)
     'distance' - amount of pixels by which the object will be moved
     'direction' - side towards which the object will be moved
+    'callback' - an optional function to be called with the unit
+                 and whether it has been blocked (the unit's further
+                 movements are dropped then), after the movement is over
     """
 
     try:
@@ -532,19 +572,15 @@ def move_unit(unit, distance, direction):
             raise Exception("error! direction parameter must be an integer")
         elif not unit in globals_.units_in_game:
             raise Exception("error! the unit is not on the map")
+        elif not callback is None and not callable(callback):
+            raise Exception("error! 'callback' parameter must be a function")
     except Exception as err:
         windows.show_error(err, traceback.extract_stack()[-1])
     else:
-        if _possible_to_move(unit, distance, direction):
-            if direction == UP or direction == DOWN:
-                globals_.units_to_move.append([unit, distance, direction,
-                                               unit.rect.y])
-            elif direction == LEFT or direction == RIGHT:
-                globals_.units_to_move.append([unit, distance, direction,
-                                               unit.rect.x])
+        globals_.movements.schedule(unit, distance, direction, callback)
 
 
-def move_unit_steps(unit, steps, direction):
+def move_unit_steps(unit, steps, direction, callback=None):
     """Moves a unit a specified amount of steps in a given direction.
 
     Parameters:
@@ -552,6 +588,9 @@ def move_unit_steps(unit, steps, direction):
     'unit' - one of the game's unit types (i.e. Character, Creature etc.)
     'distance' - amount of steps by which the object will be moved
     'direction' - side towards which the object will be moved
+    'callback' - an optional function to be called with the unit
+                 and whether it has been blocked (the unit's further
+                 movements are dropped then), after the movement is over
     """
 
     try:
@@ -564,16 +603,67 @@ def move_unit_steps(unit, steps, direction):
             raise Exception("error! 'direction' parameter must be an integer")
         elif not unit in globals_.units_in_game:
             raise Exception("error! the unit is not on the map")
+        elif not callback is None and not callable(callback):
+            raise Exception("error! 'callback' parameter must be a function")
     except Exception as err:
         windows.show_error(err, traceback.extract_stack()[-1])
     else:
-        if _possible_to_move(unit, steps * unit.speed, direction):
-            if direction == UP or direction == DOWN:
-                globals_.units_to_move.append([unit, steps * unit.speed,
-                                               direction, unit.rect.y])
-            elif direction == LEFT or direction == RIGHT:
-                globals_.units_to_move.append([unit, steps * unit.speed,
-                                               direction, unit.rect.x])
+        globals_.movements.schedule(unit, steps * unit.speed, direction,
+                                    callback)
+
+
+def move_unit_to(unit, x, y, callback=None):
+    """Moves a unit to the specified coordinates on the map,
+    walking around the solid objects on the way.
+    The unit's current movements are cancelled first.
+
+    Returns False if the coordinates can't be reached.
+
+    Parameters:
+
+    'unit' - one of the game's unit types (i.e. Character, Creature etc.)
+    'x' - x-coordinate on the map
+    'y' - y-coordinate on the map
+    'callback' - an optional function to be called with the unit
+                 and whether it has been blocked (the unit's further
+                 movements are dropped then), after the movement is over
+    """
+
+    try:
+        if not isinstance(unit, characters.Character) \
+        and not isinstance(unit, creatures.Creature):
+            raise Exception("error! invalid 'unit' parameter")
+        elif not type(x) is int or not x in range(0, 1025 - unit.rect.width):
+            raise Exception("error! invalid 'x' parameter")
+        elif not type(y) is int or not y in range(0, 769 - unit.rect.height):
+            raise Exception("error! invalid 'y' parameter")
+        elif not unit in globals_.units_in_game:
+            raise Exception("error! the unit is not on the map")
+        elif not callback is None and not callable(callback):
+            raise Exception("error! 'callback' parameter must be a function")
+    except Exception as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        # The legs lead from the unit's current position,
+        # so they mustn't be queued after other movements.
+        globals_.movements.cancel(unit)
+
+        legs = pathfinding.find_legs(globals_.current_map, unit, x, y)
+
+        if legs is None:
+            return False
+        elif len(legs) == 0 and not callback is None:
+            callback(unit, False)
+
+        # Calls the callback only after the last leg.
+        for i, (distance, direction) in enumerate(legs):
+            if i == len(legs) - 1:
+                globals_.movements.schedule(unit, distance, direction,
+                                            callback)
+            else:
+                globals_.movements.schedule(unit, distance, direction)
+
+        return True
 
 
 def place_item(item_id, x, y):
@@ -629,6 +719,28 @@ def remove_item(item):
             globals_.objects_in_game.remove(item)
 
 
+def run_script(script):
+    """Starts a script of a quest and returns it, so it can be stopped.
+
+    A script is a generator, which yields the conditions it waits for
+    (i.e. 'yield wait_movement(unit)'). It runs until its first
+    condition at once and is resumed only when a condition is met.
+
+    Parameters:
+
+    'script' - a generator, made by calling a function
+               containing 'yield' statements
+    """
+
+    try:
+        if not isinstance(script, types.GeneratorType):
+            raise TypeError("error! 'script' parameter must be a generator")
+
+        return globals_.quests.start(script)
+    except Exception as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+
+
 def say(character, text_id):
     try:
         raise NotImplementedError("error! 'say' function \
@@ -670,6 +782,11 @@ def set_map(map_):
     except Exception as err:
         windows.show_error(err, traceback.extract_stack()[-1])
     else:
+        # Releases the store of the previous map's images.
+        if not globals_.current_map is None \
+        and not globals_.current_map is map_:
+            globals_.current_map.close()
+
         globals_.current_map = map_
 
 
@@ -712,6 +829,42 @@ def set_player_character(character):
         globals_.player_unit = character
 
 
+def stop_unit(unit):
+    """Stops all the movements of a unit, including chasing.
+
+    Parameters:
+
+    'unit' - one of the game's unit types (i.e. Character, Creature etc.)
+    """
+
+    try:
+        if not isinstance(unit, characters.Character) \
+        and not isinstance(unit, creatures.Creature):
+            raise Exception("error! invalid 'unit' parameter")
+    except Exception as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        globals_.chasers.pop(unit, None)
+        globals_.movements.cancel(unit)
+
+
+def stop_script(script):
+    """Stops a script started by the 'run_script' function.
+
+    Parameters:
+
+    'script' - a script returned by the 'run_script' function
+    """
+
+    try:
+        if not isinstance(script, runtime.QuestScript):
+            raise TypeError("error! invalid 'script' parameter")
+    except TypeError as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        script.cancel()
+
+
 def turn_unit(unit, direction):
     """Turns a unit to a specified direction.
 
@@ -763,3 +916,72 @@ def units_in_range(unit1, unit2, range_=48):
             return True
         else:
             return False
+
+
+def wait_dialog():
+    """Returns a condition of a script, met when the dialog panel
+    is closed.
+    """
+
+    return runtime.WaitSignal(runtime.DIALOG_CLOSED)
+
+
+def wait_frames(frames):
+    """Returns a condition of a script, met after a number of frames.
+
+    Parameters:
+
+    'frames' - amount of frames to wait for
+    """
+
+    try:
+        if not type(frames) is int or frames < 1:
+            raise TypeError("error! 'frames' parameter must be \
+                             a positive integer")
+    except TypeError as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        return runtime.WaitFrames(frames)
+
+
+def wait_movement(unit):
+    """Returns a condition of a script, met when a unit
+    finishes all of its movements.
+
+    Parameters:
+
+    'unit' - one of the game's unit types (i.e. Character, Creature etc.)
+    """
+
+    try:
+        if not isinstance(unit, characters.Character) \
+        and not isinstance(unit, creatures.Creature):
+            raise TypeError("error! invalid 'unit' parameter")
+    except TypeError as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        return runtime.WaitMovement(unit)
+
+
+def wait_region(unit, x, y, width, height):
+    """Returns a condition of a script, met when a unit
+    enters a region of the map.
+
+    Parameters:
+
+    'unit' - one of the game's unit types (i.e. Character, Creature etc.)
+    'x', 'y' - position of the region's top left corner
+    'width', 'height' - dimensions of the region
+    """
+
+    try:
+        if not isinstance(unit, characters.Character) \
+        and not isinstance(unit, creatures.Creature):
+            raise TypeError("error! invalid 'unit' parameter")
+        elif not all([type(value) is int
+                      for value in (x, y, width, height)]):
+            raise TypeError("error! region's parameters must be integers")
+    except TypeError as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
+    else:
+        return runtime.WaitRegion(unit, (x, y, width, height))
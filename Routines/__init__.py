@@ -6,4 +6,5 @@ to be used by the game loop or outside the game,
 for common purposes.
 """
 
-__all__ = ("cpu_requests", "game_utils")
+__all__ = ("assets", "cpu_requests", "events", "game_utils", "loading",
+           "movement", "packs", "registry", "spatial", "startup")
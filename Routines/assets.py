@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a shared cache of the game's images,
+so that every image is read from the disk only once.
+"""
+
+__version__ = "0.1"
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+import Routines.packs as packs
+
+# Maximum memory used by the recently loaded images in bytes
+ASSET_CACHE_BUDGET = 32 * 1024 * 1024
+
+
+def _surface_size(surface):
+    """Returns the approximate memory used by a surface in bytes."""
+
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+
+class FrameTable(object):
+    """Frames of a spritesheet, sliced once into separate surfaces,
+    so that animating a sprite only swaps its image.
+
+    The frames are shared, so they mustn't be drawn on.
+
+    Parameters:
+
+    'spritesheet' - a spritesheet image
+    'columns' - amount of the frames in a row of the spritesheet
+    'rows' - amount of the rows of the spritesheet
+    'colorkey' - an optional colour to be made transparent
+    """
+
+    def __init__(self, spritesheet, columns, rows, colorkey=None):
+
+        self.width = spritesheet.get_width() // columns
+        self.height = spritesheet.get_height() // rows
+
+        self.__frames = []      # Rows of the frames
+
+        for row in range(rows):
+            frames = []
+
+            for column in range(columns):
+                frame = spritesheet.subsurface((column * self.width,
+                                                row * self.height,
+                                                self.width,
+                                                self.height)).copy()
+
+                if not colorkey is None:
+                    frame.set_colorkey(colorkey)
+
+                frames.append(frame)
+
+            self.__frames.append(frames)
+
+    def frame(self, row, column):
+        """Returns a single frame.
+
+        Parameters:
+
+        'row' - number of the frame's row
+        'column' - number of the frame's column
+        """
+
+        return self.__frames[row][column]
+
+
+class AssetManager(object):
+    """Loads images once and shares them between all of their users.
+
+    Images are converted to the display's pixel format, as soon as
+    the display is set, so that blitting them doesn't need conversion.
+    An image is kept as long as anything in the game refers to it.
+    Recently loaded images are also kept, until their total size
+    exceeds the memory budget, so that images released for a moment
+    (i.e. of a closed menu) don't have to be read again.
+
+    The images are shared, so they mustn't be drawn on,
+    only blitted onto other surfaces.
+
+    Parameters:
+
+    'budget' - maximum memory used by the recently loaded images in bytes
+    """
+
+    def __init__(self, budget=ASSET_CACHE_BUDGET):
+
+        self.budget = budget
+        self.size = 0
+        self.loads = 0                          # Amount of images read from the disk
+
+        self.__lock = threading.Lock()
+        self.__recent = OrderedDict()           # Recently loaded images
+        self.__shared = weakref.WeakValueDictionary()   # Images still in use
+        self.__converted = set()                # Keys of the converted images
+        self.__tables = weakref.WeakValueDictionary()   # Frame tables in use
+
+    def __contains__(self, key):
+        return key in self.__recent or key in self.__shared
+
+    def __len__(self):
+        return len(self.__shared)
+
+    def __convert(self, key, surface):
+        """Returns a surface converted to the display's pixel format,
+        or the surface itself, if the display isn't set yet.
+        """
+
+        if not key[2] or key in self.__converted \
+        or pygame.display.get_surface() is None:
+            return surface
+
+        # Keeps the per-pixel transparency of the images having it.
+        if surface.get_flags() & pygame.SRCALPHA:
+            surface = surface.convert_alpha()
+        else:
+            surface = surface.convert()
+
+        if not key[1] is None:
+            surface.set_colorkey(key[1])
+
+        self.__converted.add(key)
+
+        return surface
+
+    def __remember(self, key, surface):
+        """Marks an image as recently used, forgetting the least
+        recently used images, if the budget is exceeded.
+        """
+
+        if key in self.__recent:
+            self.size -= _surface_size(self.__recent.pop(key))
+
+        self.__recent[key] = surface
+        self.__shared[key] = surface
+        self.size += _surface_size(surface)
+
+        while self.size > self.budget and len(self.__recent) > 1:
+            self.size -= _surface_size(self.__recent.popitem(last=False)[1])
+
+    def clear(self):
+        """Forgets all the images. Images still in use remain valid."""
+
+        with self.__lock:
+            self.__recent.clear()
+            self.__shared.clear()
+            self.__converted.clear()
+            self.__tables.clear()
+            self.size = 0
+
+    def load(self, path, colorkey=None, convert=True):
+        """Returns a shared image, reading it from the disk
+        only if it isn't in use or in the cache.
+
+        Parameters:
+
+        'path' - a path to the image
+        'colorkey' - an optional colour to be made transparent
+        'convert' - whether to convert the image to the display's format,
+                    images whose colours have meanings (i.e. config images)
+                    shouldn't be converted
+        """
+
+        key = (path, colorkey, convert)
+
+        with self.__lock:
+            surface = self.__recent.get(key)
+
+            if surface is None:
+                surface = self.__shared.get(key)
+
+        if surface is None:
+            # Reads the image outside of the lock,
+            # so other images can be loaded meanwhile.
+            surface = packs.load_image(path)
+
+            if not colorkey is None:
+                surface.set_colorkey(colorkey)
+
+            with self.__lock:
+                self.loads += 1
+                self.__converted.discard(key)
+
+        with self.__lock:
+            surface = self.__convert(key, surface)
+            self.__remember(key, surface)
+
+        return surface
+
+    def load_frames(self, path, columns, rows, colorkey=None):
+        """Returns a shared frame table of a spritesheet,
+        slicing it only if it isn't in use.
+
+        Parameters:
+
+        'path' - a path to the spritesheet
+        'columns' - amount of the frames in a row of the spritesheet
+        'rows' - amount of the rows of the spritesheet
+        'colorkey' - an optional colour to be made transparent
+        """
+
+        key = (path, columns, rows, colorkey)
+
+        with self.__lock:
+            table = self.__tables.get(key)
+
+        if table is None:
+            table = FrameTable(self.load(path), columns, rows, colorkey)
+
+            with self.__lock:
+                self.__tables[key] = table
+
+        return table
+
+
+# Game's shared asset manager
+manager = AssetManager()
+
+
+def load(path, colorkey=None, convert=True):
+    """Returns a shared image loaded by the game's asset manager.
+
+    Parameters:
+
+    'path' - a path to the image
+    'colorkey' - an optional colour to be made transparent
+    'convert' - whether to convert the image to the display's format
+    """
+
+    return manager.load(path, colorkey, convert)
+
+
+def load_frames(path, columns, rows, colorkey=None):
+    """Returns a shared frame table loaded by the game's asset manager.
+
+    Parameters:
+
+    'path' - a path to the spritesheet
+    'columns' - amount of the frames in a row of the spritesheet
+    'rows' - amount of the rows of the spritesheet
+    'colorkey' - an optional colour to be made transparent
+    """
+
+    return manager.load_frames(path, columns, rows, colorkey)
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
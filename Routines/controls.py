@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains the state of the keys held by the player,
+which is polled once per frame instead of repeating key events.
+"""
+
+__version__ = "0.1"
+
+import pygame
+
+from Main.constants import *
+
+# Directions keyed by their keys
+DIRECTION_KEYS = {pygame.K_UP: UP,
+                  pygame.K_DOWN: DOWN,
+                  pygame.K_LEFT: LEFT,
+                  pygame.K_RIGHT: RIGHT}
+
+
+class HeldKeys(object):
+    """Keeps the direction keys held by the player, in the order
+    they've been pressed, so that the last one decides the direction.
+    Repeated presses of a held key are ignored.
+
+    Parameters:
+
+    'keys' - directions keyed by their keys
+    """
+
+    def __init__(self, keys=DIRECTION_KEYS):
+
+        self.keys = keys
+        self.__held = []        # Held keys, the last pressed at the end
+
+    def __contains__(self, key):
+        return key in self.__held
+
+    def __len__(self):
+        return len(self.__held)
+
+    def clear(self):
+        """Forgets all the held keys."""
+
+        self.__held = []
+
+    def press(self, key):
+        """Marks a key as held, if it's a direction key.
+
+        Parameters:
+
+        'key' - a pygame key constant
+        """
+
+        if key in self.keys and not key in self.__held:
+            self.__held.append(key)
+
+    def release(self, key):
+        """Marks a key as released.
+
+        Parameters:
+
+        'key' - a pygame key constant
+        """
+
+        if key in self.__held:
+            self.__held.remove(key)
+
+    def sync(self, pressed):
+        """Forgets the keys, which have been released, while their
+        events weren't managed (i.e. in a menu).
+
+        Parameters:
+
+        'pressed' - state of the keyboard (i.e. pygame.key.get_pressed())
+        """
+
+        self.__held = [key for key in self.__held if pressed[key]]
+
+    @property
+    def direction(self):
+        """Returns the direction of the last held key, IDLE if none."""
+
+        if len(self.__held) == 0:
+            return IDLE
+
+        return self.keys[self.__held[-1]]
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -7,59 +7,65 @@ to be used when dealing with CPU units.
 
 __version__ = "0.1"
 
+import traceback
+
 # Imports modules from local packages
+import AI.pathfinding as pathfinding
+import Interface.windows as windows
 import Main.globals as globals_
 import Quests.scripting as scripting
 from Main.constants import *
 
 
+def __chase_units():
+    """Sends chasing CPU units a tile closer to their targets."""
+
+    for unit, target in list(globals_.chasers.items()):
+        # Forgets the chasers and targets removed from the map.
+        if not unit in globals_.units_in_game \
+        or not target in (None, globals_.player_unit) \
+        and not target in globals_.units_in_game:
+            del globals_.chasers[unit]
+            continue
+
+        if target is None:
+            target = globals_.player_unit
+
+        # Lets the unit finish walking to the previous tile.
+        if target is None or unit in globals_.movements:
+            continue
+
+        # Looks up the step in the target's shared flow field.
+        distance, direction = pathfinding.find_step(globals_.current_map,
+                                                    unit, target)
+
+        if not direction == IDLE:
+            globals_.movements.schedule(unit, distance, direction)
+
+
 def __move_units():
     """Moves CPU units."""
 
-    if len(globals_.units_to_move) > 0:
-        for un in globals_.units_to_move:
-            if un[2] == UP and un[0].rect.y > un[3] - un[1]:
-                if un[0].rect.y - un[0].speed >= un[3] - un[1]:
-                    un[0].move(UP)
-                else:
-                    if scripting._possible_to_move(un[0], un[0].speed, UP):
-                        un[0].move(UP)
-            elif un[2] == DOWN and un[0].rect.y + un[0].rect.height \
-            < un[0].rect.height + un[3] + un[1]:
-                if un[0].rect.y + un[0].rect.height + un[0].speed \
-                <= un[0].rect.height + un[3] + un[1]:
-                    un[0].move(DOWN)
-                else:
-                    if scripting._possible_to_move(un[0], un[0].speed, DOWN):
-                        un[0].move(DOWN)
-            elif un[2] == LEFT and un[0].rect.x > un[3] - un[1]:
-                if un[0].rect.x - un[0].speed >= un[3] - un[1]:
-                    un[0].move(LEFT)
-                else:
-                    if scripting._possible_to_move(un[0], un[0].speed, LEFT):
-                        un[0].move(LEFT)
-            elif un[2] == RIGHT and un[0].rect.x + un[0].rect.width \
-            < un[0].rect.width + un[3] + un[1]:
-                if un[0].rect.x + un[0].rect.width + un[0].speed <= \
-                un[0].rect.width + un[3] + un[1]:
-                    un[0].move(RIGHT)
-                else:
-                    if scripting._possible_to_move(un[0], un[0].speed, RIGHT):
-                        un[0].move(RIGHT)
-            else:
-                un[0].stop()
-                globals_.units_to_move.remove(un)
+    globals_.movements.update(scripting._resolve_movement)
 
 
 def manage_events():
-    if len(globals_.events) > 0:
-        for event in globals_.events:
-            exec(event)
+    """Runs the quests' events due in the current frame
+    and resumes the quests' scripts, which have stopped waiting.
+    """
+
+    try:
+        globals_.events.update()
+        globals_.quests.update()
+    except Exception as err:
+        # Displays an error on the screen.
+        windows.show_error(err, traceback.extract_stack()[-1])
 
 
 def manage_units():
     """Manages all of the CPU units."""
 
+    __chase_units()
     __move_units()
 
 if __name__ == "__main__":
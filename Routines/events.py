@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a scheduler of the quests' events,
+which runs them after a delay, repeatedly or when a watched
+state of the game changes.
+
+Time is measured in frames. Timed events are kept on
+a hierarchical timer wheel, so that a frame only touches
+the events due in it, regardless of how many are waiting.
+
+Watched events aren't kept on the wheel. Their expressions
+are still evaluated every frame, so their cost grows with
+the amount of the watched events.
+"""
+
+__version__ = "0.1"
+
+# Amount of bits of a single wheel's slot numbers
+WHEEL_BITS = 6
+
+# Amount of slots of a single wheel
+WHEEL_SIZE = 1 << WHEEL_BITS
+
+# Amount of the wheels, the first one counts single frames
+WHEEL_LEVELS = 3
+
+# Delay in frames, above which events wait outside of the wheels
+WHEEL_RANGE = 1 << (WHEEL_BITS * WHEEL_LEVELS)
+
+# Value of a watched state, which hasn't been sampled yet
+UNSAMPLED = object()
+
+
+def _compile(code, mode):
+    """Returns a compiled code or the function itself."""
+
+    if callable(code):
+        return code
+
+    return compile(code, "<event>", mode)
+
+
+class ScheduledEvent(object):
+    """A single event of a scheduler, used as a handle to cancel it.
+
+    Parameters:
+
+    'code' - Python code or a function to be run
+    'due' - frame, in which the event is run first
+    'interval' - amount of frames between the runs of a repeating event,
+                 None for an event run only once
+    'watch' - Python expression or a function, whose value is watched,
+              None for a timed event
+    'namespace' - a dictionary, in which the code is run
+    """
+
+    __slots__ = ("code", "due", "interval", "watch", "namespace",
+                 "value", "cancelled")
+
+    def __init__(self, code, due=0, interval=None,
+                 watch=None, namespace=None):
+
+        self.code = _compile(code, "exec")
+        self.due = due
+        self.interval = interval
+        self.watch = None
+        self.namespace = namespace
+        self.value = UNSAMPLED          # Last sampled value of the state
+        self.cancelled = False
+
+        if not watch is None:
+            self.watch = _compile(watch, "eval")
+
+    def __evaluate(self, code, mode):
+        if callable(code):
+            return code()
+        elif mode == "eval":
+            return eval(code, self.namespace)
+
+        exec(code, self.namespace)
+
+    def cancel(self):
+        """Cancels the event. It's removed from its scheduler,
+        when it'd be run next time.
+        """
+
+        self.cancelled = True
+
+    def changed(self):
+        """Samples the watched state, returns whether it has changed
+        since the previous sample. The first sample is never a change.
+        """
+
+        value = self.__evaluate(self.watch, "eval")
+        changed = not self.value is UNSAMPLED and not value == self.value
+        self.value = value
+
+        return changed
+
+    def run(self):
+        """Runs the event's code."""
+
+        self.__evaluate(self.code, "exec")
+
+
+class EventScheduler(object):
+    """Runs the events of the quests, compiled once,
+    at the frames they're due in.
+    """
+
+    def __init__(self):
+
+        self.frame = 0                  # Current frame of the scheduler
+
+        self.__wheels = [[[] for slot in range(WHEEL_SIZE)]
+                         for level in range(WHEEL_LEVELS)]
+        self.__overflow = []            # Events beyond the wheels' range
+        self.__watched = []             # Events waiting for state changes
+        self.__size = 0                 # Amount of the timed events
+
+    def __len__(self):
+        return self.__size + len(self.__watched)
+
+    def __insert(self, event):
+        """Puts a timed event into the slot of its due frame,
+        on the wheel of the right resolution.
+        """
+
+        delay = event.due - self.frame
+
+        if delay >= WHEEL_RANGE:
+            self.__overflow.append(event)
+            return
+
+        level = 0
+        while delay >= 1 << (WHEEL_BITS * (level + 1)):
+            level += 1
+
+        slot = (event.due >> (WHEEL_BITS * level)) & (WHEEL_SIZE - 1)
+        self.__wheels[level][slot].append(event)
+
+    def __cascade(self):
+        """Moves the events of the coarser wheels, which become due
+        within the next wheel's turn, onto the finer wheels.
+        """
+
+        for level in range(1, WHEEL_LEVELS):
+            slot = (self.frame >> (WHEEL_BITS * level)) & (WHEEL_SIZE - 1)
+            events = self.__wheels[level][slot]
+            self.__wheels[level][slot] = []
+
+            for event in events:
+                self.__insert(event)
+
+            # Finer wheels only wrap when this one reaches its first slot.
+            if not slot == 0:
+                return
+
+        events = self.__overflow
+        self.__overflow = []
+
+        for event in events:
+            self.__insert(event)
+
+    def cancel(self, event):
+        """Cancels an event.
+
+        Parameters:
+
+        'event' - an event returned by the scheduler
+        """
+
+        event.cancel()
+
+    def clear(self):
+        """Removes all the events from the scheduler."""
+
+        self.__init__()
+
+    def schedule(self, code, delay=1, interval=None,
+                 watch=None, namespace=None):
+        """Adds an event to the scheduler. Returns the event,
+        which can be used to cancel it.
+
+        Parameters:
+
+        'code' - Python code or a function to be run
+        'delay' - amount of frames, after which the event is run first,
+                  at least 1
+        'interval' - amount of frames between the runs of a repeating event,
+                     None for an event run only once
+        'watch' - Python expression or a function, whose value is watched,
+                  the event is run every time the value changes
+                  (checked every frame), instead of being timed
+        'namespace' - a dictionary, in which the code is run
+        """
+
+        if namespace is None:
+            namespace = {}
+
+        event = ScheduledEvent(code, self.frame + max(1, delay),
+                               interval, watch, namespace)
+
+        if not watch is None:
+            # Samples the initial state of the watched event.
+            event.changed()
+            self.__watched.append(event)
+        else:
+            self.__insert(event)
+            self.__size += 1
+
+        return event
+
+    def update(self):
+        """Advances the scheduler by a single frame,
+        running the events due in it.
+        """
+
+        self.frame += 1
+
+        slot = self.frame & (WHEEL_SIZE - 1)
+        if slot == 0:
+            self.__cascade()
+
+        due = self.__wheels[0][slot]
+        self.__wheels[0][slot] = []
+
+        for event in due:
+            if event.cancelled:
+                self.__size -= 1
+                continue
+
+            event.run()
+
+            if event.interval is None or event.cancelled:
+                self.__size -= 1
+            else:
+                event.due = self.frame + max(1, event.interval)
+                self.__insert(event)
+
+        if len(self.__watched) > 0:
+            for event in list(self.__watched):
+                if event.cancelled:
+                    self.__watched.remove(event)
+                elif event.changed():
+                    event.run()
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -8,7 +8,6 @@ from __future__ import with_statement
 
 __version__ = "0.1"
 
-import copy
 import cPickle
 import os
 import sys
@@ -20,6 +19,8 @@ if __name__ == "__main__":
 # Imports modules from local packages.
 import Interface.windows as windows
 import Main.globals as globals_
+import Routines.packs as packs
+import Routines.registry as registry
 from Main.constants import *
 
 
@@ -38,33 +39,30 @@ def load_game_files():
         return files
 
 
-def load_game_quest(map_, quest_no, zone=0, interior=0):
-    """Loads and returns a single quest."""
-
-    path = map_ + "_" + str(quest_no)
+def load_registry():
+    """Loads game's files from 'data1.epic' and returns their registry.
+    The files are validated only if they've changed since the last time.
+    """
 
-    if not zone == 0:
-        # Loads a quest for the specified zone.
-        path += "_" + str(zone)
-        if not interior == 0:
-            # Loads a quest for the specified interior of a building.
-            path += "_" + str(interior)
+    path = PATH_DATA + "data1.epic"
 
     try:
-        # Reads the quest from the file.
-        with open(PATH_QUESTS + path + ".src") as data:
-            quest = copy.deepcopy(data.read())
-    except IOError:
-        return "pass"
+        with open(path, "rb") as data:
+            raw = data.read()
+
+        files = cPickle.loads(raw)
+        registry.validate_cached(files, registry.digest(raw), path)
+    except (IOError, registry.RegistryError) as err:
+        windows.show_error(err, traceback.extract_stack()[-1])
     else:
-        return str(quest)
+        return registry.DataRegistry(files)
 
 
 def load_dialogs(text_file):
 
     try:
         dialogs = {}
-        with open(PATH_TEXTS + text_file, "r") as fh:
+        with packs.open_file(PATH_TEXTS + text_file, "r") as fh:
             while True:
                 tmp = fh.readline()
 
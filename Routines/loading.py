@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a loader, which runs the tasks of a graph
+on a pool of worker threads, while the game loop keeps running.
+"""
+
+__version__ = "0.1"
+
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+# Amount of worker threads of a single loader
+WORKERS = 4
+
+# Time in seconds, for which a single update may run the main thread's tasks
+MAIN_BUDGET = 0.02
+
+# States of the tasks
+WAITING = 0
+RUNNING = 1
+FINISHED = 2
+
+
+class LoadingTask(object):
+    """A single task of a loader.
+
+    Parameters:
+
+    'name' - name of the task
+    'function' - a function to be called
+    'args' - arguments of the function
+    'depends' - names of the tasks, which have to be finished first
+    'main' - whether the task has to run on the main thread,
+             i.e. because it changes the game's state
+    """
+
+    __slots__ = ("name", "function", "args", "depends", "main", "state")
+
+    def __init__(self, name, function, args=(), depends=(), main=False):
+
+        self.name = name
+        self.function = function
+        self.args = args
+        self.depends = tuple(depends)
+        self.main = main
+        self.state = WAITING
+
+
+class Loader(object):
+    """Runs the tasks of a graph as soon as the tasks they depend on
+    are finished. Tasks not bound to the main thread run on a pool
+    of worker threads, so decoding of images and sounds overlaps,
+    and the whole graph takes about as long as its longest chain.
+
+    The main thread's tasks run, and errors of all the tasks are raised,
+    within the updates, which are called by the game loop.
+
+    Parameters:
+
+    'workers' - amount of worker threads
+    """
+
+    def __init__(self, workers=WORKERS):
+
+        self.results = {}                   # Results of the finished tasks
+
+        self.__workers = workers
+        self.__tasks = OrderedDict()        # Tasks keyed by their names
+        self.__queued = queue.Queue()       # Tasks for the worker threads
+        self.__finished = queue.Queue()     # Tasks finished by the workers
+        self.__threads = []
+
+    def __len__(self):
+        return len(self.__tasks)
+
+    def __ready(self, task):
+        """Checks whether all the tasks, which a task depends on,
+        are finished.
+        """
+
+        return task.state == WAITING and \
+            all([self.__tasks[name].state == FINISHED
+                 for name in task.depends])
+
+    def __work(self):
+        """Runs the tasks of the queue, until it gets None."""
+
+        while True:
+            task = self.__queued.get()
+
+            if task is None:
+                break
+
+            # Errors, even the exits after error windows, are passed
+            # to the main thread, so that they're raised by its update.
+            try:
+                result = (task, task.function(*task.args), None)
+            except BaseException as err:
+                result = (task, None, err)
+
+            self.__finished.put(result)
+
+    def __dispatch(self):
+        """Queues the worker tasks, which are ready to be run."""
+
+        for task in self.__tasks.values():
+            if not task.main and self.__ready(task):
+                task.state = RUNNING
+                self.__queued.put(task)
+
+    def __finish(self, task, result):
+        task.state = FINISHED
+        self.results[task.name] = result
+
+    def add(self, name, function, args=(), depends=(), main=False):
+        """Adds a task to the graph.
+
+        Parameters:
+
+        'name' - name of the task
+        'function' - a function to be called
+        'args' - arguments of the function
+        'depends' - names of the tasks, which have to be finished first
+        'main' - whether the task has to run on the main thread
+        """
+
+        for dependency in depends:
+            if not dependency in self.__tasks:
+                raise KeyError("error! task '" + dependency + "' is unknown")
+
+        self.__tasks[name] = LoadingTask(name, function, args, depends, main)
+
+    def start(self):
+        """Starts the worker threads and the tasks, which are ready."""
+
+        for i in range(self.__workers):
+            thread = threading.Thread(target=self.__work)
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+        self.__dispatch()
+
+    def stop(self):
+        """Stops the worker threads, after their current tasks."""
+
+        for thread in self.__threads:
+            self.__queued.put(None)
+
+        self.__threads = []
+
+    def update(self, budget=MAIN_BUDGET):
+        """Collects the tasks finished by the workers and runs
+        the main thread's tasks, which are ready, for a limited time.
+        Returns True if all the tasks are finished.
+
+        Parameters:
+
+        'budget' - time in seconds, after which no more of
+                   the main thread's tasks are started
+        """
+
+        start = time.time()
+
+        while True:
+            # Collects the results of the workers.
+            while True:
+                try:
+                    task, result, err = self.__finished.get_nowait()
+                except queue.Empty:
+                    break
+
+                if not err is None:
+                    self.stop()
+                    raise err
+
+                self.__finish(task, result)
+
+            self.__dispatch()
+
+            ready = [task for task in self.__tasks.values()
+                     if task.main and self.__ready(task)]
+
+            if len(ready) == 0 or time.time() - start > budget:
+                break
+
+            ready[0].state = RUNNING
+            self.__finish(ready[0], ready[0].function(*ready[0].args))
+
+        if self.done:
+            self.stop()
+
+        return self.done
+
+    def wait(self):
+        """Runs the whole graph, blocking until it's finished."""
+
+        if len(self.__threads) == 0:
+            self.start()
+
+        while not self.update():
+            time.sleep(0.001)
+
+    @property
+    def done(self):
+        """Returns whether all the tasks are finished."""
+
+        return self.finished == len(self.__tasks)
+
+    @property
+    def finished(self):
+        """Returns the amount of the finished tasks."""
+
+        return len([task for task in self.__tasks.values()
+                    if task.state == FINISHED])
+
+    @property
+    def progress(self):
+        """Returns the part of the finished tasks, from 0 to 1."""
+
+        if len(self.__tasks) == 0:
+            return 1.0
+
+        return self.finished / float(len(self.__tasks))
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
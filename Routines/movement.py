@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a scheduler,
+used to move CPU units across the map.
+"""
+
+__version__ = "0.1"
+
+from collections import deque
+
+
+class MovementJob(object):
+    """Movement of a single unit, made of one or more legs.
+
+    Parameters:
+
+    'unit' - one of the game's units to be moved
+    'distance' - amount of pixels to be traveled during the first leg
+    'direction' - side towards which the first leg leads
+    'callback' - an optional function to be called with the unit
+                 and whether it has been blocked, after the first leg
+                 is over
+    """
+
+    __slots__ = ("unit", "left", "direction", "callback", "legs", "slot",
+                 "waiters")
+
+    def __init__(self, unit, distance, direction, callback=None):
+
+        self.unit = unit
+        self.left = distance            # Pixels left to the end of the leg
+        self.direction = direction
+        self.callback = callback
+        self.legs = deque()             # Legs queued after the current one
+        self.slot = None                # Slot of the scheduler with the job
+        self.waiters = []               # Functions called after the job
+
+    def next_leg(self):
+        """Starts the next queued leg. Returns False if there is none."""
+
+        if len(self.legs) == 0:
+            return False
+
+        self.left, self.direction, self.callback = self.legs.popleft()
+
+        return True
+
+
+class MovementScheduler(object):
+    """Holds movement jobs of the units and advances all of them
+    in a single batch every frame.
+
+    Every unit has at most one job, kept in a slot of the scheduler.
+    Movements requested for a unit, which is already moving,
+    are queued as the next legs of its job. When a leg is blocked,
+    the unit stops and the rest of its legs are dropped.
+    """
+
+    def __init__(self):
+
+        self.__slots = []       # Jobs kept in slots, None for free slots
+        self.__free = []        # Numbers of the free slots
+        self.__jobs = {}        # Jobs keyed by their units
+
+    def __len__(self):
+        return len(self.__jobs)
+
+    def __contains__(self, unit):
+        return unit in self.__jobs
+
+    def __release(self, job):
+        """Frees the slot of a job."""
+
+        # Skips jobs, which have been removed already by a callback.
+        if not self.__jobs.get(job.unit) is job:
+            return
+
+        self.__slots[job.slot] = None
+        self.__free.append(job.slot)
+        del self.__jobs[job.unit]
+
+        for waiter in job.waiters:
+            waiter(job.unit)
+
+    def cancel(self, unit):
+        """Cancels all the movements of a unit, without calling callbacks.
+
+        Parameters:
+
+        'unit' - one of the game's units
+        """
+
+        if unit in self.__jobs:
+            self.__release(self.__jobs[unit])
+            unit.stop()
+
+    def clear(self):
+        """Removes all the jobs from the scheduler."""
+
+        self.__slots = []
+        self.__free = []
+        self.__jobs = {}
+
+    def notify(self, unit, function):
+        """Calls a function with a unit, after all of its movements
+        are over or cancelled, or at once if the unit isn't moving.
+
+        Parameters:
+
+        'unit' - one of the game's units
+        'function' - a function to be called with the unit
+        """
+
+        if unit in self.__jobs:
+            self.__jobs[unit].waiters.append(function)
+        else:
+            function(unit)
+
+    def schedule(self, unit, distance, direction, callback=None):
+        """Schedules a unit to travel a distance in a given direction.
+
+        Parameters:
+
+        'unit' - one of the game's units
+        'distance' - amount of pixels to be traveled
+        'direction' - side towards which the unit will be moved
+        'callback' - an optional function to be called with the unit
+                     and whether it has been blocked, after the movement
+                     is over
+        """
+
+        if unit in self.__jobs:
+            # Queues the movement after the unit's current one.
+            self.__jobs[unit].legs.append((distance, direction, callback))
+            return
+
+        job = MovementJob(unit, distance, direction, callback)
+
+        if len(self.__free) > 0:
+            job.slot = self.__free.pop()
+            self.__slots[job.slot] = job
+        else:
+            job.slot = len(self.__slots)
+            self.__slots.append(job)
+
+        self.__jobs[unit] = job
+
+    def update(self, resolve):
+        """Moves all the scheduled units by a single step.
+
+        Parameters:
+
+        'resolve' - a function returning the distance, up to a given one,
+                    which a unit can travel in a given direction
+        """
+
+        finished = []
+
+        for job in self.__slots:
+            if job is None:
+                continue
+
+            unit = job.unit
+
+            # Moves the unit as far as possible, but no further than its speed.
+            if job.left > 0:
+                step = resolve(unit, min(unit.speed, job.left), job.direction)
+            else:
+                step = 0
+
+            if step > 0:
+                unit.move(job.direction, step)
+                job.left -= step
+
+            # Ends the leg, if it is finished or blocked.
+            if step == 0 or job.left == 0:
+                finished.append((job, job.left > 0))
+
+        for job, blocked in finished:
+            # Skips the jobs cancelled by the callbacks called before.
+            if not self.__jobs.get(job.unit) is job:
+                continue
+
+            callbacks = [job.callback]
+
+            # The queued legs lead from the end of the blocked one,
+            # which the unit hasn't reached, so they're dropped.
+            if blocked:
+                callbacks.extend([leg[2] for leg in job.legs])
+                job.legs.clear()
+
+            if not job.next_leg():
+                job.unit.stop()
+                self.__release(job)
+
+            for callback in callbacks:
+                if not callback is None:
+                    callback(job.unit, blocked)
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -0,0 +1,462 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a pack of the game's data files,
+which replaces reading and decoding every file separately.
+
+A pack begins with a header, followed by an index of entries
+and the entries' data. Images are kept as raw pixels, so surfaces
+are made directly from the memory-mapped pack, without decoding.
+Other files are kept either as they are or compressed.
+
+Files are looked up by their paths relative to the data directory,
+so the paths built from the PATH_* constants work with and without
+the pack. Files missing from the pack, or changed on the disk
+since the pack has been built, are read from the disk. Changed files
+are looked for only once, when the pack is opened.
+"""
+
+from __future__ import with_statement
+
+__version__ = "0.1"
+
+import io
+import mmap
+import os
+import struct
+import zlib
+
+import pygame
+
+from Main.constants import *
+
+# Name of the pack within the data directory
+PACK_NAME = "assets.pack"
+
+# Identifies pack files
+MAGIC = b"EPICPAK2"
+
+# Magic and amount of entries
+HEADER = struct.Struct("<8sI")
+
+# Kind, pixel format, width, height, name's length, offset, length,
+# size of the original data and modification time of the source file
+# of a single entry
+ENTRY = struct.Struct("<BBHHHQIId")
+
+# Kinds of the entries
+RAW = 0
+COMPRESSED = 1
+PIXELS = 2
+
+# Pixel formats of the images
+FORMATS = ("RGB", "RGBA")
+
+# Extensions of the images to be kept as raw pixels
+IMAGES = (".bmp", ".png")
+
+# Extensions of the files kept as they are, being compressed already
+# or read directly from the pack
+UNCOMPRESSED = (".ogg", ".zones")
+
+
+class PackError(Exception):
+    pass
+
+
+def _name(path, root=None):
+    """Returns a path relative to the data directory, with '/' separators,
+    or None if the path lies outside of it.
+    """
+
+    if root is None:
+        root = PATH_DATA
+
+    name = os.path.relpath(os.path.normpath(path), os.path.normpath(root))
+
+    if name.startswith(os.pardir):
+        return None
+
+    return name.replace(os.sep, "/")
+
+
+def _view(data, offset, length):
+    """Returns a part of the data without copying it."""
+
+    try:
+        return memoryview(data)[offset:offset + length]
+    except TypeError:
+        # Older versions of Python only support the old buffer protocol.
+        return buffer(data, offset, length)
+
+
+def build(path, files, root=None):
+    """Builds a pack from a list of files.
+
+    Parameters:
+
+    'path' - a path to the pack to be created
+    'files' - a list of paths to the files to be packed
+    'root' - the directory, which the names of the files are relative to
+    """
+
+    entries = []
+
+    for file_path in files:
+        name = _name(file_path, root)
+        extension = os.path.splitext(file_path)[1].lower()
+
+        if name is None:
+            raise PackError("error! '" + file_path + "' is not a data file")
+
+        if extension in IMAGES:
+            # Decodes the image once, keeping its per-pixel transparency.
+            image = pygame.image.load(file_path)
+            format_ = 1 if image.get_flags() & pygame.SRCALPHA else 0
+            data = pygame.image.tostring(image, FORMATS[format_])
+
+            entries.append((name, PIXELS, format_, image.get_size(), data,
+                            len(data), os.path.getmtime(file_path)))
+        else:
+            with open(file_path, "rb") as source:
+                data = source.read()
+
+            compressed = zlib.compress(data, 9)
+
+            if extension in UNCOMPRESSED or len(compressed) >= len(data):
+                entries.append((name, RAW, 0, (0, 0), data, len(data),
+                                os.path.getmtime(file_path)))
+            else:
+                entries.append((name, COMPRESSED, 0, (0, 0), compressed,
+                                len(data), os.path.getmtime(file_path)))
+
+    names = [entry[0].encode("utf-8") for entry in entries]
+    offset = HEADER.size + ENTRY.size * len(entries) + \
+             sum([len(name) for name in names])
+
+    # Writes to a temporary file first, so that a broken pack is never used.
+    with open(path + ".tmp", "wb") as pack:
+        pack.write(HEADER.pack(MAGIC, len(entries)))
+
+        for name, entry in zip(names, entries):
+            pack.write(ENTRY.pack(entry[1], entry[2], entry[3][0],
+                                  entry[3][1], len(name), offset,
+                                  len(entry[4]), entry[5], entry[6]))
+            pack.write(name)
+            offset += len(entry[4])
+
+        for entry in entries:
+            pack.write(entry[4])
+
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(path + ".tmp", path)
+
+
+class AssetPack(object):
+    """Reads files from a memory-mapped pack.
+
+    Parameters:
+
+    'path' - a path to the pack
+    'root' - the directory, which the names of the files are relative to
+    'check' - whether to look for the files changed on the disk
+              since the pack has been built
+    """
+
+    def __init__(self, path, root=None, check=True):
+
+        with open(path, "rb") as pack:
+            self.__data = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.__root = root
+
+        magic, amount = HEADER.unpack(self.__data[:HEADER.size])
+
+        if not magic == MAGIC:
+            raise PackError("error! '" + path + "' is not an asset pack")
+
+        self.__entries = {}     # Entries keyed by the files' names
+        self.__stale = set()    # Names of the files changed on the disk
+
+        position = HEADER.size
+        for i in range(amount):
+            entry = ENTRY.unpack(self.__data[position:position + ENTRY.size])
+            position += ENTRY.size
+
+            name = self.__data[position:position + entry[4]].decode("utf-8")
+            position += entry[4]
+
+            self.__entries[name] = entry
+
+        if check:
+            directory = PATH_DATA if root is None else root
+
+            for name, entry in self.__entries.items():
+                try:
+                    mtime = os.path.getmtime(os.path.join(directory, name))
+                except OSError:
+                    continue
+
+                if mtime > entry[8]:
+                    self.__stale.add(name)
+
+    def __contains__(self, path):
+        return _name(path, self.__root) in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __entry(self, path):
+        entry = self.__entries.get(_name(path, self.__root))
+
+        if entry is None:
+            raise PackError("error! '" + path + "' is not in the pack")
+
+        return entry
+
+    def current(self, path):
+        """Returns whether the pack keeps a file, which hasn't been
+        changed on the disk since the pack has been built.
+        Files, which exist only in the pack, are always current.
+
+        Parameters:
+
+        'path' - a path to the file
+        """
+
+        name = _name(path, self.__root)
+
+        return name in self.__entries and not name in self.__stale
+
+    def listdir(self, directory):
+        """Returns the names of the files, which the pack keeps
+        directly within a directory.
+
+        Parameters:
+
+        'directory' - a path to the directory
+        """
+
+        prefix = _name(directory, self.__root)
+
+        if prefix is None:
+            return []
+
+        prefix = prefix.rstrip("/") + "/"
+
+        return [name[len(prefix):] for name in self.__entries
+                if name.startswith(prefix) and not "/" in name[len(prefix):]]
+
+    def buffer(self, path):
+        """Returns the data of a file kept as it is, without copying it.
+
+        Parameters:
+
+        'path' - a path to the file
+        """
+
+        kind, format_, width, height, size, offset, length, original, \
+            mtime = self.__entry(path)
+
+        if not kind == RAW:
+            raise PackError("error! '" + path + "' is not kept as it is")
+
+        return _view(self.__data, offset, length)
+
+    def image(self, path, copy=False):
+        """Returns a surface made from the pixels in the pack,
+        without decoding them.
+
+        The surface uses the read-only pack's memory, so it may only
+        be drawn onto other surfaces, unless a copy is requested.
+
+        Parameters:
+
+        'path' - a path to the image
+        'copy' - whether to copy the pixels, so that the surface
+                 may be drawn on
+        """
+
+        kind, format_, width, height, size, offset, length, original, \
+            mtime = self.__entry(path)
+
+        if not kind == PIXELS:
+            raise PackError("error! '" + path + "' is not an image")
+
+        surface = pygame.image.frombuffer(_view(self.__data, offset, length),
+                                          (width, height), FORMATS[format_])
+
+        if copy:
+            return surface.copy()
+
+        return surface
+
+    def read(self, path):
+        """Returns the data of a file.
+
+        Parameters:
+
+        'path' - a path to the file
+        """
+
+        kind, format_, width, height, size, offset, length, original, \
+            mtime = self.__entry(path)
+
+        if kind == PIXELS:
+            raise PackError("error! '" + path + "' is decoded already")
+
+        data = self.__data[offset:offset + length]
+
+        if kind == COMPRESSED:
+            data = zlib.decompress(data)
+
+        return data
+
+
+# Game's pack, None until looked for, False if there is none
+_pack = None
+
+# File of the music being played from the pack
+_music = None
+
+
+def get_pack():
+    """Returns the game's pack, or None if there is none."""
+
+    global _pack
+
+    if _pack is None:
+        _pack = False
+
+        if os.path.exists(PATH_DATA + PACK_NAME):
+            # Packs of an older format are ignored, until they're rebuilt.
+            try:
+                _pack = AssetPack(PATH_DATA + PACK_NAME)
+            except PackError:
+                pass
+
+    return _pack or None
+
+
+def packed(path):
+    """Returns the game's pack, if it keeps a current copy of a file,
+    None otherwise.
+
+    Parameters:
+
+    'path' - a path to the file
+    """
+
+    pack = get_pack()
+
+    if not pack is None and pack.current(path):
+        return pack
+
+    return None
+
+
+def load_image(path, copy=False):
+    """Returns an image from the game's pack or from the disk.
+
+    Parameters:
+
+    'path' - a path to the image
+    'copy' - whether the image from the pack has to be copied,
+             so that it may be drawn on
+    """
+
+    pack = packed(path)
+
+    if not pack is None:
+        return pack.image(path, copy)
+
+    return pygame.image.load(path)
+
+
+def open_file(path, mode="rb"):
+    """Returns an opened file from the game's pack or from the disk.
+
+    Parameters:
+
+    'path' - a path to the file
+    'mode' - mode in which the file is opened
+    """
+
+    pack = packed(path)
+
+    if not pack is None:
+        stream = io.BytesIO(pack.read(path))
+
+        if not "b" in mode:
+            return io.TextIOWrapper(stream)
+
+        return stream
+
+    return open(path, mode)
+
+
+def list_files(directory):
+    """Returns the sorted names of the files within a directory,
+    both in the game's pack and on the disk.
+
+    Parameters:
+
+    'directory' - a path to the directory
+    """
+
+    names = set()
+    pack = get_pack()
+
+    if not pack is None:
+        names.update(pack.listdir(directory))
+
+    if os.path.isdir(directory):
+        names.update([name for name in os.listdir(directory)
+                      if os.path.isfile(os.path.join(directory, name))])
+
+    return sorted(names)
+
+
+def load_sound(path):
+    """Returns a sound from the game's pack or from the disk.
+
+    Parameters:
+
+    'path' - a path to the sound
+    """
+
+    pack = packed(path)
+
+    if not pack is None:
+        return pygame.mixer.Sound(file=io.BytesIO(pack.read(path)))
+
+    return pygame.mixer.Sound(path)
+
+
+def load_music(path):
+    """Loads music to be played from the game's pack or from the disk.
+
+    Parameters:
+
+    'path' - a path to the music
+    """
+
+    global _music
+
+    pack = packed(path)
+
+    if not pack is None:
+        # Keeps the file, while the music is streamed from it.
+        _music = io.BytesIO(pack.read(path))
+        pygame.mixer.music.load(_music)
+    else:
+        _music = None
+        pygame.mixer.music.load(path)
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
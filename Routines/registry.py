@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a registry of the game's data,
+such as characters, items and maps, indexed by their types and names.
+"""
+
+__version__ = "0.1"
+
+import hashlib
+import os
+
+# Types of the strings, which may be unpickled
+try:
+    STRING = (str, unicode)
+except NameError:
+    STRING = (str,)
+
+# Fields of the records, which can be loaded by quests
+UNIT_SCHEMA = (("name", STRING),
+               ("image", STRING),
+               ("defense", int),
+               ("speed", int),
+               ("agility", int),
+               ("skills", list),
+               ("weapon", STRING))
+
+MAP_SCHEMA = (("name", STRING),
+              ("config", STRING),
+              ("textures", STRING),
+              ("zone", int))
+
+# Schemas of the records keyed by their types,
+# records of the other types only need a name
+SCHEMAS = {"Human": UNIT_SCHEMA,
+           "Olympian": UNIT_SCHEMA,
+           "Titan": UNIT_SCHEMA,
+           "Map": MAP_SCHEMA}
+
+DEFAULT_SCHEMA = (("name", STRING),)
+
+# Extension of the files, which keep the hashes of the validated data
+VALID_EXTENSION = ".valid"
+
+
+class RegistryError(Exception):
+    pass
+
+
+def digest(data):
+    """Returns a hash of the data's bytes."""
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def validate(files):
+    """Checks whether the game's files match their schemas,
+    raises RegistryError if they don't.
+
+    Parameters:
+
+    'files' - a dictionary of lists of records, keyed by their types
+    """
+
+    if not type(files) is dict:
+        raise RegistryError("error! game's files must be a dictionary")
+
+    for kind, records in files.items():
+        if not type(records) is list:
+            raise RegistryError("error! '" + kind + "' records must be a list")
+
+        schema = SCHEMAS.get(kind, DEFAULT_SCHEMA)
+        names = set()
+
+        for record in records:
+            if not type(record) is dict:
+                raise RegistryError("error! invalid '" + kind + "' record")
+
+            for field, type_ in schema:
+                if not isinstance(record.get(field), type_):
+                    raise RegistryError("error! invalid '" + field + \
+                                        "' of a '" + kind + "' record")
+
+            if record["name"] in names:
+                raise RegistryError("error! '" + record["name"] + \
+                                    "' is duplicated")
+
+            names.add(record["name"])
+
+
+def validate_cached(files, hash_, path):
+    """Validates the game's files, unless files of the same hash
+    have been validated already. The hash of the validated files
+    is kept next to them.
+
+    Parameters:
+
+    'files' - a dictionary of lists of records, keyed by their types
+    'hash_' - hash of the files' data
+    'path' - a path to the files' data
+    """
+
+    cache = os.path.splitext(path)[0] + VALID_EXTENSION
+
+    try:
+        with open(cache, "r") as fh:
+            if fh.read().strip() == hash_:
+                return
+    except IOError:
+        pass
+
+    validate(files)
+
+    # The cache is only an optimization, so it may fail to be written.
+    try:
+        with open(cache, "w") as fh:
+            fh.write(hash_)
+    except IOError:
+        pass
+
+
+class DataRegistry(object):
+    """Game's files indexed by the types and names of their records,
+    so that every record is found in constant time.
+
+    Parameters:
+
+    'files' - a dictionary of lists of records, keyed by their types
+    """
+
+    def __init__(self, files):
+
+        self.files = files              # Records keyed by their types
+
+        self.__index = {}               # Records keyed by types and names
+
+        for kind, records in files.items():
+            for record in records:
+                self.__index[(kind, record.get("name"))] = record
+
+    def __contains__(self, key):
+        return key in self.__index
+
+    def __len__(self):
+        return len(self.__index)
+
+    def get(self, kind, name):
+        """Returns a record, raises RegistryError if it doesn't exist.
+
+        Parameters:
+
+        'kind' - type of the record (i.e. Human, Map)
+        'name' - name of the record
+        """
+
+        record = self.__index.get((kind, name))
+
+        if record is None:
+            if not kind in self.files:
+                raise RegistryError("error! '" + kind + "' type does not exist")
+
+            raise RegistryError("error! '" + name + "' does not exist")
+
+        return record
+
+    def records(self, kind):
+        """Returns all the records of a type.
+
+        Parameters:
+
+        'kind' - type of the records (i.e. Human, Map)
+        """
+
+        return self.files.get(kind, [])
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a renderer of the map's sprites, which only
+redraws the parts of the screen, that have changed since the last frame.
+
+Sprites flag their changes by setting their 'dirty' attribute
+(i.e. characters, when they move or turn). The renderer restores
+the background under the old and new positions of the changed sprites,
+redraws the sprites overlapping them and returns the rects,
+which have to be updated on the display.
+"""
+
+__version__ = "0.1"
+
+import pygame
+
+# Part of the screen, above which the whole screen is redrawn,
+# as a single blit is faster than many smaller ones
+FULL_REDRAW_RATIO = 0.5
+
+
+def merge_rects(rects):
+    """Returns a list of rects, in which the overlapping rects
+    are merged into their unions.
+
+    Parameters:
+
+    'rects' - a list of pygame.Rects
+    """
+
+    merged = []
+
+    for rect in rects:
+        index = rect.collidelist(merged)
+
+        while index >= 0:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+
+        merged.append(rect)
+
+    return merged
+
+
+class DirtyRenderer(object):
+    """Draws layers of sprites over a background, redrawing only
+    the areas of the sprites, which have changed, appeared
+    or disappeared since the last frame.
+
+    Layers are drawn in their order, and the sprites of a layer
+    in the order of the layer. Layers having the 'query' method
+    (i.e. spatial groups) are searched only around the changed areas.
+    """
+
+    def __init__(self):
+
+        self.__background = None        # Background of the last frame
+        self.__drawn = {}               # Drawn sprites' rects keyed by sprites
+        self.__order = {}               # Drawing order keyed by sprites
+        self.__overlays = []            # Areas to be restored next frame
+        self.__full = True              # Whether to redraw the whole screen
+
+    def __sprites(self, layer, area):
+        """Returns the sprites of a layer overlapping an area."""
+
+        if hasattr(layer, "query"):
+            sprites = layer.query(area)
+            sprites.sort(key=self.__order.get)
+
+            return sprites
+
+        return [sprite for sprite in layer if area.colliderect(sprite.rect)]
+
+    def draw(self, surface, background, layers):
+        """Draws the sprites' changes on a surface.
+        Returns a list of the rects, which have changed.
+
+        Parameters:
+
+        'surface' - the surface to be drawn on (i.e. the display)
+        'background' - the surface drawn under the sprites
+                       (i.e. the textures of the current map)
+        'layers' - a list of groups or sequences of sprites
+        """
+
+        areas = self.__overlays
+        drawn = {}
+        order = {}
+
+        for layer in layers:
+            for sprite in layer:
+                rect = sprite.rect
+                previous = self.__drawn.pop(sprite, None)
+
+                if previous is None:
+                    areas.append(rect.copy())
+                # Rects changed without moving (i.e. by quests)
+                # are redrawn, even if the sprite isn't flagged.
+                elif getattr(sprite, "dirty", False) or not rect == previous:
+                    if rect.colliderect(previous):
+                        areas.append(rect.union(previous))
+                    else:
+                        areas.append(previous)
+                        areas.append(rect.copy())
+
+                sprite.dirty = False
+                drawn[sprite] = rect.copy()
+                order[sprite] = len(order)
+
+        # Areas of the sprites, which are no longer drawn.
+        areas.extend(self.__drawn.values())
+
+        self.__drawn = drawn
+        self.__order = order
+        self.__overlays = []
+
+        screen = surface.get_rect()
+
+        if not background is self.__background:
+            self.__background = background
+            self.__full = True
+
+        if not self.__full:
+            areas = merge_rects([screen.clip(area) for area in areas
+                                 if area.colliderect(screen)])
+
+            if sum(area.width * area.height for area in areas) > \
+               screen.width * screen.height * FULL_REDRAW_RATIO:
+                self.__full = True
+
+        if self.__full:
+            self.__full = False
+
+            surface.blit(background, (0, 0))
+            for layer in layers:
+                for sprite in layer:
+                    surface.blit(sprite.image, sprite.rect)
+
+            return [screen]
+
+        for area in areas:
+            surface.blit(background, area, area)
+            surface.set_clip(area)
+
+            for layer in layers:
+                for sprite in self.__sprites(layer, area):
+                    surface.blit(sprite.image, sprite.rect)
+
+            surface.set_clip(None)
+
+        return areas
+
+    def invalidate(self):
+        """Makes the renderer redraw the whole screen next frame
+        (i.e. after a menu or a window has been displayed).
+        """
+
+        self.__full = True
+
+    def overlay(self, rect):
+        """Marks an area drawn over the sprites (i.e. a text),
+        so that it's restored next frame.
+
+        Parameters:
+
+        'rect' - a pygame.Rect of the area
+        """
+
+        self.__overlays.append(pygame.Rect(rect))
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a sprite group with a spatial index,
+used to find colliding objects without checking all of them.
+"""
+
+__version__ = "0.1"
+
+import pygame
+
+# Size of a single cell of the grid in pixels
+CELL_SIZE = 64
+
+
+class SpatialGroup(pygame.sprite.Group):
+    """A sprite group, which keeps its sprites in a uniform grid.
+
+    Sprites are registered in the cells covered by their rects,
+    when added to the group, and unregistered, when removed from it.
+    Sprites, which change their position, have to be relocated.
+
+    Parameters:
+
+    'sprites' - optional sprites to be added to the group
+    'cell_size' - size of a single cell of the grid in pixels
+    """
+
+    def __init__(self, *sprites, **kwargs):
+
+        self.__cell_size = kwargs.get("cell_size", CELL_SIZE)
+        self.__cells = {}       # Sets of sprites, keyed by cells
+        self.__occupied = {}    # Ranges of cells, keyed by sprites
+
+        # Initiates the super class.
+        pygame.sprite.Group.__init__(self, *sprites)
+
+    def __cell_range(self, rect):
+        """Returns the range of cells covered by a rect."""
+
+        size = self.__cell_size
+
+        return (rect.left // size,
+                rect.top // size,
+                max(rect.left, rect.right - 1) // size,
+                max(rect.top, rect.bottom - 1) // size)
+
+    def __register(self, sprite, cell_range):
+        """Adds a sprite to the specified range of cells."""
+
+        left, top, right, bottom = cell_range
+
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                self.__cells.setdefault((x, y), set()).add(sprite)
+
+        self.__occupied[sprite] = cell_range
+
+    def __unregister(self, sprite):
+        """Removes a sprite from all of its cells."""
+
+        left, top, right, bottom = self.__occupied.pop(sprite)
+
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                cell = self.__cells[(x, y)]
+                cell.discard(sprite)
+
+                # Forgets empty cells to keep the grid small.
+                if len(cell) == 0:
+                    del self.__cells[(x, y)]
+
+    def add_internal(self, sprite, *args):
+        pygame.sprite.Group.add_internal(self, sprite, *args)
+
+        if not sprite in self.__occupied:
+            self.__register(sprite, self.__cell_range(sprite.rect))
+
+    def remove_internal(self, sprite):
+        pygame.sprite.Group.remove_internal(self, sprite)
+
+        if sprite in self.__occupied:
+            self.__unregister(sprite)
+
+    def relocate(self, sprite):
+        """Updates the cells of a sprite, which has changed its position.
+
+        Parameters:
+
+        'sprite' - a sprite belonging to the group
+        """
+
+        cell_range = self.__cell_range(sprite.rect)
+
+        if not self.__occupied.get(sprite) == cell_range:
+            self.__unregister(sprite)
+            self.__register(sprite, cell_range)
+
+    def collide(self, rect, exclude=None):
+        """Returns the first sprite colliding with a rect,
+        or None if there is no such sprite.
+
+        Parameters:
+
+        'rect' - a pygame.Rect to be tested, i.e. a swept area of a unit
+        'exclude' - a sprite to be ignored, i.e. the moving unit itself
+        """
+
+        left, top, right, bottom = self.__cell_range(rect)
+
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                for sprite in self.__cells.get((x, y), ()):
+                    if not sprite is exclude \
+                    and rect.colliderect(sprite.rect):
+                        return sprite
+
+        return None
+
+    def query(self, rect, exclude=None):
+        """Returns a list of all the sprites colliding with a rect.
+
+        Parameters:
+
+        'rect' - a pygame.Rect to be tested
+        'exclude' - a sprite to be ignored
+        """
+
+        left, top, right, bottom = self.__cell_range(rect)
+        found = set()
+
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                for sprite in self.__cells.get((x, y), ()):
+                    if not sprite is exclude \
+                    and rect.colliderect(sprite.rect):
+                        found.add(sprite)
+
+        return list(found)
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
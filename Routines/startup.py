@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains an audit of the game's startup,
+which measures the time to the main menu and the time
+of importing every module.
+
+The audit of the imports is enabled by setting
+the EPIC_IMPORT_AUDIT environment variable, i.e.:
+
+    EPIC_IMPORT_AUDIT=1 python main.pyw
+
+This module mustn't import any of the game's packages,
+so that it can be imported before all of them.
+"""
+
+__version__ = "0.1"
+
+import os
+import sys
+import time
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+# Time in seconds, in which the main menu should be displayed
+STARTUP_BUDGET = 1.0
+
+# Environment variable, which enables the audit of the imports
+AUDIT_VARIABLE = "EPIC_IMPORT_AUDIT"
+
+# Amount of the slowest modules to be reported
+REPORT_LIMIT = 20
+
+
+class ImportAudit(object):
+    """Measures the time of importing every module,
+    both with and without the modules imported by it.
+    """
+
+    def __init__(self):
+
+        self.times = {}         # Import times keyed by the modules' names
+        self.own = {}           # Import times without the nested imports
+
+        self.__import = None    # Original import function
+        self.__nested = []      # Times of the nested imports being measured
+
+    def __timed_import(self, name, *args, **kwargs):
+        """Imports a module, measuring the time of the first import."""
+
+        if name in sys.modules:
+            return self.__import(name, *args, **kwargs)
+
+        start = time.time()
+        self.__nested.append(0.0)
+
+        try:
+            return self.__import(name, *args, **kwargs)
+        finally:
+            total = time.time() - start
+            nested = self.__nested.pop()
+
+            self.times[name] = self.times.get(name, 0.0) + total
+            self.own[name] = self.own.get(name, 0.0) + total - nested
+
+            if len(self.__nested) > 0:
+                self.__nested[-1] += total
+
+    def install(self):
+        """Starts measuring the imports."""
+
+        if self.__import is None:
+            self.__import = builtins.__import__
+            builtins.__import__ = self.__timed_import
+
+    def uninstall(self):
+        """Stops measuring the imports."""
+
+        if not self.__import is None:
+            builtins.__import__ = self.__import
+            self.__import = None
+
+    def report(self, limit=REPORT_LIMIT):
+        """Returns a list of lines describing the slowest imports.
+
+        Parameters:
+
+        'limit' - amount of the modules to be reported
+        """
+
+        names = sorted(self.times, key=lambda name: -self.times[name])
+
+        lines = ["%-40s %10s %10s" % ("module", "total ms", "own ms")]
+        for name in names[:limit]:
+            lines.append("%-40s %10.2f %10.2f" % (name,
+                                                   self.times[name] * 1000,
+                                                   self.own[name] * 1000))
+
+        return lines
+
+
+# Time at which the startup began, None if it hasn't
+_start = None
+
+# Time to the main menu, None until it's displayed
+_elapsed = None
+
+# Audit of the imports, None if disabled
+_audit = None
+
+
+def begin():
+    """Starts measuring the startup. Called before the game's packages
+    are imported.
+    """
+
+    global _start, _audit
+
+    _start = time.time()
+
+    if os.environ.get(AUDIT_VARIABLE):
+        _audit = ImportAudit()
+        _audit.install()
+
+
+def end():
+    """Stops measuring the startup, once the main menu is displayed,
+    and reports its time if the audit is enabled.
+    Returns the time to the main menu.
+    """
+
+    global _elapsed
+
+    if _elapsed is None and not _start is None:
+        _elapsed = time.time() - _start
+
+        if not _audit is None:
+            _audit.uninstall()
+
+            lines = _audit.report()
+            lines.append("time to the main menu: %.2f ms (budget %.2f ms)" % \
+                         (_elapsed * 1000, STARTUP_BUDGET * 1000))
+
+            if _elapsed > STARTUP_BUDGET:
+                lines.append("warning! the startup exceeds its budget")
+
+            sys.stderr.write("\n".join(lines) + "\n")
+
+    return _elapsed
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
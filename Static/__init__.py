@@ -5,4 +5,4 @@
 used to create static elements of the game.
 """
 
-__all__ = ("armors", "items", "maps", "weapons")
+__all__ = ("armors", "chunks", "items", "layers", "maps", "weapons")
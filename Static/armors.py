@@ -4,16 +4,57 @@
 """This module contains classes for armors to use in the game."""
 
 
-class Armor(object):
+class ArmorDefinition(object):
+    """Data shared by all the armors of the same kind.
 
-    def __init__(self, name, description, defense, condition=100):
+    Parameters:
+
+    'name' - name of the armors
+    'description' - description of the armors
+    'defense' - defense of the armors in a perfect condition
+    """
+
+    __slots__ = ("name", "description", "defense")
+
+    def __init__(self, name, description, defense):
 
         self.name = name
         self.description = description
+        self.defense = defense
+
+
+# Definitions of the armors keyed by their arguments
+_definitions = {}
+
+
+def get_definition(name, description, defense):
+    """Returns the shared definition of armors.
+
+    Parameters:
+
+    'name' - name of the armors
+    'description' - description of the armors
+    'defense' - defense of the armors in a perfect condition
+    """
+
+    key = (name, description, defense)
+    definition = _definitions.get(key)
+
+    if definition is None:
+        definition = ArmorDefinition(name, description, defense)
+        _definitions[key] = definition
+
+    return definition
+
+
+class Armor(object):
+
+    def __init__(self, name, description, defense, condition=100):
+
+        self.definition = get_definition(name, description, defense)
         self.defense = 0
 
         self.__condition = condition
-        self.__initialDefense = defense
 
         self.condition = condition
 
@@ -24,4 +65,12 @@ class Armor(object):
     @condition.setter
     def condition(self, condition):
         self.__condition = condition
-        self.defense = (self.__initialDefense * self.__condition) // 100
+        self.defense = (self.definition.defense * self.__condition) // 100
+
+    @property
+    def description(self):
+        return self.definition.description
+
+    @property
+    def name(self):
+        return self.definition.name
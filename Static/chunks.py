@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains a chunked store of map images,
+which allows to read single zones of a map without loading all of it.
+
+A store file begins with a header, followed by an index of chunks
+and the chunks themselves. Every chunk holds raw RGB pixels
+of a single layer (config or textures) of a single zone.
+"""
+
+from __future__ import with_statement
+
+__version__ = "0.1"
+
+import mmap
+import os
+import struct
+import threading
+import weakref
+
+import pygame
+
+import Routines.packs as packs
+from Main.constants import *
+
+# Identifies store files
+MAGIC = b"EPICZONE"
+
+# Magic, amount of columns and rows of zones, width and height of a zone
+HEADER = struct.Struct("<8sHHHH")
+
+# Offset and length of a single chunk
+INDEX_ENTRY = struct.Struct("<QI")
+
+# Layers of a zone
+CONFIG = 0
+TEXTURES = 1
+
+LAYERS = (CONFIG, TEXTURES)
+
+
+# Stores opened from the files, keyed by the files' paths
+_stores = {}
+
+
+class StoreError(Exception):
+    pass
+
+
+def _close_stores(path):
+    """Closes the mappings of all the stores opened from a file,
+    so that the file can be replaced. The stores reopen it,
+    when they're read next time.
+    """
+
+    for store in list(_stores.get(path, ())):
+        store.close()
+
+
+def build(config, textures, path, zone_size=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+    """Builds a store from the full config and textures images of a map.
+
+    Parameters:
+
+    'config' - a path to the config image
+    'textures' - a path to the textures image
+    'path' - a path to the store to be created
+    'zone_size' - width and height of a single zone
+    """
+
+    images = (pygame.image.load(config), pygame.image.load(textures))
+    width, height = zone_size
+
+    columns = images[CONFIG].get_width() // width
+    rows = images[CONFIG].get_height() // height
+
+    if columns == 0 or rows == 0 \
+    or not images[TEXTURES].get_size() == images[CONFIG].get_size():
+        raise StoreError("error! invalid size of the map's images")
+
+    offset = HEADER.size + INDEX_ENTRY.size * columns * rows * len(LAYERS)
+    length = width * height * 3
+    index = []
+
+    for zone in range(columns * rows):
+        for layer in LAYERS:
+            index.append(INDEX_ENTRY.pack(offset, length))
+            offset += length
+
+    # Writes to a temporary file first, so that a broken store is never used.
+    with open(path + ".tmp", "wb") as store:
+        store.write(HEADER.pack(MAGIC, columns, rows, width, height))
+        store.write(b"".join(index))
+
+        zone_image = pygame.Surface((width, height))
+
+        for zone in range(columns * rows):
+            x = (zone % columns) * width
+            y = (zone // columns) * height
+
+            for layer in LAYERS:
+                zone_image.blit(images[layer], (0, 0),
+                                (x, y, width, height))
+                store.write(pygame.image.tostring(zone_image, "RGB"))
+
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(path + ".tmp", path)
+
+
+class ZoneStore(object):
+    """Reads single zones of a map from a memory-mapped store file.
+
+    The file stays mapped until the store is closed. A closed store
+    maps its file again, when it's read next time.
+
+    Parameters:
+
+    'path' - a path to the store file
+    'data' - optional data of the store, i.e. from the game's pack,
+             used instead of the file
+    """
+
+    def __init__(self, path, data=None):
+
+        self.path = path
+
+        self.__packed = data            # Data of the store from the pack
+        self.__data = None              # Data of the store, None if closed
+        self.__lock = threading.Lock()  # Zones may be read in the background
+
+        self.__open()
+
+        if data is None:
+            _stores.setdefault(path, weakref.WeakSet()).add(self)
+
+    def __open(self):
+        """Maps the store's file, or uses the store's data,
+        and reads its header.
+        """
+
+        if self.__packed is None:
+            with open(self.path, "rb") as store:
+                self.__data = mmap.mmap(store.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+        else:
+            self.__data = self.__packed
+
+        magic, self.columns, self.rows, width, height = \
+            HEADER.unpack(bytes(self.__data[:HEADER.size]))
+
+        if not magic == MAGIC:
+            raise StoreError("error! '" + self.path + "' is not a zone store")
+
+        self.zone_size = (width, height)
+
+    def close(self):
+        """Unmaps the store's file."""
+
+        with self.__lock:
+            if self.__packed is None and not self.__data is None:
+                self.__data.close()
+
+            self.__data = None
+
+    @classmethod
+    def open(cls, config, textures):
+        """Opens the store of a map's images from the game's pack,
+        or from the disk, building it first if it doesn't exist
+        or is older than the images.
+
+        Parameters:
+
+        'config' - a path to the config image
+        'textures' - a path to the textures image
+        """
+
+        path = os.path.splitext(config)[0] + ".zones"
+
+        # Uses the packed store, unless any of the images has changed.
+        pack = packs.packed(path)
+        if not pack is None and pack.current(config) \
+        and pack.current(textures):
+            return cls(path, pack.buffer(path))
+
+        if not os.path.exists(path):
+            build(config, textures, path)
+        elif os.path.exists(config) and os.path.exists(textures):
+            if os.path.getmtime(path) < max(os.path.getmtime(config),
+                                            os.path.getmtime(textures)):
+                # A mapped file can't be replaced (i.e. on Windows).
+                _close_stores(path)
+                build(config, textures, path)
+
+        return cls(path)
+
+    @property
+    def zones(self):
+        """Returns the amount of all the zones."""
+
+        return self.columns * self.rows
+
+    def read(self, zone, layer):
+        """Returns a new surface with a layer of a zone.
+
+        Parameters:
+
+        'zone' - number of the zone, starting from 1
+        'layer' - CONFIG or TEXTURES
+        """
+
+        with self.__lock:
+            if self.__data is None:
+                self.__open()
+
+            if not zone in range(1, self.zones + 1):
+                raise StoreError("error! zone " + str(zone) + \
+                                 " does not exist")
+
+            entry = HEADER.size + \
+                INDEX_ENTRY.size * ((zone - 1) * len(LAYERS) + layer)
+            offset, length = INDEX_ENTRY.unpack(
+                bytes(self.__data[entry:entry + INDEX_ENTRY.size]))
+
+            # Decodes only the pixels of the requested chunk.
+            pixels = bytes(self.__data[offset:offset + length])
+
+        return pygame.image.fromstring(pixels, self.zone_size, "RGB")
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
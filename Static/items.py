@@ -12,64 +12,163 @@ from abc import ABCMeta, abstractmethod
 import pygame
 
 import Interface.menus as menus
+import Routines.assets as assets
 from Main.constants import *
 
 
+# Action of the context menus' buttons using the selected item
+USE_ACTION = "actions.use_item(globals_.current_window[1].items[globals_.current_window[1].selected - 1])"
+
+# Texts and actions of the context menus' buttons
+ITEM_BUTTONS = (("Remove", ""),
+                ("Cancel", "actions.cancel_menu()"))
+
+USABLE_ITEM_BUTTONS = (("Use", USE_ACTION),
+                       ("Remove", ""),
+                       ("Cancel", "actions.cancel_menu()"))
+
+
+class ItemDefinition(object):
+    """Data shared by all the items of the same type,
+    loaded only once.
+
+    Parameters:
+
+    'name' - name of the items
+    'description' - description of the items
+    'image' - name of the items' image
+    'icon' - name of the items' icon, made of the normal
+             and the selected icon
+    'buttons' - texts and actions of the context menu's buttons
+    'pickable' - whether the items can be picked up
+    """
+
+    __slots__ = ("name", "description", "image", "icons", "buttons",
+                 "pickable", "__context_menu")
+
+    def __init__(self, name, description, image, icon, buttons,
+                 pickable=True):
+
+        self.name = name
+        self.description = description
+        self.buttons = buttons
+        self.pickable = pickable
+
+        self.image = assets.load(PATH_ITEMS + image, GREEN)
+
+        # Slices the normal and the selected icon once.
+        full_icon = assets.load(PATH_ITEMS + icon)
+        width = full_icon.get_width() // 2
+
+        self.icons = []
+        for i in range(2):
+            icon = full_icon.subsurface((width * i, 0,
+                                         width, full_icon.get_height())).copy()
+            icon.set_colorkey(GREEN)
+            self.icons.append(icon)
+
+        self.__context_menu = None
+
+    @property
+    def context_menu(self):
+        """Returns the context menu of the items, made when it's needed
+        for the first time. Only one context menu is displayed at once,
+        so the items share it.
+        """
+
+        if self.__context_menu is None:
+            buttons = [menus.Button("context_button.bmp", text, action=action)
+                       for text, action in self.buttons]
+            self.__context_menu = menus.ContextMenu("context_menu.png",
+                                                    buttons)
+
+        return self.__context_menu
+
+
+# Definitions of the items keyed by their classes
+_definitions = {}
+
+
+def get_definition(kind):
+    """Returns the shared definition of an item's class.
+
+    Parameters:
+
+    'kind' - a class of the items, with a 'DEFINITION' attribute
+    """
+
+    definition = _definitions.get(kind)
+
+    if definition is None:
+        definition = ItemDefinition(*kind.DEFINITION)
+        _definitions[kind] = definition
+
+    return definition
+
+
 class Item(pygame.sprite.Sprite):
+    """Abstract class used to create items. An item keeps only its own
+    state, while its images and context menu are shared by all the items
+    of its class.
+
+    Classes of the items define the arguments of their definitions
+    in the 'DEFINITION' attribute.
+
+    Parameters:
+
+    'quantity' - amount of the items in a single stack
+    """
 
     __metaclass__ = ABCMeta
 
     @abstractmethod
-    def __init__(self, name, description, image, icon, context_menu,
-                 pickable=True):
+    def __init__(self, quantity=1):
 
         # Initiates the super class.
         pygame.sprite.Sprite.__init__(self)
 
-        self.__full_icon = pygame.image.load(PATH_ITEMS + icon)
-        self.icon = pygame.Surface((self.__full_icon.get_width() // 2,
-                                     self.__full_icon.get_height()))
-        self.icon.set_colorkey(GREEN)
+        self.definition = get_definition(type(self))
+        self.rect = self.definition.image.get_rect()
+        self.selected = False
+        self.quantity = quantity
 
-        self.image = pygame.image.load(PATH_ITEMS + image)
-        self.image.set_colorkey(GREEN)
-        self.rect = self.image.get_rect()
+    @property
+    def contextMenu(self):
+        return self.definition.context_menu
 
-        self.name = name
-        self.description = description
-        self.contextMenu = context_menu
-        self.pickable = pickable
+    @property
+    def description(self):
+        return self.definition.description
+
+    @property
+    def icon(self):
+        return self.definition.icons[self.selected]
+
+    @property
+    def image(self):
+        return self.definition.image
 
-        self.reset()
+    @property
+    def name(self):
+        return self.definition.name
+
+    @property
+    def pickable(self):
+        return self.definition.pickable
 
     def reset(self):
-        self.icon.blit(self.__full_icon, (0, 0),
-                       (0, 0,
-                        self.__full_icon.get_width() // 2,
-                        self.__full_icon.get_height()))
+        self.selected = False
 
     def select(self):
-        self.icon.blit(self.__full_icon, (0, 0),
-                       (self.__full_icon.get_width() // 2, 0,
-                        self.__full_icon.get_width() // 2,
-                        self.__full_icon.get_height()))
+        self.selected = True
 
 
 class Jewel(Item):
 
-    def __init__(self):
-        buttons = []
-        buttons.append(menus.Button("context_button.bmp", "Remove"))
-        buttons.append(menus.Button("context_button.bmp", "Cancel",
-                                    action="actions.cancel_menu()"))
-
-        context_menu = menus.ContextMenu("context_menu.png", buttons)
+    DEFINITION = ("Jewel", "", "jewel.bmp", "jewel_icon.bmp", ITEM_BUTTONS)
 
-        super(Jewel, self).__init__("Jewel",
-                                    "",
-                                    "jewel.bmp",
-                                    "jewel_icon.bmp",
-                                    context_menu)
+    def __init__(self, quantity=1):
+        super(Jewel, self).__init__(quantity)
 
 
 class UsableItem(Item):
@@ -77,18 +176,8 @@ class UsableItem(Item):
     __metaclass__ = ABCMeta
 
     @abstractmethod
-    def __init__(self, name, description, image, icon):
-        buttons = []
-        buttons.append(menus.Button("context_button.bmp", "Use",
-                                    action="actions.use_item(globals_.player_unit.inventory.items[globals_.current_window[1].selected - 1])"))
-        buttons.append(menus.Button("context_button.bmp", "Remove"))
-        buttons.append(menus.Button("context_button.bmp", "Cancel",
-                                    action="actions.cancel_menu()"))
-
-        context_menu = menus.ContextMenu("context_menu.png", buttons)
-
-        super(UsableItem, self).__init__(name, description, image, icon,
-                                         context_menu)
+    def __init__(self, quantity=1):
+        super(UsableItem, self).__init__(quantity)
 
     @abstractmethod
     def applyEffects(self, unit):
@@ -97,11 +186,11 @@ class UsableItem(Item):
 
 class Medicine(UsableItem):
 
-    def __init__(self):
-        super(Medicine, self).__init__("Medicine",
-                                       "",
-                                       "hp_potion.bmp",
-                                       "hp_potion_icon.bmp")
+    DEFINITION = ("Medicine", "", "hp_potion.bmp", "hp_potion_icon.bmp",
+                  USABLE_ITEM_BUTTONS)
+
+    def __init__(self, quantity=1):
+        super(Medicine, self).__init__(quantity)
 
     def applyEffects(self, unit):
         if unit.health + unit.health * 0.25 >= 100:
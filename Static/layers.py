@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This module contains compact layers decoded from config images,
+which replace the colour comparisons of the config images' pixels.
+"""
+
+__version__ = "0.1"
+
+import pygame
+
+from Main.constants import *
+
+# Codes of the config images' pixels
+EMPTY = 0
+OBSTACLE = 1
+ENTRANCE = 2
+
+# Colours of the codes on the config images, new codes
+# (i.e. water or triggers) only need to be added here
+CODES = ((OBSTACLE, BLUE),
+         (ENTRANCE, RED))
+
+# Size of the tiles, on which the entrances are placed
+TILE_SIZE = 16
+
+
+class Layers(object):
+    """Layers decoded once from a config image: a bitmask for every code
+    and a list of the entrance areas.
+
+    Parameters:
+
+    'config' - the config image of a zone or an interior
+    """
+
+    def __init__(self, config):
+
+        self.size = config.get_size()
+
+        # Sets a bit for every pixel of the config image with the code's colour.
+        self.masks = {}
+        for code, colour in CODES:
+            self.masks[code] = pygame.mask.from_threshold(config, colour,
+                                                          (1, 1, 1, 255))
+
+        self.obstacles = self.masks[OBSTACLE]   # Bitmask of the obstacles
+
+        self.columns = self.size[0] // TILE_SIZE
+        self.rows = self.size[1] // TILE_SIZE
+
+        self.__updateEnterAreas()
+
+    def __updateEnterAreas(self):
+        """Updates the areas to which the player may enter."""
+
+        self.areas = []                 # Areas and their numbers
+        self.__rects = []               # Rects of the areas in their order
+
+        entrances = self.masks[ENTRANCE]
+
+        def is_entrance(x, y):
+            return x < self.size[0] and entrances.get_at((x, y)) == 1
+
+        # Scans the tiles from the bottom row upwards,
+        # joining the neighbouring ones into areas up to 3 tiles wide.
+        for row in range(self.rows - 1, -1, -1):
+            y = row * TILE_SIZE
+            column = 0
+
+            while column < self.columns:
+                if is_entrance(column * TILE_SIZE + 1, y):
+                    if is_entrance(column * TILE_SIZE + 33, y):
+                        width = 3
+                    elif is_entrance(column * TILE_SIZE + 17, y):
+                        width = 2
+                    else:
+                        width = 1
+
+                    rect = pygame.Rect(column * TILE_SIZE, y,
+                                       width * TILE_SIZE, TILE_SIZE)
+
+                    self.areas.append([rect, len(self.areas) + 1])
+                    self.__rects.append(rect)
+
+                    column += width
+                else:
+                    column += 1
+
+    def code_at(self, x, y):
+        """Returns the code of a pixel of the config image.
+
+        Parameters:
+
+        'x' - x-coordinate of the pixel
+        'y' - y-coordinate of the pixel
+        """
+
+        for code, colour in CODES:
+            if self.masks[code].get_at((x, y)):
+                return code
+
+        return EMPTY
+
+    def area_at(self, rect):
+        """Returns the number of the first entrance area,
+        which a rect touches, or 0 if it touches none.
+
+        Parameters:
+
+        'rect' - a pygame.Rect to be tested
+        """
+
+        # Areas are numbered in the order of the list, from 1.
+        # A single pass over the few areas is faster than
+        # looking up the tiles covered by the rect.
+        return rect.collidelist(self.__rects) + 1
+
+    @property
+    def bytes(self):
+        """Returns the approximate memory used by the layers in bytes."""
+
+        return len(self.masks) * self.size[0] * self.size[1] // 8
+
+
+if __name__ == "__main__":
+    class DirectRunError(Exception):
+        pass
+
+    raise DirectRunError("This module cannot be run directly.")
@@ -5,25 +5,276 @@
 
 __version__ = "0.1"
 
+import threading
+from collections import deque, OrderedDict
+
 import pygame
 
+import Routines.assets as assets
 from Main.constants import *
+from Static.chunks import ZoneStore, CONFIG, TEXTURES
+from Static.layers import Layers
 
 
 WIDTH, HEIGHT = WINDOW_WIDTH, WINDOW_HEIGHT
 
+# Maximum memory used by the cached zones of a single map in bytes
+ZONE_CACHE_BUDGET = 48 * 1024 * 1024
+
+# Distance from a zone's edge or an entrance in pixels,
+# at which the next zone or interior starts being composed
+PREFETCH_DISTANCE = 128
+
+# Filter to be blitted over the textures, loaded once
+_filter = None
+
+# Guards the filter, which zones composed in the background use as well
+_filter_lock = threading.Lock()
+
+
+def _load_filter():
+    """Returns the filter used for the filtered versions of the textures."""
+
+    global _filter
+
+    with _filter_lock:
+        if _filter is None:
+            filter_mask = assets.load(PATH_MAPS + "filter_mask.png")
+
+            filter_ = pygame.Surface((WIDTH, HEIGHT))
+            filter_.blit(filter_mask, (0, 0),
+                         (0, 0, WIDTH, HEIGHT))
+            filter_.set_alpha(99)
+
+            _filter = filter_
+
+    return _filter
+
+
+class Zone(object):
+    """Composed images and tables of a single zone or interior.
+
+    The config image is decoded into layers and isn't kept.
+
+    Parameters:
+
+    config - the config image of the zone
+    textures - the textures image of the zone
+    """
+
+    def __init__(self, config, textures):
+
+        self.layers = Layers(config)        # Layers decoded from the config image
+        self.obstacles = self.layers.obstacles
+        self.areas = self.layers.areas      # Areas to which the player may enter
+        self.textures = textures
+        self.filtered = pygame.Surface((WIDTH, HEIGHT))
+
+        self.feet = {}          # Obstacle masks combined with their own offsets
+        self.strips = {}        # Filled masks of the tested strips' sizes
+        self.navigation = OrderedDict()  # Recent navigation grids of the path finder
+
+        self.__updateFiltered()
+
+    def __updateFiltered(self):
+        """Updates the filtered version of the zone's textures."""
+
+        self.filtered.blit(self.textures, (0, 0),
+                           (0, 0, WIDTH, HEIGHT))
+        self.filtered.blit(_load_filter(), (0, 0),
+                           (0, 0, WIDTH, HEIGHT))
+
+    @property
+    def size(self):
+        """Returns the approximate memory used by the zone in bytes."""
+
+        size = self.layers.bytes
+
+        for surface in (self.textures, self.filtered):
+            size += surface.get_bytesize() * \
+                    surface.get_width() * surface.get_height()
+
+        return size
+
+
+class ZoneCache(object):
+    """Keeps recently visited zones, until their total size
+    exceeds the memory budget. The least recently used zones
+    are removed first.
+
+    Parameters:
+
+    budget - maximum memory used by the zones in bytes
+    """
+
+    def __init__(self, budget=ZONE_CACHE_BUDGET):
+
+        self.budget = budget
+        self.size = 0
+
+        self.__zones = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.__zones
+
+    def __len__(self):
+        return len(self.__zones)
+
+    def clear(self):
+        """Removes all the zones from the cache."""
+
+        self.__zones.clear()
+        self.size = 0
+
+    def get(self, key):
+        """Returns a zone, or None if it isn't in the cache.
+
+        Parameters:
+
+        key - zone's number and interior's number
+        """
+
+        if not key in self.__zones:
+            return None
+
+        # Marks the zone as recently used.
+        zone = self.__zones.pop(key)
+        self.__zones[key] = zone
+
+        return zone
+
+    def put(self, key, zone):
+        """Adds a zone to the cache, removing the least recently used
+        zones if the budget is exceeded. The newest zone is always kept.
+
+        Parameters:
+
+        key - zone's number and interior's number
+        zone - a Zone object
+        """
+
+        if key in self.__zones:
+            self.size -= self.__zones.pop(key).size
+
+        self.__zones[key] = zone
+        self.size += zone.size
+
+        while self.size > self.budget and len(self.__zones) > 1:
+            self.size -= self.__zones.popitem(last=False)[1].size
+
+
+class ZoneLoader(object):
+    """Composes zones on a background thread.
+
+    Parameters:
+
+    compose - a function composing a zone, given its number
+              and the number of its interior
+    """
+
+    def __init__(self, compose):
+
+        self.__compose = compose
+        self.__condition = threading.Condition()
+
+        self.__waiting = deque()    # Keys of the zones waiting to be composed
+        self.__pending = set()      # Keys of the zones waiting or being composed
+        self.__done = {}            # Composed zones, keyed by their keys
+        self.__thread = None
+
+    def __run(self):
+        """Composes the requested zones one by one."""
+
+        while True:
+            with self.__condition:
+                while len(self.__waiting) == 0:
+                    self.__condition.wait()
+
+                key = self.__waiting.popleft()
+
+            try:
+                zone = self.__compose(*key)
+            except Exception:
+                # Leaves the zone to be composed, and the error to be shown,
+                # by the main thread.
+                zone = None
+
+            with self.__condition:
+                if not zone is None:
+                    self.__done[key] = zone
+
+                self.__pending.discard(key)
+                self.__condition.notify_all()
+
+    def collect(self):
+        """Returns a dictionary of the zones composed so far."""
+
+        with self.__condition:
+            done, self.__done = self.__done, {}
+
+        return done
+
+    def request(self, key):
+        """Requests a zone to be composed in the background.
+
+        Parameters:
+
+        key - zone's number and interior's number
+        """
+
+        with self.__condition:
+            if key in self.__pending or key in self.__done:
+                return
+
+            self.__waiting.append(key)
+            self.__pending.add(key)
+            self.__condition.notify_all()
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run)
+                self.__thread.daemon = True
+                self.__thread.start()
+
+    def take(self, key):
+        """Returns a composed zone, waiting for it if it's being composed,
+        or None if it hasn't been requested.
+
+        Parameters:
+
+        key - zone's number and interior's number
+        """
+
+        with self.__condition:
+            # Composes the zone in the main thread, if it's still waiting.
+            if key in self.__waiting:
+                self.__waiting.remove(key)
+                self.__pending.discard(key)
+
+            while key in self.__pending:
+                self.__condition.wait()
+
+            return self.__done.pop(key, None)
+
 
 class Map(object):
     """Used to create a map to be displayed in the game.
 
+    The zones are read from a chunked store of the map's images,
+    only when they are shown, so the memory used by the map depends
+    on the amount of visited zones rather than the size of the map.
+    Recently visited zones and interiors are kept in a cache,
+    so returning to them doesn't require composing them again.
+
     Parameters:
 
     config - a path to the config image
     textures - a path to the textures image
     zone - starting zone of the map
+    cache_budget - maximum memory used by the cached zones in bytes
     """
 
-    def __init__(self, config, textures, zone=1, name="island"):
+    def __init__(self, config, textures, zone=1, name="island",
+                 cache_budget=ZONE_CACHE_BUDGET):
 
         # TEMPORARY CODE
         interiors = [[[None, None]],
@@ -31,117 +282,276 @@ class Map(object):
                        PATH_MAPS + "textures2.bmp"]]]
         # END OF TEMPORARY CODE
 
-        self.__full_config = pygame.image.load(config)      # Full config image
-        self.__full_textures = pygame.image.load(textures)  # Full textures image
+        self.__store = ZoneStore.open(config, textures)     # Chunked store of the map's images
 
         self.__interior = 0                                 # Current interior, 0 if none
         self.__interiors = interiors                        # List of lists containing images for interiors
+        self.__current = None                               # Zone object of the current zone or interior
 
         self.name = name
-        self.config = pygame.Surface((WIDTH, HEIGHT))       # Current part of the config image
-        self.textures = pygame.Surface((WIDTH, HEIGHT))     # Current part of the textures image
-        self.filtered = pygame.Surface((WIDTH, HEIGHT))
-        self.landscape = pygame.image.load(PATH_MAPS + "landscape.png")
+        self.cache = ZoneCache(cache_budget)                # Recently visited zones and interiors
+        self.loader = ZoneLoader(self.__compose)            # Composes approached zones in the background
+        self.landscape = assets.load(PATH_MAPS + "landscape.png")
 
         self.__zone = zone                                  # Current zone
 
-        # Sets the total amount of zones to an attribute.
-        for i in range(1, 5):
-            if self.__full_config.get_width() == WIDTH * i:
-                self.__zones = i ** 2
-                break
+        self.__columns = self.__store.columns               # Amount of zones in a row
+        self.__rows = self.__store.rows                     # Amount of zones in a column
+        self.__zones = self.__store.zones                   # Total amount of zones
+
+        # Attributes of the current zone, set when it's shown
+        self.layers = None
+        self.textures = None
+        self.filtered = None
+        self.obstacles = None
+        self.navigation = OrderedDict()
+        self.areas = []
+
+        # Loads the filter in the main thread, before any zone
+        # is composed in the background.
+        _load_filter()
 
         # Initializes the map's initial settings.
         self.__changeZone(self.__zone)      # Changes to the current zone.
-        self.__updateEnterAreas()           # Updates the areas, to which the player may enter.
 
     def __changeZone(self, zone):
         """Changes the current zone to
         the one specified in the parameter.
         """
 
-        if self.__zones == 1:
-            x, y = 0, 0
-        elif self.__zones == 4:
-            if zone in (1, 2):
-                x, y = WIDTH * (zone - 1), 0
-            else:
-                x, y = WIDTH * (zone - 3), HEIGHT
-        elif self.__zones == 9:
-            if zone in (1, 2, 3):
-                x, y = WIDTH * (zone - 1), 0
-            elif zone in (4, 5, 6):
-                x, y = WIDTH * (zone - 4), HEIGHT
-            elif zone in (7, 8, 9):
-                x, y = WIDTH * (zone - 7), HEIGHT * 2
-        elif self.__zones == 16:
-            if zone in (1, 2, 3, 4):
-                x, y = WIDTH * (zone - 1), 0
-            elif zone in (5, 6, 7, 8):
-                x, y = WIDTH * (zone - 5), HEIGHT
-            elif zone in (9, 10, 11, 12):
-                x, y = WIDTH * (zone - 9), HEIGHT * 2
-            elif zone in (13, 14, 15, 16):
-                x, y = WIDTH * (zone - 13), HEIGHT * 3
         if zone in range(1, self.__zones + 1):
-            # Changes the current part of the config image.
-            self.config.blit(self.__full_config, (0, 0),
-                             (x, y, WIDTH, HEIGHT))
-
-            # Changes the current part of the textures image.
-            self.textures.blit(self.__full_textures, (0, 0),
-                               (x, y, WIDTH, HEIGHT))
-
-            self.__updateFiltered()
+            self.__show(zone, 0)
 
             # Changes the current zone.
             self.__zone = zone
 
-    def __updateEnterAreas(self):
-        """Updates the areas to which the player may enter."""
+    def __compose(self, zone, interior):
+        """Composes a zone or an interior from its images."""
 
-        self.areas = []     # List of lists containing the areas to which the player may enter
+        if interior == 0:
+            # Reads only the zone's chunks of the config and textures images.
+            config = self.__store.read(zone, CONFIG)
+            textures = self.__store.read(zone, TEXTURES)
+        else:
+            config = pygame.Surface((WIDTH, HEIGHT))
+            textures = pygame.Surface((WIDTH, HEIGHT))
 
-        x, y = 0, 752       # Coordinates used to determine the areas
-        counter = 0         # Area's number
+            paths = self.__interiors[zone - 1][interior - 1]
 
-        while True:
-            if self.config.get_at((x + 1, y)) == RED:
-                counter += 1
-
-                if self.config.get_at((x + 33, y)) == RED:
-                    width = 48
-                elif self.config.get_at((x + 17, y)) == RED:
-                    width = 32
-                else:
-                    width = 16
-
-                self.areas.append([pygame.Rect((x, y), (width, 16)),
-                                   counter])
-                x += width
-            elif y == 0:
-                break
-            else:
-                if x == 1008:
-                    x = 0
-                    y -= 16
-                else:
-                    x += 16
+            config.blit(assets.load(paths[0], convert=False), (0, 0),
+                        (0, 0, WIDTH, HEIGHT))
+            textures.blit(assets.load(paths[1]), (0, 0),
+                          (0, 0, WIDTH, HEIGHT))
 
-    def __updateFiltered(self):
-        """Updates the filtered version of the map's textures."""
+        return Zone(config, textures)
 
-        self.filtered.blit(self.textures, (0, 0),
-                            (0, 0, WIDTH, HEIGHT))
+    def __show(self, zone, interior):
+        """Makes a zone or an interior the current one,
+        composing it only if it isn't in the cache.
+        """
 
-        filter_mask = pygame.image.load(PATH_MAPS + "filter_mask.png")
+        current = self.cache.get((zone, interior))
 
-        filter_ = pygame.Surface((WIDTH, HEIGHT))
-        filter_.blit(filter_mask, (0, 0),
-                     (0, 0, WIDTH, HEIGHT))
-        filter_.set_alpha(99)
-        self.filtered.blit(filter_, (0, 0),
-                           (0, 0, WIDTH, HEIGHT))
+        if current is None:
+            # Uses the zone composed in the background, if possible.
+            current = self.loader.take((zone, interior))
+
+            if current is None:
+                current = self.__compose(zone, interior)
+
+            self.cache.put((zone, interior), current)
+
+        self.__current = current
+
+        self.layers = current.layers            # Layers decoded from the config image
+        self.textures = current.textures        # Current part of the textures image
+        self.filtered = current.filtered
+        self.obstacles = current.obstacles      # Bitmask of the config image's obstacles
+        self.navigation = current.navigation    # Navigation grids for the obstacles
+        self.areas = current.areas              # Areas to which the player may enter
+
+    def close(self):
+        """Unmaps the store of the map's images. The map maps it again,
+        if another zone has to be composed.
+        """
+
+        self.__store.close()
+
+    def neighbour(self, direction):
+        """Returns the number of the zone next to the current one,
+        on the specified side, or None if there is no such zone.
+
+        Parameters:
+
+        'direction' - side of the current zone
+        """
+
+        column = (self.__zone - 1) % self.__columns
+        row = (self.__zone - 1) // self.__columns
+
+        if direction == UP and row > 0:
+            return self.__zone - self.__columns
+        elif direction == DOWN and row < self.__rows - 1:
+            return self.__zone + self.__columns
+        elif direction == LEFT and column > 0:
+            return self.__zone - 1
+        elif direction == RIGHT and column < self.__columns - 1:
+            return self.__zone + 1
+
+        return None
+
+    def __feet_mask(self, offset):
+        """Returns the obstacle mask combined with itself
+        shifted by a vertical offset.
+        """
+
+        feet = self.__current.feet
+
+        if not offset in feet:
+            feet[offset] = self.obstacles.overlap_mask(self.obstacles,
+                                                       (0, -offset))
+
+        return feet[offset]
+
+    def __strip_mask(self, size):
+        """Returns a filled mask of a given size."""
+
+        strips = self.__current.strips
+
+        if not size in strips:
+            strips[size] = pygame.mask.Mask(size)
+            strips[size].fill()
+
+        return strips[size]
+
+    def collides(self, strip, offset=0):
+        """Checks whether a strip of the map touches an obstacle.
+
+        A pixel of the strip only counts, if the pixel 'offset' pixels
+        below it is an obstacle as well. Raises an IndexError
+        if the strip lies outside of the map.
+
+        Parameters:
+
+        'strip' - a pygame.Rect to be tested
+        'offset' - vertical distance to the second pixel to be tested
+        """
+
+        if strip.left < 0 or strip.top < 0 \
+        or strip.right > WIDTH or strip.bottom > HEIGHT:
+            raise IndexError("error! the strip lies outside of the map")
+        elif strip.width <= 0 or strip.height <= 0:
+            return False
+
+        return not self.__feet_mask(offset).overlap(
+            self.__strip_mask(strip.size), strip.topleft) is None
+
+    def free_distance(self, rect, direction, distance, offset=0):
+        """Returns the furthest distance, which a rect can travel
+        in a given direction without touching an obstacle
+        or leaving the map.
+
+        Parameters:
+
+        'rect' - a pygame.Rect to be moved
+        'direction' - side towards which the rect will be moved
+        'distance' - maximum amount of pixels to be traveled
+        'offset' - vertical distance to the second pixel to be tested
+        """
+
+        # Limits the distance to the map's borders.
+        if direction in (UP, DOWN):
+            if rect.left < 0 or rect.right > WIDTH:
+                return 0
+            elif direction == UP:
+                distance = min(distance, rect.top)
+            else:
+                distance = min(distance, HEIGHT - rect.bottom)
+        elif direction in (LEFT, RIGHT):
+            if rect.top < 0 or rect.bottom > HEIGHT:
+                return 0
+            elif direction == LEFT:
+                distance = min(distance, rect.left)
+            else:
+                distance = min(distance, WIDTH - rect.right)
+        else:
+            return 0
+
+        if distance <= 0:
+            return 0
+
+        # Strip of the map, which the rect will sweep.
+        if direction == UP:
+            strip = pygame.Rect(rect.x, rect.y - distance, rect.width, distance)
+        elif direction == DOWN:
+            strip = pygame.Rect(rect.x, rect.bottom, rect.width, distance)
+        elif direction == LEFT:
+            strip = pygame.Rect(rect.x - distance, rect.y, distance, rect.height)
+        elif direction == RIGHT:
+            strip = pygame.Rect(rect.right, rect.y, distance, rect.height)
+
+        if not self.collides(strip, offset):
+            return distance
+
+        # Copies the obstacles of the strip and finds the nearest of them.
+        region = pygame.mask.Mask(strip.size)
+        region.draw(self.__feet_mask(offset), (-strip.x, -strip.y))
+        blocked = region.get_bounding_rects()
+
+        if direction == UP:
+            return distance - max([r.bottom for r in blocked])
+        elif direction == DOWN:
+            return min([r.top for r in blocked])
+        elif direction == LEFT:
+            return distance - max([r.right for r in blocked])
+        elif direction == RIGHT:
+            return min([r.left for r in blocked])
+
+    def prefetch(self, rect):
+        """Composes the zones and interiors, which a unit is approaching,
+        in the background, so that changing to them doesn't stall the game.
+
+        Parameters:
+
+        rect - rect of the approaching unit, i.e. player's unit
+        """
+
+        # Moves the zones composed so far to the cache.
+        for key, zone in self.loader.collect().items():
+            if not key in self.cache:
+                self.cache.put(key, zone)
+
+        keys = []
+
+        if self.__interior == 0:
+            # Zones behind the edges, which the unit is close to
+            if rect.top < PREFETCH_DISTANCE:
+                keys.append((self.neighbour(UP), 0))
+            if rect.bottom > HEIGHT - PREFETCH_DISTANCE:
+                keys.append((self.neighbour(DOWN), 0))
+            if rect.left < PREFETCH_DISTANCE:
+                keys.append((self.neighbour(LEFT), 0))
+            if rect.right > WIDTH - PREFETCH_DISTANCE:
+                keys.append((self.neighbour(RIGHT), 0))
+
+            # Interiors behind the entrances, which the unit is close to
+            interiors = []
+            if self.__zone <= len(self.__interiors):
+                interiors = self.__interiors[self.__zone - 1]
+
+            for area, number in self.areas:
+                if number <= len(interiors) \
+                and not interiors[number - 1][0] is None \
+                and area.inflate(PREFETCH_DISTANCE * 2,
+                                 PREFETCH_DISTANCE * 2).colliderect(rect):
+                    keys.append((self.__zone, number))
+        else:
+            # The zone outside of the current interior
+            keys.append((self.__zone, 0))
+
+        for key in keys:
+            if not key[0] is None and not key in self.cache:
+                self.loader.request(key)
 
     @property
     def interior(self):
@@ -153,28 +563,11 @@ class Map(object):
     def interior(self, number):
         """Sets a new interior."""
 
-        if number == 0:
-            self.__changeZone(self.__zone)
-        else:
-            config = \
-            pygame.image.load(self.__interiors[self.__zone - 1][number - 1][0])
-
-            textures = \
-            pygame.image.load(self.__interiors[self.__zone - 1][number - 1][1])
-
-            self.config.blit(config, (0, 0),
-                             (0, 0, WIDTH, HEIGHT))
-            self.textures.blit(textures, (0, 0),
-                               (0, 0, WIDTH, HEIGHT))
-
-        self.__updateFiltered()
+        self.__show(self.__zone, number)
 
         # Updates the interior attribute.
         self.__interior = number
 
-        # Updates the areas to which the player may enter.
-        self.__updateEnterAreas()
-
     @property
     def zone(self):
         """Returns the current zone."""
@@ -188,11 +581,20 @@ class Map(object):
         # Changes the current zone.
         self.__changeZone(zone)
 
-        # Updates the areas to which the player may enter.
-        self.__updateEnterAreas()
-
     @property
     def zones(self):
         """Returns the amount of all the zones."""
 
         return self.__zones
+
+    @property
+    def columns(self):
+        """Returns the amount of zones in a row."""
+
+        return self.__columns
+
+    @property
+    def rows(self):
+        """Returns the amount of zones in a column."""
+
+        return self.__rows
@@ -7,10 +7,65 @@ from abc import ABCMeta, abstractmethod
 import pygame
 from pygame.locals import *
 
+import Routines.assets as assets
 from Main.constants import *
 
 
+class WeaponDefinition(object):
+    """Data shared by all the weapons of the same kind,
+    loaded only once.
+
+    Parameters:
+
+    'name' - name of the weapons
+    'image' - name of the weapons' image
+    'icon' - name of the weapons' icon
+    'battle_image' - name of the weapons' image used in the fights
+    'description' - description of the weapons
+    'attack_rate' - attack rate of the weapons
+    """
+
+    __slots__ = ("name", "image", "icon", "battle_image", "description",
+                 "attack_rate")
+
+    def __init__(self, name, image, icon, battle_image, description,
+                 attack_rate):
+
+        self.name = name
+        self.description = description
+        self.attack_rate = attack_rate
+
+        self.image = assets.load(PATH_ITEMS + image)
+        self.icon = assets.load(PATH_ITEMS + icon)
+        self.battle_image = assets.load(PATH_ITEMS + battle_image)
+
+
+# Definitions of the weapons keyed by their arguments
+_definitions = {}
+
+
+def get_definition(*args):
+    """Returns the shared definition of weapons.
+
+    Parameters:
+
+    'args' - arguments of the definition
+    """
+
+    definition = _definitions.get(args)
+
+    if definition is None:
+        definition = WeaponDefinition(*args)
+        _definitions[args] = definition
+
+    return definition
+
+
 class Weapon(pygame.sprite.Sprite):
+    """Abstract class used to create weapons. A weapon keeps
+    only its own position, while its images and stats are shared
+    by all the weapons of the same kind.
+    """
 
     __metaclass__ = ABCMeta
 
@@ -18,11 +73,29 @@ class Weapon(pygame.sprite.Sprite):
     def __init__(self, name, image, icon, battle_image, description,\
                  attack_rate):
 
-        self.name = name
-        self.description = description
-        self.__attack_rate = attack_rate
+        # Initiates the super class.
+        pygame.sprite.Sprite.__init__(self)
+
+        self.definition = get_definition(name, image, icon, battle_image,
+                                         description, attack_rate)
+        self.rect = self.definition.image.get_rect()
+
+    @property
+    def battle_image(self):
+        return self.definition.battle_image
+
+    @property
+    def description(self):
+        return self.definition.description
+
+    @property
+    def icon(self):
+        return self.definition.icon
+
+    @property
+    def image(self):
+        return self.definition.image
 
-        self.image = pygame.image.load(PATH_ITEMS + image)
-        self.rect = self.image.get_rect()
-        self.icon = pygame.image.load(PATH_ITEMS + icon)
-        self.battle_image = pygame.image.load(PATH_ITEMS + battle_image)
+    @property
+    def name(self):
+        return self.definition.name
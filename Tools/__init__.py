@@ -5,4 +5,4 @@
 used to develop the game.
 """
 
-__all__ = ("objects_editor", "quests_editor")
+__all__ = ("benchmark", "objects_editor", "packer", "quests_editor")
@@ -0,0 +1,619 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This program measures the performance of the game's
+most frequently called routines.
+
+Run it from the 'Tools' directory.
+"""
+
+from __future__ import print_function
+
+__version__ = "0.1"
+
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+# Fixes the program's main directory to use in local packages and modules.
+if __name__ == "__main__":
+    sys.path[0] = os.getcwd()[:-len("Tools")]
+
+import pygame
+
+import AI.pathfinding as pathfinding
+import Interface.texts as texts
+import Routines.assets as assets
+import Routines.events as events
+import Routines.loading as loading
+import Routines.packs as packs
+import Routines.registry as registry
+import Routines.rendering as rendering
+import Routines.spatial as spatial
+import Static.layers as layers
+import Static.maps as maps
+from Main.constants import *
+
+
+def legacy_collides(config, strip, offset=0):
+    """Checks a strip of the config image pixel by pixel,
+    the way the game used to do it before the obstacle mask.
+    """
+
+    for x in range(strip.left, strip.right):
+        for y in range(strip.top, strip.bottom):
+            if config.get_at((x, y)) == BLUE:
+                if config.get_at((x, y + offset)) == BLUE:
+                    return True
+    return False
+
+
+def legacy_areas(config):
+    """Returns the entrance areas of a config image,
+    scanned pixel by pixel the way the game used to do it.
+    """
+
+    areas = []
+    x, y = 0, 752
+    counter = 0
+
+    while True:
+        if config.get_at((x + 1, y)) == RED:
+            counter += 1
+
+            if config.get_at((x + 33, y)) == RED:
+                width = 48
+            elif config.get_at((x + 17, y)) == RED:
+                width = 32
+            else:
+                width = 16
+
+            areas.append([pygame.Rect((x, y), (width, 16)), counter])
+            x += width
+        elif y == 0:
+            break
+        else:
+            if x == 1008:
+                x = 0
+                y -= 16
+            else:
+                x += 16
+
+    return areas
+
+
+def random_strips(amount, unit_size=(18, 26), distance=2):
+    """Returns a list of strips swept by a moving unit."""
+
+    strips = []
+    random.seed(0)
+
+    for i in range(amount):
+        x = random.randint(distance, WINDOW_WIDTH - unit_size[0] - distance)
+        y = random.randint(distance, WINDOW_HEIGHT - unit_size[1] * 2)
+
+        strips.append(random.choice(
+            [pygame.Rect(x, y - distance, unit_size[0], distance),
+             pygame.Rect(x, y + unit_size[1], unit_size[0], distance),
+             pygame.Rect(x - distance, y, distance, unit_size[1]),
+             pygame.Rect(x + unit_size[0], y, distance, unit_size[1])]))
+
+    return strips
+
+
+def benchmark_collisions(amount=2000, repeat=3):
+    """Compares the obstacle mask with the per-pixel scan."""
+
+    map_ = maps.Map(PATH_MAPS + "config2.bmp", PATH_MAPS + "textures2.bmp")
+    config = pygame.image.load(PATH_MAPS + "config2.bmp")
+    strips = random_strips(amount)
+    offset = int(26 // 1.5)
+
+    # Both of the methods have to give the same answers.
+    for strip in strips:
+        if map_.collides(strip, offset) != legacy_collides(config, strip, offset):
+            raise AssertionError("error! results differ for " + str(strip))
+
+    # Free strips are the worst case for the scan, which can't stop early.
+    free = [s for s in strips if not legacy_collides(config, s, offset)]
+
+    print("Map collisions:")
+    for name, tested in (("all strips", strips), ("free strips", free)):
+        legacy = min(timeit.repeat(
+            lambda: [legacy_collides(config, s, offset) for s in tested],
+            number=1, repeat=repeat))
+        masked = min(timeit.repeat(
+            lambda: [map_.collides(s, offset) for s in tested],
+            number=1, repeat=repeat))
+
+        print("    %s (%d):" % (name, len(tested)))
+        print("        per-pixel scan: %8.2f ms" % (legacy * 1000))
+        print("        obstacle mask:  %8.2f ms (%.1fx faster)" % \
+              (masked * 1000, legacy / masked))
+
+
+def benchmark_paths(amount=500):
+    """Measures the path finder on random pairs of positions."""
+
+    class Unit(object):
+        rect = pygame.Rect(0, 0, 18, 26)
+        speed = 2
+
+    map_ = maps.Map(PATH_MAPS + "config2.bmp", PATH_MAPS + "textures2.bmp")
+
+    start = timeit.default_timer()
+    grid = pathfinding.navigation_grid(map_, Unit())
+    built = timeit.default_timer() - start
+
+    random.seed(0)
+    walkable = [(i % grid.columns, i // grid.columns)
+                for i, open_ in enumerate(grid.walkable) if open_]
+    pairs = [(random.choice(walkable), random.choice(walkable))
+             for i in range(amount)]
+
+    start = timeit.default_timer()
+    for pair in pairs:
+        grid.find_path(*pair)
+    searched = timeit.default_timer() - start
+
+    # Repeats the most recent pairs, which the grid remembers.
+    repeated = pairs[-pathfinding.PATH_CACHE_SIZE:] * \
+        (amount // pathfinding.PATH_CACHE_SIZE)
+
+    start = timeit.default_timer()
+    for pair in repeated:
+        grid.find_path(*pair)
+    cached = timeit.default_timer() - start
+
+    # Computes the whole fields of random goals on an open grid at once,
+    # then spreads them by the steps, which the chasing units look up.
+    class OpenMap(object):
+        def collides(self, rect, offset):
+            return False
+
+    open_grid = pathfinding.NavigationGrid(OpenMap(), Unit.rect.size,
+                                           (0, 0), Unit.speed)
+    goals = [(random.randrange(open_grid.columns),
+              random.randrange(open_grid.rows - 1)) for i in range(20)]
+    whole = []
+    steps = []
+
+    for goal in goals:
+        start = timeit.default_timer()
+        open_grid.flow_field(goal)
+        whole.append(timeit.default_timer() - start)
+
+    for goal in goals:
+        goal = (goal[0], goal[1] + 1)
+        done = False
+        while not done:
+            start = timeit.default_timer()
+            done = open_grid.flow_field(goal, pathfinding.FIELD_STEP).done
+            steps.append(timeit.default_timer() - start)
+
+    print("Path finding (%d paths, %d regions):" % (amount,
+                                                   len(grid.centers)))
+    print("    navigation grid: %8.2f ms" % (built * 1000))
+    print("    searched paths:  %8.2f ms" % (searched * 1000))
+    print("    cached paths:    %8.2f ms (%d paths)" % (cached * 1000,
+                                                       len(repeated)))
+    print("    whole field:     %8.2f ms (longest %.2f ms, %d positions)" % \
+          (sum(whole) / len(whole) * 1000, max(whole) * 1000,
+           len(open_grid.walkable)))
+    print("    field step:      %8.2f ms (longest %.2f ms)" % \
+          (sum(steps) / len(steps) * 1000, max(steps) * 1000))
+
+
+def benchmark_layers(amount=2000, repeat=3):
+    """Compares the config layers with the config image."""
+
+    config = pygame.image.load(PATH_MAPS + "config2.bmp")
+    decoded = layers.Layers(config)
+
+    # Both of them have to give the same entrance areas.
+    if decoded.areas != legacy_areas(config):
+        raise AssertionError("error! entrance areas differ")
+
+    random.seed(0)
+    rects = [pygame.Rect(random.randint(0, WINDOW_WIDTH - 18),
+                         random.randint(0, WINDOW_HEIGHT - 26), 18, 26)
+             for i in range(amount)]
+
+    def legacy_enter(rect):
+        for area in decoded.areas:
+            if rect.colliderect(area[0]):
+                return area[1]
+        return 0
+
+    for rect in rects:
+        if decoded.area_at(rect) != legacy_enter(rect):
+            raise AssertionError("error! results differ for " + str(rect))
+
+    scanned = min(timeit.repeat(lambda: legacy_areas(config),
+                                number=1, repeat=repeat))
+    decoding = min(timeit.repeat(lambda: layers.Layers(config),
+                                 number=1, repeat=repeat))
+    listed = min(timeit.repeat(lambda: [legacy_enter(r) for r in rects],
+                               number=1, repeat=repeat))
+    looked_up = min(timeit.repeat(lambda: [decoded.area_at(r) for r in rects],
+                                  number=1, repeat=repeat))
+
+    image_bytes = config.get_bytesize() * config.get_width() * \
+        config.get_height()
+
+    print("Config layers (%d entrance areas):" % len(decoded.areas))
+    print("    config image:   %8d KB" % (image_bytes // 1024))
+    print("    layers:         %8d KB (%.1fx smaller)" % \
+          (decoded.bytes // 1024, image_bytes / float(decoded.bytes)))
+    print("    area scan:      %8.2f ms" % (scanned * 1000))
+    print("    full decoding:  %8.2f ms" % (decoding * 1000))
+    print("    area tests (%d):" % amount)
+    print("        area list:  %8.2f ms" % (listed * 1000))
+    print("        layers:     %8.2f ms" % (looked_up * 1000))
+
+
+def benchmark_assets(amount=40, blits=500, repeat=3):
+    """Compares loading and blitting images through the asset manager
+    with loading them from the disk every time.
+    """
+
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    display = pygame.display.get_surface()
+    paths = [PATH_MENUS + "action_dialog_button.bmp",
+             PATH_WINDOWS + "action_dialog.bmp",
+             PATH_WINDOWS + "combat_message_background.png"]
+
+    manager = assets.AssetManager()
+
+    def from_disk():
+        return [pygame.image.load(paths[i % len(paths)])
+                for i in range(amount)]
+
+    def from_manager():
+        return [manager.load(paths[i % len(paths)]) for i in range(amount)]
+
+    loaded = min(timeit.repeat(from_disk, number=1, repeat=repeat))
+    shared = min(timeit.repeat(from_manager, number=1, repeat=repeat))
+
+    raw = pygame.image.load(paths[1])
+    converted = manager.load(paths[1])
+
+    def blit(image):
+        for i in range(blits):
+            display.blit(image, (0, 0))
+
+    raw_blits = min(timeit.repeat(lambda: blit(raw), number=1,
+                                  repeat=repeat))
+    converted_blits = min(timeit.repeat(lambda: blit(converted), number=1,
+                                        repeat=repeat))
+
+    print("Assets (%d loads, %d read from the disk):" % (amount * repeat,
+                                                        manager.loads))
+    print("    from the disk:  %8.2f ms" % (loaded * 1000))
+    print("    asset manager:  %8.2f ms (%.1fx faster)" % \
+          (shared * 1000, loaded / shared))
+    print("    blits (%d):" % blits)
+    print("        as loaded:  %8.2f ms" % (raw_blits * 1000))
+    print("        converted:  %8.2f ms (%.1fx faster)" % \
+          (converted_blits * 1000, raw_blits / converted_blits))
+
+
+def benchmark_pack(repeat=3):
+    """Compares reading the images from a pack
+    with decoding the separate files.
+    """
+
+    images = []
+    for directory, directories, names in os.walk(PATH_GRAPHICS):
+        images.extend([os.path.join(directory, name) for name in names
+                       if os.path.splitext(name)[1].lower() in packs.IMAGES])
+
+    path = os.path.join(tempfile.gettempdir(), packs.PACK_NAME)
+    packs.build(path, images)
+    pack = packs.AssetPack(path)
+
+    # Both of them have to give the same pixels.
+    for image in images:
+        if pygame.image.tostring(pygame.image.load(image), "RGBA") != \
+           pygame.image.tostring(pack.image(image), "RGBA"):
+            raise AssertionError("error! pixels differ for " + image)
+
+    decoded = min(timeit.repeat(
+        lambda: [pygame.image.load(image) for image in images],
+        number=1, repeat=repeat))
+    packed = min(timeit.repeat(
+        lambda: [pack.image(image) for image in images],
+        number=1, repeat=repeat))
+    copied = min(timeit.repeat(
+        lambda: [pack.image(image, True) for image in images],
+        number=1, repeat=repeat))
+    opened = min(timeit.repeat(lambda: packs.AssetPack(path),
+                               number=1, repeat=repeat))
+
+    print("Asset pack (%d images, %.1f MB):" % \
+          (len(images), os.path.getsize(path) / 1048576.0))
+    print("    separate files: %8.2f ms" % (decoded * 1000))
+    print("    pack:           %8.2f ms (%.1fx faster, %.2f ms to open)" % \
+          (packed * 1000, decoded / packed, opened * 1000))
+    print("    pack, copied:   %8.2f ms (%.1fx faster)" % \
+          (copied * 1000, decoded / copied))
+
+
+def benchmark_loader(repeat=3):
+    """Compares decoding the images one by one
+    with decoding them by a loader's workers, measuring the longest
+    update, for which the loading screen isn't displayed.
+    """
+
+    images = []
+    for directory, directories, names in os.walk(PATH_GRAPHICS):
+        images.extend([os.path.join(directory, name) for name in names
+                       if os.path.splitext(name)[1].lower() in packs.IMAGES])
+
+    def load_serially():
+        for image in images:
+            pygame.image.load(image)
+
+    updates = []
+
+    def load_in_parallel():
+        loader = loading.Loader()
+
+        for image in images:
+            loader.add(image, pygame.image.load, (image,))
+        loader.add("done", lambda: None, depends=images, main=True)
+
+        loader.start()
+
+        del updates[:]
+        done = False
+        while not done:
+            start = timeit.default_timer()
+            done = loader.update()
+            updates.append(timeit.default_timer() - start)
+            time.sleep(0.001)
+
+    serial = min(timeit.repeat(load_serially, number=1, repeat=repeat))
+    parallel = min(timeit.repeat(load_in_parallel, number=1, repeat=repeat))
+
+    print("Loader (%d images, %d workers):" % (len(images),
+                                               loading.WORKERS))
+    print("    one by one:     %8.2f ms" % (serial * 1000))
+    print("    loader:         %8.2f ms (%.1fx faster)" % \
+          (parallel * 1000, serial / parallel))
+    print("    longest update: %8.2f ms in %d updates" % \
+          (max(updates) * 1000, len(updates)))
+
+
+def benchmark_text(letters=2000, repeat=3):
+    """Compares rendering a whole dialog in every frame
+    with revealing its letters one by one.
+    """
+
+    dialog = ("The Epic Odyssey " * letters)[:letters]
+
+    def render_whole():
+        font = texts.get_font(14)
+        for i in range(0, letters, 20):
+            font.render(dialog[:i], True, BLUE)
+
+    def reveal():
+        reveal = texts.TextReveal(dialog, 14, BLUE, 500)
+        for i in range(0, letters, 20):
+            reveal.reveal(20)
+
+    frames = letters // 20
+    whole = min(timeit.repeat(render_whole, number=1, repeat=repeat))
+    revealed = min(timeit.repeat(reveal, number=1, repeat=repeat))
+
+    print("Dialog text (%d letters, %d frames):" % (letters, frames))
+    print("    rendered whole: %8.3f ms per frame" % (whole * 1000 / frames))
+    print("    revealed:       %8.3f ms per frame" % \
+          (revealed * 1000 / frames))
+
+
+def benchmark_registry(amount=1000, repeat=3):
+    """Compares finding units by scanning the game's files
+    with finding them in a registry.
+    """
+
+    files = {"Map": [], "Human": [], "Olympian": [], "Titan": []}
+    for i in range(amount):
+        files["Human"].append({"name": "Human %d" % i, "image": "homer.bmp",
+                               "defense": 5, "speed": 2, "agility": 1,
+                               "skills": [1, 1], "weapon": ""})
+    names = [record["name"] for record in files["Human"]]
+
+    def scan():
+        for name in names:
+            for first in files:
+                if first == "Human":
+                    for second in files[first]:
+                        if second.get("name") == name:
+                            break
+                    break
+
+    index = registry.DataRegistry(files)
+
+    def look_up():
+        for name in names:
+            index.get("Human", name)
+
+    scanned = min(timeit.repeat(scan, number=1, repeat=repeat))
+    indexed = min(timeit.repeat(look_up, number=1, repeat=repeat))
+    validated = min(timeit.repeat(lambda: registry.validate(files),
+                                  number=1, repeat=repeat))
+
+    print("Registry (%d units):" % amount)
+    print("    scanned:        %8.2f ms" % (scanned * 1000))
+    print("    indexed:        %8.2f ms (%.0fx faster)" % \
+          (indexed * 1000, scanned / indexed))
+    print("    validation:     %8.2f ms" % (validated * 1000))
+
+
+def benchmark_events(amount=200, frames=600, repeat=3):
+    """Compares executing the events' code in every frame
+    with scheduling them on a timer wheel.
+    """
+
+    namespace = {"counter": 0}
+    code = "counter += 1"
+
+    def execute():
+        for frame in range(frames):
+            for i in range(amount):
+                exec(code, namespace)
+
+    def schedule():
+        scheduler = events.EventScheduler()
+        for i in range(amount):
+            scheduler.schedule(code, i + 1, 120, namespace=namespace)
+        for frame in range(frames):
+            scheduler.update()
+
+    executed = min(timeit.repeat(execute, number=1, repeat=repeat))
+    scheduled = min(timeit.repeat(schedule, number=1, repeat=repeat))
+
+    print("Events (%d events, every 120 frames):" % amount)
+    print("    executed:       %8.3f ms per frame" % \
+          (executed * 1000 / frames))
+    print("    scheduled:      %8.3f ms per frame" % \
+          (scheduled * 1000 / frames))
+
+
+def benchmark_rendering(amount=300, moving=10, frames=60, repeat=3):
+    """Compares redrawing the whole map every frame
+    with redrawing only the changed parts of it.
+    """
+
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    image = pygame.Surface((18, 26))
+    units = spatial.SpatialGroup()
+
+    for i in range(amount):
+        unit = pygame.sprite.Sprite()
+        unit.image = image
+        unit.rect = image.get_rect(topleft=(random.randrange(0, 1000),
+                                            random.randrange(0, 740)))
+        units.add(unit)
+
+    sprites = units.sprites()
+
+    def move(frame):
+        for unit in sprites[:moving]:
+            unit.rect.x += 2 if frame % 20 < 10 else -2
+            unit.dirty = True
+            units.relocate(unit)
+
+    def full():
+        for frame in range(frames):
+            move(frame)
+            surface.blit(background, (0, 0))
+            for unit in units.sprites():
+                surface.blit(unit.image, unit.rect)
+
+    def dirty():
+        renderer = rendering.DirtyRenderer()
+        for frame in range(frames):
+            move(frame)
+            renderer.draw(surface, background, [units])
+
+    redrawn = min(timeit.repeat(full, number=1, repeat=repeat))
+    rendered = min(timeit.repeat(dirty, number=1, repeat=repeat))
+
+    print("Rendering (%d units, %d moving):" % (amount, moving))
+    print("    full redraw:    %8.3f ms per frame" % \
+          (redrawn * 1000 / frames))
+    print("    dirty rects:    %8.3f ms per frame" % \
+          (rendered * 1000 / frames))
+
+
+def create_zoned_map():
+    """Returns paths to config and textures images of a 2x2-zone map,
+    made of copies of an interior.
+    """
+
+    paths = []
+
+    for name in ("config2.bmp", "textures2.bmp"):
+        image = pygame.image.load(PATH_MAPS + name)
+        full = pygame.Surface((WINDOW_WIDTH * 2, WINDOW_HEIGHT * 2))
+
+        for x in (0, WINDOW_WIDTH):
+            for y in (0, WINDOW_HEIGHT):
+                full.blit(image, (x, y))
+
+        paths.append(os.path.join(tempfile.gettempdir(), "zoned_" + name))
+        pygame.image.save(full, paths[-1])
+
+    return paths
+
+
+def benchmark_zone_crossing(prefetch, frames=64, frame_time=0.01):
+    """Walks a unit to the right edge of a zone and into the next one.
+    Returns the time of the slowest frame.
+    """
+
+    config, textures = create_zoned_map()
+    map_ = maps.Map(config, textures, 1)
+    rect = pygame.Rect(WINDOW_WIDTH - 16 - frames * 2, 300, 18, 26)
+
+    worst = 0
+
+    for frame in range(frames + 1):
+        start = timeit.default_timer()
+
+        if prefetch:
+            map_.prefetch(rect)
+
+        if frame == frames:
+            map_.zone = 2
+        else:
+            rect.x += 2
+
+        worst = max(worst, timeit.default_timer() - start)
+
+        # Leaves the rest of the frame to the background thread.
+        time.sleep(frame_time)
+
+    return worst
+
+
+def benchmark_zones():
+    """Compares the slowest frames of zone crossings."""
+
+    synchronous = benchmark_zone_crossing(False)
+    prefetched = benchmark_zone_crossing(True)
+
+    print("Zone crossing, slowest frame:")
+    print("    composed on change: %8.2f ms" % (synchronous * 1000))
+    print("    prefetched:         %8.2f ms" % (prefetched * 1000))
+
+
+def main():
+    # Measures without opening a window.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+
+    benchmark_collisions()
+    benchmark_layers()
+    benchmark_paths()
+    benchmark_zones()
+    benchmark_assets()
+    benchmark_pack()
+    benchmark_loader()
+    benchmark_text()
+    benchmark_registry()
+    benchmark_events()
+    benchmark_rendering()
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# Copyright (c) 2012 8-Bit Corporation. All rights reserved.
+
+"""This program packs the game's data files into a single pack,
+which the game reads instead of the separate files.
+
+Run it from the 'Tools' directory, after any of the data files
+has been changed. Saved games ('.epic' files) aren't packed.
+"""
+
+from __future__ import print_function
+
+__version__ = "0.1"
+
+import os
+import sys
+import timeit
+
+# Fixes the program's main directory to use in local packages and modules.
+if __name__ == "__main__":
+    sys.path[0] = os.getcwd()[:-len("Tools")]
+
+import pygame
+
+import Routines.packs as packs
+import Static.chunks as chunks
+from Main.constants import *
+
+# Extensions of the files, which aren't packed
+SKIPPED = (".epic", ".pack", ".qc", ".tmp", ".valid", ".zones")
+
+
+def data_files(root=PATH_DATA):
+    """Returns a sorted list of paths to the data files to be packed,
+    building the zone stores of the maps' images on the way.
+    """
+
+    files = []
+
+    for directory, directories, names in os.walk(root):
+        directories.sort()
+
+        for name in sorted(names):
+            path = os.path.join(directory, name)
+            extension = os.path.splitext(name)[1].lower()
+
+            if extension in SKIPPED:
+                continue
+
+            files.append(path)
+
+            # Adds the zone store of every map, made of a config image
+            # and a textures image of the same suffix.
+            if name.startswith("config") and extension == ".bmp":
+                textures = os.path.join(directory,
+                                        "textures" + name[len("config"):])
+
+                if os.path.exists(textures):
+                    chunks.ZoneStore.open(path, textures)
+                    files.append(os.path.splitext(path)[0] + ".zones")
+
+    return files
+
+
+def main():
+    pygame.init()
+
+    start = timeit.default_timer()
+    files = data_files()
+    packs.build(PATH_DATA + packs.PACK_NAME, files)
+
+    print("Packed %d files into '%s' (%.1f MB) in %.2f s." % \
+          (len(files), packs.PACK_NAME,
+           os.path.getsize(PATH_DATA + packs.PACK_NAME) / 1048576.0,
+           timeit.default_timer() - start))
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -25,14 +25,18 @@ import Routines.game_utils as game_utils
 from Main.constants import *
 
 
-GAME_KEYWORDS = ((r"\bcan_move\b", r"\bcreate_human\b", r"\bcreate_map\b",
-                  r"\bcreate_olympian\b", r"\bcreate_titan\b", r"\bevent\b",
+GAME_KEYWORDS = ((r"\bcan_move\b", r"\bcancel_event\b", r"\bcreate_human\b",
+                  r"\bcreate_map\b", r"\bcreate_olympian\b",
+                  r"\bcreate_titan\b", r"\bevent\b",
                   r"\bload_human\b", r"\bload_map\b", r"\bload_olympian\b",
                   r"\bload_titan\b", r"\bmove_unit\b", r"\bmove_unit_steps\b",
-                  r"\bplace_unit\b", r"\bsay\b", r"\bset_background_sound\b",
-                  r"\bset_map\b", r"\bset_music\b",
-                  r"\bset_player_character\b", r"\bsee\b",
-                  r"\bturn_unit\b", r"\bunits_in_range\b"))
+                  r"\bplace_unit\b", r"\brun_script\b", r"\bsay\b",
+                  r"\bset_background_sound\b", r"\bset_map\b",
+                  r"\bset_music\b", r"\bset_player_character\b",
+                  r"\bsee\b", r"\bstop_script\b", r"\bturn_unit\b",
+                  r"\bunits_in_range\b", r"\bwait_dialog\b",
+                  r"\bwait_frames\b", r"\bwait_movement\b",
+                  r"\bwait_region\b"))
 
 PYTHON_KEYWORDS = ((r"\band\b", r"\bas\b", r"\bassert\b",
                     r"\bbreak\b", r"\bclass\b", r"\bcontinue\b",